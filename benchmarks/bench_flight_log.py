@@ -0,0 +1,104 @@
+# benchmarks/bench_flight_log.py
+"""
+Confere e mede a leitura de um log da GS Flight pela Data Analysis.
+
+Grava uma sessão com o Logger do jeito da GS Flight (cabeçalho
+FLIGHT_LOG_HEADER, log colunar, segmentos e índice lateral) e lê de volta
+com views/flight_log.read_flight_log pelos três caminhos: .cols/ (mmap),
+janela pelo índice e TSV. Falha (assert) se algum caminho não trouxer as
+colunas da análise (tempo_s, alt_m, ...) ou se os valores não baterem.
+
+Uso:
+    python benchmarks/bench_flight_log.py [n_linhas]
+"""
+
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np  # noqa: E402
+
+from views.columnar_log import COLUMNS_FILE, columnar_dir_for  # noqa: E402
+from views.flight_log import read_flight_log  # noqa: E402
+from views.logger import Logger  # noqa: E402
+from views.telemetry import FLIGHT_LOG_COLUMNS, FLIGHT_LOG_HEADER  # noqa: E402
+
+INDEX_KEYS = (("linha", FLIGHT_LOG_COLUMNS.index("linha")), ("tempo", FLIGHT_LOG_COLUMNS.index("tempo")))
+ANALYSIS_COLUMNS = ("tempo_s", "alt_m", "temp_C", "lat_deg", "lon_deg")
+
+
+def fake_row(i: int) -> list:
+    t = i * 0.05
+    alt = max(0.0, 3000.0 * math.sin(min(t / 60.0, 1.0) * math.pi))
+    values = {
+        "linha": i, "tempo": round(t, 2), "latitude": -23.55 + i * 1e-6, "longitude": -46.63,
+        "hora": 14, "minuto": 32, "precisao": 0.9, "altitude": round(alt, 2), "sd": 1,
+        "apogeu_h": 0, "apogeu_t": 0, "pqd_mn": 0, "pqd_dn": 0, "pqd_mb": 0, "pqd_db": 0,
+        "temp": 24.5, "roll": 0.1, "pitch": 0.2, "yaw": 0.3,
+    }
+    return [values[k] for k in FLIGHT_LOG_COLUMNS]
+
+
+def write_session(path: str, n: int):
+    logger = Logger(
+        path,
+        durability="os-buffered",
+        columnar=True,
+        columnar_chunk_rows=1000,
+        segment_max_bytes=256 * 1024,
+        index_keys=INDEX_KEYS,
+    )
+    logger.write_header(list(FLIGHT_LOG_HEADER))
+    for i in range(n):
+        logger.save_line(*fake_row(i))
+    logger.close(timeout_s=60.0)
+
+
+def _timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - t0, result
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    tmp = tempfile.mkdtemp(prefix="urd_flight_log_")
+    try:
+        path = os.path.join(tmp, "log_sessao.txt")
+        write_session(path, n)
+        cols_dir = columnar_dir_for(path)
+        assert os.path.isfile(os.path.join(cols_dir, COLUMNS_FILE)), "Logger não gravou o .cols/"
+
+        t_cols, df_cols = _timed(lambda: read_flight_log(path))
+        t_json, df_json = _timed(lambda: read_flight_log(os.path.join(cols_dir, COLUMNS_FILE)))
+
+        # sem o .cols/: índice (janela) e TSV (segmentos)
+        shutil.rmtree(cols_dir)
+        t_tsv, df_tsv = _timed(lambda: read_flight_log(path))
+        t_win, df_win = _timed(lambda: read_flight_log(path, ("tempo", 100.0, 200.0)))
+
+        for name, df in (("colunar", df_cols), ("columns.json", df_json), ("tsv", df_tsv), ("janela", df_win)):
+            missing = [c for c in ANALYSIS_COLUMNS if c not in df.columns]
+            assert not missing, f"{name}: faltam colunas da análise {missing}"
+
+        assert len(df_cols) == len(df_tsv) == n, (len(df_cols), len(df_tsv), n)
+        for c in ANALYSIS_COLUMNS:
+            assert np.allclose(df_cols[c].to_numpy(float), df_tsv[c].to_numpy(float)), c
+        assert df_win["tempo_s"].between(100.0, 200.0).all() and len(df_win) > 0
+
+        print(f"sessão: {n} linhas, {len(os.listdir(tmp))} arquivos")
+        print(f"colunar (mmap): {t_cols * 1000:9.2f} ms")
+        print(f"columns.json  : {t_json * 1000:9.2f} ms")
+        print(f"tsv           : {t_tsv * 1000:9.2f} ms  ({t_tsv / t_cols:.1f}x o colunar)")
+        print(f"janela índice : {t_win * 1000:9.2f} ms  ({len(df_win)} linhas)")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
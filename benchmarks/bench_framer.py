@@ -0,0 +1,109 @@
+# benchmarks/bench_framer.py
+"""
+Microbenchmark do framing de linhas da serial.
+
+Reproduz um backlog de 256 KB (ex.: depois de um burst do LoRa ou de uma
+reconexão) e compara o framing antigo do _read_serial (bytes += chunk e
+split(b"\\n", 1) por linha) com views/serial_framer.LineFramer.
+
+Uso:
+    python benchmarks/bench_framer.py [kb_backlog] [tamanho_chunk]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from views.serial_framer import LineFramer  # noqa: E402
+
+SAMPLE_LINE = (
+    b"L1203 T342.17 A-23.550000 O-46.630000 h14 n32 g0.9 H3000.25 s1 a3012.50 t21.40 "
+    b"D3005.10 d0 N450.00 B0 c24.5 R-1.55 P3.93 Y0.77\r\n"
+)
+
+MAX_BUF_BYTES = 256_000
+MAX_LINE_BYTES = 4096
+
+
+def make_backlog(kb: int) -> bytes:
+    n = (kb * 1024) // len(SAMPLE_LINE) + 1
+    return (SAMPLE_LINE * n)[: kb * 1024]
+
+
+def chunks(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+# ------------------------------------------------------------
+# Implementação antiga (referência)
+# ------------------------------------------------------------
+def legacy_frame(data: bytes, chunk_size: int) -> list:
+    out = []
+    rx_buf = b""
+
+    for chunk in chunks(data, chunk_size):
+        rx_buf += chunk
+
+        if len(rx_buf) > MAX_BUF_BYTES:
+            rx_buf = rx_buf[-MAX_BUF_BYTES:]
+
+        while b"\n" in rx_buf:
+            raw_line, rx_buf = rx_buf.split(b"\n", 1)
+            raw_line = raw_line.strip(b"\r")
+            if not raw_line:
+                continue
+            if len(raw_line) > MAX_LINE_BYTES:
+                continue
+
+            line = raw_line.decode(errors="ignore").strip()
+            if line:
+                out.append(line)
+
+    return out
+
+
+def framer_frame(data: bytes, chunk_size: int) -> list:
+    out = []
+    framer = LineFramer(max_buf_bytes=MAX_BUF_BYTES, max_line_bytes=MAX_LINE_BYTES)
+
+    for chunk in chunks(data, chunk_size):
+        framer.feed(chunk)
+        out.extend(framer.decoded_lines())
+
+    return out
+
+
+# ------------------------------------------------------------
+# Execução
+# ------------------------------------------------------------
+def _bench(fn, data, chunk_size, repeat=5):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn(data, chunk_size)
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    kb = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    chunk_size = int(sys.argv[2]) if len(sys.argv) > 2 else len(make_backlog(kb))
+
+    data = make_backlog(kb)
+
+    t_old, lines_old = _bench(legacy_frame, data, chunk_size)
+    t_new, lines_new = _bench(framer_frame, data, chunk_size)
+    assert lines_old == lines_new
+
+    n = len(lines_new)
+    print(f"backlog: {len(data) / 1024:.0f} KB em chunks de {chunk_size} B, {n} linhas")
+    print(f"antigo : {t_old * 1000:9.2f} ms  ({n / t_old:12,.0f} linhas/s)")
+    print(f"framer : {t_new * 1000:9.2f} ms  ({n / t_new:12,.0f} linhas/s)  ({t_old / t_new:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+# benchmarks/bench_parser.py
+"""
+Microbenchmark do parser de telemetria (pacotes/s).
+
+Compara o parser antigo de GSFlightSinglePage._parse_packet (copiado abaixo,
+sem Qt) com o parser compartilhado de views/telemetry.py.
+
+Uso:
+    python benchmarks/bench_parser.py [n_pacotes]
+"""
+
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from views.telemetry import FLIGHT_SCHEMA  # noqa: E402
+
+NAN = float("nan")
+
+SAMPLE_LINES = [
+    "L1203 T342.17 A-23.550000 O-46.630000 h14 n32 g0.9 H3000.25 s1 a3012.50 t21.40 "
+    "D3005.10 d0 N450.00 B0 c24.5 R-1.55 P3.93 Y0.77",
+    "L1204 T342.22 A-23.550010 O-46.630020 h14 n32 g0.9 H2998.10 s1 a3012.50 t21.40 "
+    "D3005.10 d0 N0 B0 c24.5 R-1.60 P3.90 Y0.80",
+    # pacote corrompido / fora do range
+    "L1205 T342.27 A-923.5 O-46.630030 h99 n32 g0.9 H2996.00 s1 a3012.50 t21.40",
+]
+
+
+# ------------------------------------------------------------
+# Implementação antiga (referência)
+# ------------------------------------------------------------
+def _legacy_to_float(s):
+    if s is None:
+        return None
+    s = s.strip().replace(",", ".")
+    try:
+        return float(s)
+    except Exception:
+        return None
+
+
+def _legacy_in_range(name, v):
+    R = {
+        "linha": (0, 1e9),
+        "tempo": (0, 1e9),
+        "latitude": (-90.0, 90.0),
+        "longitude": (-180.0, 180.0),
+        "hora": (0, 23),
+        "minuto": (0, 59),
+        "precisao": (0.0, 101.0),
+        "altitude": (-15000.0, 15000.0),
+        "sd": (0.0, 1.0),
+        "apogeu_h": (-15000.0, 15000.0),
+        "apogeu_t": (0.0, 1e9),
+        "pqd_mn": (-15000.0, 15000.0),
+        "pqd_dn": (-15000.0, 15000.0),
+        "pqd_mb": (-15000.0, 15000.0),
+        "pqd_db": (-15000.0, 15000.0),
+        "temp": (-80.0, 150.0),
+        "roll": (-720.0, 720.0),
+        "pitch": (-720.0, 720.0),
+        "yaw": (-720.0, 720.0),
+    }
+    lo, hi = R.get(name, (-float("inf"), float("inf")))
+    return lo <= v <= hi
+
+
+def legacy_parse_packet(line):
+    if not line:
+        return None
+
+    line = line.strip()
+
+    LIST = [
+        "linha", "tempo", "latitude", "longitude", "hora", "minuto", "precisao",
+        "altitude", "sd", "apogeu_h", "apogeu_t",
+        "pqd_dn", "pqd_db", "pqd_mn", "pqd_mb",
+        "temp", "roll", "pitch", "yaw"
+    ]
+
+    TAG = {
+        "L": "linha", "T": "tempo", "A": "latitude", "O": "longitude",
+        "h": "hora", "n": "minuto", "g": "precisao",
+        "H": "altitude", "s": "sd",
+        "a": "apogeu_h", "t": "apogeu_t",
+        "D": "pqd_dn", "d": "pqd_db", "N": "pqd_mn", "B": "pqd_mb",
+        "c": "temp",
+        "R": "roll", "P": "pitch", "Y": "yaw",
+    }
+
+    NUM = r"[-+]?(?:(?:\d+\.\d*)|(?:\.\d+)|(?:\d+))(?:[eE][-+]?\d+)?"
+    tokens = re.findall(rf"([A-Za-z])\s*({NUM})", line)
+
+    if not tokens:
+        return None
+
+    raw = {k: None for k in LIST}
+    app = {k: NAN for k in LIST}
+
+    used_keys = set()
+
+    for key_txt, value_txt in tokens:
+        key_txt = key_txt.strip()
+        key = TAG.get(key_txt)
+        if key is None:
+            continue
+        if key in used_keys:
+            continue
+        used_keys.add(key)
+
+        num = _legacy_to_float(value_txt)
+        raw[key] = num
+
+        if num is not None and _legacy_in_range(key, num):
+            app[key] = num
+        else:
+            app[key] = NAN
+
+    return raw, app
+
+
+# ------------------------------------------------------------
+# Execução
+# ------------------------------------------------------------
+def _check_equivalence():
+    for line in SAMPLE_LINES:
+        raw_old, app_old = legacy_parse_packet(line)
+        packet = FLIGHT_SCHEMA.parse(line)
+        assert packet.raw() == raw_old, line
+        for k, v in app_old.items():
+            v_new = packet.get(k)
+            assert (v == v_new) or (v != v and v_new != v_new), (line, k)
+
+
+def _bench(fn, lines, n):
+    m = len(lines)
+    t0 = time.perf_counter()
+    for i in range(n):
+        fn(lines[i % m])
+    dt = time.perf_counter() - t0
+    return n / dt
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+
+    _check_equivalence()
+
+    old = _bench(legacy_parse_packet, SAMPLE_LINES, n)
+    new = _bench(FLIGHT_SCHEMA.parse, SAMPLE_LINES, n)
+
+    print(f"pacotes: {n}")
+    print(f"antigo    : {old:12,.0f} pacotes/s")
+    print(f"telemetry : {new:12,.0f} pacotes/s  ({new / old:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+# views/columnar_log.py
+"""
+Log colunar binário, gravado ao lado do TSV do Logger.
+
+Layout (para o log "log_20250101_120000.txt"):
+
+    log_20250101_120000.cols/
+        columns.json        nomes das colunas, dtype e lista de segmentos
+        seg_00000.npy       float64 com shape (n_colunas, n_linhas)
+        seg_00001.npy
+        ...
+
+Cada segmento é um .npy comum, com uma coluna por linha da matriz: ao abrir
+com mmap cada coluna já é um bloco contíguo, sem parse de texto. Valores
+ausentes (None) ou não numéricos viram NaN. O TSV continua sendo o registro
+durável; aqui só entram segmentos completos (e o último no close()). Sessão
+sem close() (queda do app) fica com "complete": false e o leitor do TSV deve
+ser preferido.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from typing import Optional, Sequence
+
+import numpy as np
+
+NAN = float("nan")
+
+COLUMNS_FILE = "columns.json"
+
+
+def columnar_dir_for(log_path: str) -> str:
+    """Pasta do log colunar correspondente a um TSV."""
+    base, _ = os.path.splitext(log_path)
+    return base + ".cols"
+
+
+def _to_float(v) -> float:
+    if v is None:
+        return NAN
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return NAN
+
+
+class ColumnarWriter:
+    """
+    Acumula linhas num bloco float64 pré-alocado e grava um segmento .npy
+    a cada chunk_rows linhas. Não é thread-safe: usado só pela thread de
+    escrita do Logger.
+    """
+
+    def __init__(self, folder: str, columns: Sequence[str], chunk_rows: int = 4096):
+        self.folder = folder
+        self.columns = [str(c) for c in columns]
+        self.chunk_rows = max(1, int(chunk_rows))
+
+        os.makedirs(self.folder, exist_ok=True)
+
+        self._chunk = np.full((len(self.columns), self.chunk_rows), NAN, dtype=np.float64)
+        self._n = 0
+        self._segments: list[dict] = []
+        self.rows_written = 0
+
+        # continua uma sessão existente (Logger abre o TSV em modo "a")
+        meta = _read_meta(self.folder)
+        if meta and meta.get("columns") == self.columns:
+            self._segments = list(meta.get("segments", []))
+            self.rows_written = sum(int(s["rows"]) for s in self._segments)
+
+        self._write_meta(complete=False)
+
+    def append(self, values: Sequence):
+        n_cols = len(self.columns)
+        chunk = self._chunk
+        i = self._n
+
+        for c, v in enumerate(values[:n_cols]):
+            chunk[c, i] = _to_float(v)
+
+        self._n = i + 1
+        if self._n >= self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        """Grava as linhas acumuladas como um novo segmento."""
+        n = self._n
+        if n == 0:
+            return
+
+        name = f"seg_{len(self._segments):05d}.npy"
+        path = os.path.join(self.folder, name)
+        tmp = path + ".tmp"
+
+        with open(tmp, "wb") as f:
+            np.save(f, np.ascontiguousarray(self._chunk[:, :n]))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+        self._segments.append({"file": name, "rows": n})
+        self.rows_written += n
+        self._chunk.fill(NAN)
+        self._n = 0
+
+        self._write_meta(complete=False)
+
+    def close(self):
+        self.flush()
+        self._write_meta(complete=True)
+
+    def _write_meta(self, complete: bool):
+        meta = {
+            "version": 1,
+            "complete": complete,
+            "dtype": "float64",
+            "layout": "column-major",
+            "columns": self.columns,
+            "segments": self._segments,
+        }
+        path = os.path.join(self.folder, COLUMNS_FILE)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, path)
+
+
+def _read_meta(folder: str) -> Optional[dict]:
+    path = os.path.join(folder, COLUMNS_FILE)
+    if not os.path.isfile(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+class ColumnarLog:
+    """
+    Leitor do log colunar. Os segmentos são abertos com mmap (np.load mmap_mode="r");
+    só a coluna pedida é copiada (concatenação dos segmentos).
+    """
+
+    def __init__(self, folder: str):
+        meta = _read_meta(folder)
+        if meta is None:
+            raise FileNotFoundError(f"Log colunar não encontrado em {folder}")
+
+        self.folder = folder
+        self.complete = bool(meta.get("complete", False))
+        self.columns: list[str] = list(meta["columns"])
+        self.index = {c: i for i, c in enumerate(self.columns)}
+        self.segments = [
+            np.load(os.path.join(folder, s["file"]), mmap_mode="r")
+            for s in meta.get("segments", [])
+        ]
+
+    @classmethod
+    def for_log(cls, log_path: str) -> Optional["ColumnarLog"]:
+        """Abre o log colunar de um TSV, ou None se ele não existir."""
+        folder = columnar_dir_for(log_path)
+        if _read_meta(folder) is None:
+            return None
+        return cls(folder)
+
+    def __len__(self) -> int:
+        return sum(seg.shape[1] for seg in self.segments)
+
+    def column(self, name: str) -> np.ndarray:
+        i = self.index[name]
+        if not self.segments:
+            return np.empty(0, dtype=np.float64)
+        if len(self.segments) == 1:
+            return self.segments[0][i]
+        return np.concatenate([seg[i] for seg in self.segments])
+
+    def to_dataframe(self):
+        import pandas as pd
+        return pd.DataFrame({c: self.column(c) for c in self.columns})
@@ -387,14 +387,18 @@ class ConfigDialog(QDialog):
         self.lbl_tiles.setAlignment(Qt.AlignCenter)
 
         self.btn_pick_tiles = QPushButton("Selecionar pasta de tiles…")
+        self.btn_pick_mbtiles = QPushButton("Selecionar arquivo .mbtiles…")
         try:
-            self.btn_pick_tiles.setEnabled(not self.gs_single.net.get_status())
+            offline = not self.gs_single.net.get_status()
         except Exception:
-            self.btn_pick_tiles.setEnabled(True)
+            offline = True
+        self.btn_pick_tiles.setEnabled(offline)
+        self.btn_pick_mbtiles.setEnabled(offline)
 
         lay_map.addWidget(self.lbl_tiles, r, 0, 1, 2)
         r += 1
-        lay_map.addWidget(self.btn_pick_tiles, r, 0, 1, 2)
+        lay_map.addWidget(self.btn_pick_tiles, r, 0)
+        lay_map.addWidget(self.btn_pick_mbtiles, r, 1)
         r += 1
 
         right_col.addWidget(box_map)
@@ -417,6 +421,7 @@ class ConfigDialog(QDialog):
         self.btn_reinit_map.clicked.connect(self._reinit_map_visual)
 
         self.btn_pick_tiles.clicked.connect(self._pick_tiles)
+        self.btn_pick_mbtiles.clicked.connect(self._pick_mbtiles)
         self.btn_reset_alt_graph.clicked.connect(self._reset_altitude_graph)
 
         self.btn_record_ui.clicked.connect(self._toggle_ui_recording)
@@ -574,7 +579,8 @@ class ConfigDialog(QDialog):
             "Reinicializar mapa:\n"
             "  Reinicia apenas a visualização do mapa.\n\n"
             "Upload de mapas:\n"
-            "  Seleciona uma pasta de tiles locais para uso offline.\n\n"
+            "  Seleciona uma pasta de tiles locais ou um pacote .mbtiles\n"
+            "  (arquivo único) para uso offline.\n\n"
 
             "6) GRÁFICO\n"
             "------------------------------------------------------------\n"
@@ -736,7 +742,7 @@ class ConfigDialog(QDialog):
             pass
 
         try:
-            self.gs_single.alt_curve.setData([], [])
+            self.gs_single.reset_altitude_graph()
         except Exception:
             pass
 
@@ -911,6 +917,7 @@ class ConfigDialog(QDialog):
 
         if hasattr(self.gs_single, "map") and hasattr(self.gs_single.map, "_init_map"):
             try:
+                self.gs_single.map.reset_map()
                 self.gs_single.map._init_map()
             except Exception as e:
                 QMessageBox.warning(self, "Erro", f"Falha ao reinicializar mapa: {e}")
@@ -940,7 +947,7 @@ class ConfigDialog(QDialog):
 
         # limpa curva visível
         try:
-            self.gs_single.alt_curve.setData([], [])
+            self.gs_single.reset_altitude_graph()
         except Exception:
             pass
 
@@ -965,6 +972,13 @@ class ConfigDialog(QDialog):
     # -----------------------------
     def _pick_tiles(self):
         folder = QFileDialog.getExistingDirectory(self, "Escolher pasta de tiles")
+        self._use_tiles(folder)
+
+    def _pick_mbtiles(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Escolher pacote de tiles", "", "MBTiles (*.mbtiles)")
+        self._use_tiles(path)
+
+    def _use_tiles(self, folder: str):
         if folder:
             self.lbl_tiles.setText(folder)
             try:
@@ -11,9 +11,13 @@ import re
 import pyqtgraph as pg
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 import os
 
+from views.columnar_log import COLUMNS_FILE
+from views.flight_log import parse_range, read_flight_log
+from views.log_index import LogIndex
+from views.plot_lod import LodCurve
+
 
 class DataAnalysisPage(QWidget):
     def __init__(self, parent=None):
@@ -181,16 +185,54 @@ class FlightAnalysisPage(QWidget):
         self.curves = {}
 
     def load_file(self):
-        path, _ = QFileDialog.getOpenFileName(self, "Abrir Arquivo", "", "Text Files (*.txt)")
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Abrir Arquivo", "", f"Logs de voo (*.txt {COLUMNS_FILE});;Text Files (*.txt)"
+        )
         if not path:
             return
         try:
-            self.df = pd.read_csv(path, sep="\t")
+            self.df = self._read_log(path)
         except Exception as e:
             QMessageBox.critical(self, "Erro", f"Falha ao ler arquivo:\n{e}")
             return
         self.analyze_data(path)
 
+    def _read_log(self, path: str) -> pd.DataFrame:
+        """
+        Lê o log de voo (views/flight_log.py): log colunar (.cols/) por mmap
+        quando existir, senão o TSV. Log com índice (.index.tsv): junta os
+        segmentos e pergunta a janela de tempo, lida a partir do offset do índice.
+        Log da GS Flight tem as colunas renomeadas para os nomes da análise.
+        """
+        index = None
+        window = None
+        if os.path.basename(path) != COLUMNS_FILE:
+            index = LogIndex.for_log(path)
+            window = self._ask_window(index) if index is not None else None
+        return read_flight_log(path, window, index)
+
+    def _ask_window(self, index: LogIndex):
+        """Pergunta a janela de tempo (chave "tempo" ou "linha" do índice). None = sessão inteira."""
+        key = "tempo" if "tempo" in index.key_columns else next(iter(index.key_columns), None)
+        if key is None:
+            return None
+
+        text, ok = QInputDialog.getText(
+            self,
+            "Janela do log",
+            f"Log com {len(index.segments)} segmento(s).\n"
+            f"Intervalo de {key} (ex.: 120-300 ou -5-10). Vazio = sessão inteira:",
+        )
+        if not ok or not text.strip():
+            return None
+
+        bounds = parse_range(text)
+        if bounds is None:
+            QMessageBox.warning(self, "Janela do log", "Intervalo inválido; carregando a sessão inteira.")
+            return None
+
+        return (key, *bounds)
+
     def analyze_data(self, path):
         df = self.df
         t = df["tempo_s"]
@@ -267,9 +309,15 @@ class FlightAnalysisPage(QWidget):
         # plota gráfico
         self.plot.clear()
         self.curves={}
-        self.curves["alt"] = self.plot.plot(t,alt,pen="b",name="Altitude") if "alt_m" in df else None
-        self.curves["vel"] = self.plot.plot(t,vel_ms,pen="g",name="Velocidade") if "vel_kmph" in df else None
-        self.curves["acc"] = self.plot.plot(t,acc_mag,pen="r",name="Aceleração") if "accX_g" in df else None
+        self.curves["alt"] = self._add_curve(t,alt,pen="b",name="Altitude") if "alt_m" in df else None
+        self.curves["vel"] = self._add_curve(t,vel_ms,pen="g",name="Velocidade") if "vel_kmph" in df else None
+        self.curves["acc"] = self._add_curve(t,acc_mag,pen="r",name="Aceleração") if "accX_g" in df else None
+
+    def _add_curve(self, t, y, **opts):
+        """Curva com LOD (pirâmide min/max): pan/zoom leves mesmo com arquivos longos."""
+        c = LodCurve(np.asarray(t, dtype=float), np.asarray(y, dtype=float), **opts)
+        self.plot.addItem(c)
+        return c
 
     def export_plots(self):
         out_dir = QFileDialog.getExistingDirectory(self,"Escolher pasta")
@@ -939,7 +987,7 @@ class StaticAnalysisPage(QWidget):
 
                 self.lbl_impulse.setText(f"Impulso Total: {impulse:.2f} Ns")
 
-                c = pg.PlotCurveItem(t, thrust, pen=pg.mkPen("b", width=3, dash=[6,3]),
+                c = LodCurve(t, thrust, pen=pg.mkPen("b", width=3, dash=[6,3]),
                                      name=f"Empuxo ({self.unit_thrust})")
                 self.left_viewbox.addItem(c)
                 self.legend.addItem(c, c.name())
@@ -978,7 +1026,7 @@ class StaticAnalysisPage(QWidget):
                 else:
                     self.lbl_p_duration.setText("Tempo de duração: —")
 
-                c = pg.PlotCurveItem(t, press, pen=pg.mkPen("r", width=3, style=Qt.PenStyle.DashDotLine),
+                c = LodCurve(t, press, pen=pg.mkPen("r", width=3, style=Qt.PenStyle.DashDotLine),
                                      name=f"Pressão ({self.unit_press})")
                 self.right_viewbox.addItem(c)
                 self.legend.addItem(c, c.name())
@@ -1057,7 +1105,7 @@ class StaticAnalysisPage(QWidget):
 
                 self.lbl_impulse.setText(f"Impulso Total: {impulse:.2f} N·s")
 
-                c = pg.PlotCurveItem(t, y_force, pen=pg.mkPen("b", width=3),
+                c = LodCurve(t, y_force, pen=pg.mkPen("b", width=3),
                                      name=f"Força ({self.unit_thrust})")
                 self.left_viewbox.addItem(c)
                 self.legend.addItem(c, c.name())
@@ -1083,7 +1131,7 @@ class StaticAnalysisPage(QWidget):
                 else:
                     self.lbl_p_duration.setText("Tempo de duração: —")
 
-                c = pg.PlotCurveItem(t, p, pen=pg.mkPen("r", width=3, style=Qt.PenStyle.DashDotLine),
+                c = LodCurve(t, p, pen=pg.mkPen("r", width=3, style=Qt.PenStyle.DashDotLine),
                                      name=f"Pressão ({self.unit_press})")
                 self.right_viewbox.addItem(c)
                 self.legend.addItem(c, c.name())
@@ -1098,7 +1146,7 @@ class StaticAnalysisPage(QWidget):
                     pmin = float(np.nanmin(p))
                     if (vmax - vmin) > 1e-12 and (pmax - pmin) > 1e-12:
                         v_scaled = (v - vmin) / (vmax - vmin) * (pmax - pmin) + pmin
-                        cv = pg.PlotCurveItem(t, v_scaled, pen=pg.mkPen("y", width=2, style=Qt.PenStyle.DotLine),
+                        cv = LodCurve(t, v_scaled, pen=pg.mkPen("y", width=2, style=Qt.PenStyle.DotLine),
                                               name="Pressão (V) [escalonada]")
                         self.right_viewbox.addItem(cv)
                         self.legend.addItem(cv, cv.name())
@@ -0,0 +1,97 @@
+# views/flight_log.py
+"""
+Leitura dos logs de voo para a Data Analysis (sem Qt).
+
+Chegam dois formatos:
+- log do cartão SD do foguete: colunas tempo_s, alt_m, temp_C, ... (os nomes
+  que FlightAnalysisPage.analyze_data usa)
+- log da GS Flight (Logger): cabeçalho FLIGHT_LOG_HEADER (tempo.s, baro.h.m,
+  temperatura, ...), às vezes com log colunar (.cols/) e índice lateral
+
+read_flight_log() escolhe o leitor mais rápido (colunar por mmap > janela pelo
+índice > TSV) e normalize_flight_columns() troca os nomes da GS pelos da
+análise. Do log da GS saem altitude, apogeu e tempos; velocidade, aceleração
+e paraquedas não existem nele e ficam zerados na análise.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import re
+from typing import Optional
+
+import pandas as pd
+
+from views.columnar_log import COLUMNS_FILE, ColumnarLog
+from views.log_index import LogIndex
+
+# coluna do log da GS -> coluna da análise
+GS_LOG_COLUMNS = {
+    "tempo.s": "tempo_s",
+    "baro.h.m": "alt_m",
+    "temperatura": "temp_C",
+    "lat.GPS": "lat_deg",
+    "lon.GPS": "lon_deg",
+}
+
+# (chave do índice, t0, t1)
+Window = tuple[str, float, float]
+
+# "120-300", "-5-10", "-5 a -1", "1,5; 3" (vírgula decimal aceita)
+_NUM = r"[-+]?(?:\d+(?:[.,]\d*)?|[.,]\d+)"
+_RANGE_RE = re.compile(rf"^\s*({_NUM})\s*(?:-|a|até|;)\s*({_NUM})\s*$", re.IGNORECASE)
+
+
+def parse_range(text: str) -> Optional[tuple[float, float]]:
+    """(t0, t1) em ordem crescente a partir do texto digitado, ou None se inválido."""
+    m = _RANGE_RE.match(text)
+    if m is None:
+        return None
+    t0, t1 = (float(g.replace(",", ".")) for g in m.groups())
+    return min(t0, t1), max(t0, t1)
+
+
+def normalize_flight_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Renomeia as colunas do log da GS; erro claro se não houver coluna de tempo."""
+    rename = {src: dst for src, dst in GS_LOG_COLUMNS.items() if src in df.columns and dst not in df.columns}
+    if rename:
+        df = df.rename(columns=rename)
+    if "tempo_s" not in df.columns:
+        raise ValueError("Log sem coluna de tempo (tempo_s ou tempo.s): não é um log de voo.")
+    return df
+
+
+def read_flight_log(path: str, window: Optional[Window] = None,
+                    index: Optional[LogIndex] = None) -> pd.DataFrame:
+    """
+    Lê o log de voo em `path` (TSV ou o columns.json de um .cols/). window
+    limita a uma faixa de uma chave do índice (ex.: ("tempo", 120, 300)).
+    """
+    if os.path.basename(path) == COLUMNS_FILE:
+        return normalize_flight_columns(ColumnarLog(os.path.dirname(path)).to_dataframe())
+
+    if index is None:
+        index = LogIndex.for_log(path)
+    if index is None:
+        window = None
+
+    cols = ColumnarLog.for_log(path)
+    if cols is not None and cols.complete:
+        df = cols.to_dataframe()
+        if window is not None:
+            key, t0, t1 = window
+            v = df.iloc[:, index.key_columns[key]]
+            df = df[(v >= t0) & (v <= t1)].reset_index(drop=True)
+        return normalize_flight_columns(df)
+
+    if index is None:
+        return normalize_flight_columns(pd.read_csv(path, sep="\t"))
+
+    if window is not None:
+        key, t0, t1 = window
+        text = index.header() + "\n" + "\n".join(index.iter_window(key, t0, t1))
+        return normalize_flight_columns(pd.read_csv(io.StringIO(text), sep="\t"))
+
+    parts = [pd.read_csv(seg, sep="\t") for seg in index.segments if os.path.isfile(seg)]
+    return normalize_flight_columns(pd.concat(parts, ignore_index=True))
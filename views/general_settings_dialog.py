@@ -2,11 +2,24 @@ from __future__ import annotations
 
 import platform
 import subprocess
+import time
 
 from PySide6.QtCore import Qt
 from PySide6.QtWidgets import (
-    QDialog, QVBoxLayout, QGroupBox, QCheckBox, QLabel,
-    QPushButton, QMessageBox, QFrame, QApplication
+    QDialog, QVBoxLayout, QHBoxLayout, QGroupBox, QCheckBox, QLabel,
+    QPushButton, QMessageBox, QFrame, QApplication, QComboBox, QFileDialog
+)
+
+from views import trace
+from views.trace import TRACE
+
+# (texto, nível) do combo de diagnóstico
+TRACE_LEVEL_OPTIONS = (
+    ("Desligado", trace.OFF),
+    ("Erros", trace.ERROR),
+    ("Avisos", trace.WARN),
+    ("Info", trace.INFO),
+    ("Debug (pacotes)", trace.DEBUG),
 )
 
 
@@ -16,7 +29,7 @@ class GeneralSettingsDialog(QDialog):
         self.main_window = main_window
 
         self.setWindowTitle("Configurações Gerais")
-        self.resize(420, 290)
+        self.resize(420, 400)
 
         self._build_ui()
         self._sync_from_state()
@@ -49,6 +62,26 @@ class GeneralSettingsDialog(QDialog):
         line.setFrameShadow(QFrame.Sunken)
         root.addWidget(line)
 
+        # --- Diagnóstico ---
+        box_trace = QGroupBox("Diagnóstico")
+        lay_trace = QVBoxLayout(box_trace)
+
+        row_level = QHBoxLayout()
+        row_level.addWidget(QLabel("Trace:"))
+        self.combo_trace_level = QComboBox()
+        for text, level in TRACE_LEVEL_OPTIONS:
+            self.combo_trace_level.addItem(text, level)
+        row_level.addWidget(self.combo_trace_level, 1)
+        lay_trace.addLayout(row_level)
+
+        self.chk_trace_echo = QCheckBox("Mostrar também no console")
+        lay_trace.addWidget(self.chk_trace_echo)
+
+        self.btn_trace_dump = QPushButton("Salvar trace em arquivo...")
+        lay_trace.addWidget(self.btn_trace_dump)
+
+        root.addWidget(box_trace)
+
         # --- Ações ---
         box_actions = QGroupBox("Ações")
         lay_actions = QVBoxLayout(box_actions)
@@ -76,6 +109,9 @@ class GeneralSettingsDialog(QDialog):
         self.btn_toggle_fullscreen.clicked.connect(self._on_toggle_fullscreen_clicked)
         self.btn_quit.clicked.connect(self._on_quit_clicked)
         self.btn_shutdown.clicked.connect(self._on_shutdown_clicked)
+        self.combo_trace_level.currentIndexChanged.connect(self._on_trace_level_changed)
+        self.chk_trace_echo.toggled.connect(self._on_trace_echo_toggled)
+        self.btn_trace_dump.clicked.connect(self._on_trace_dump_clicked)
 
         self._update_fullscreen_button_text()
 
@@ -90,6 +126,15 @@ class GeneralSettingsDialog(QDialog):
         self.chk_light_theme.setChecked(bool(getattr(self.main_window, "_light_theme_enabled", False)))
         self.chk_light_theme.blockSignals(False)
 
+        self.combo_trace_level.blockSignals(True)
+        i = self.combo_trace_level.findData(TRACE.level)
+        self.combo_trace_level.setCurrentIndex(i if i >= 0 else 0)
+        self.combo_trace_level.blockSignals(False)
+
+        self.chk_trace_echo.blockSignals(True)
+        self.chk_trace_echo.setChecked(TRACE.echo_level < trace.OFF)
+        self.chk_trace_echo.blockSignals(False)
+
         if nm.forceOffline:
             self.lbl_status.setText("Status: OFFLINE (forçado)")
         else:
@@ -110,6 +155,27 @@ class GeneralSettingsDialog(QDialog):
         if hasattr(self.main_window, "set_light_theme_enabled"):
             self.main_window.set_light_theme_enabled(bool(checked))
 
+    def _on_trace_level_changed(self, _index: int):
+        TRACE.set_level(self.combo_trace_level.currentData())
+
+    def _on_trace_echo_toggled(self, checked: bool):
+        # ligado: avisos e erros continuam aparecendo no console (padrão)
+        TRACE.set_echo_level(trace.WARN if checked else trace.OFF)
+
+    def _on_trace_dump_clicked(self):
+        default_name = time.strftime("trace_%Y%m%d_%H%M%S.txt")
+        path, _ = QFileDialog.getSaveFileName(self, "Salvar trace", default_name, "Texto (*.txt)")
+        if not path:
+            return
+
+        try:
+            n = TRACE.dump(path)
+        except Exception as e:
+            QMessageBox.critical(self, "Trace", f"Não foi possível salvar o trace.\n\nErro: {e}")
+            return
+
+        QMessageBox.information(self, "Trace", f"{n} registro(s) salvos em:\n{path}")
+
     def _on_toggle_fullscreen_clicked(self):
         if self.main_window.isFullScreen():
             self.main_window.showNormal()
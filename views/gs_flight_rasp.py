@@ -7,7 +7,7 @@ from PySide6.QtCore import Qt, QTimer, QRegularExpression
 from PySide6.QtGui import QColor, QRegularExpressionValidator
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QFrame, QLabel,
-    QPushButton, QPlainTextEdit, QCheckBox, QGroupBox, QComboBox,
+    QPushButton, QCheckBox, QGroupBox, QComboBox,
     QScrollArea, QSizePolicy, QLineEdit, QMessageBox, QApplication,
     QProgressDialog
 )
@@ -16,7 +16,10 @@ import pyqtgraph as pg
 
 from views.gs_flight_single import GSFlightSinglePage
 from views.map_widget import MapWidget
+from views.plot_lod import LodCurve
 from views.rocket_3d import Rocket3DView
+from views.telemetry import FLIGHT_SCHEMA
+from views.terminal_view import TerminalFilterBar
 
 
 class GSFlightRaspPage(GSFlightSinglePage):
@@ -429,7 +432,10 @@ class GSFlightRaspPage(GSFlightSinglePage):
         self.btn_clear = QPushButton("Limpar Terminal")
         self.btn_cfg = QPushButton("Configurações")
 
+        self.combo_ui_hz = self._make_ui_rate_combo()
+
         controls_top.addWidget(self.chk_autoscroll)
+        controls_top.addWidget(self.combo_ui_hz)
         controls_top.addSpacing(8)
         controls_top.addWidget(porta_label)
         controls_top.addWidget(self.combo_ports, 1)
@@ -513,15 +519,13 @@ class GSFlightRaspPage(GSFlightSinglePage):
         self.lbl_header.setStyleSheet("font-weight: bold; color: #bbb; font-size: 11px;")
         self.lbl_header.setAlignment(Qt.AlignCenter)
 
-        self.terminal = QPlainTextEdit()
-        self.terminal.setReadOnly(True)
+        self.terminal = self._make_terminal()
         self.terminal.setMinimumHeight(160)
         self.terminal.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
         self.terminal.setStyleSheet(
             "background: #0f0f0f; font-family: Consolas, monospace;"
         )
-        self.terminal.setLineWrapMode(QPlainTextEdit.NoWrap)
-        self.terminal.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+        self.terminal_filter = TerminalFilterBar(self.terminal, FLIGHT_SCHEMA.keys)
 
         # -------- barra de status embaixo --------
         self.lbl_status = QLabel("Desconectado")
@@ -534,6 +538,7 @@ class GSFlightRaspPage(GSFlightSinglePage):
         row2_lay.addLayout(lora_cfg_row)
         row2_lay.addWidget(self.lbl_header)
         row2_lay.addWidget(self.serial_block)
+        row2_lay.addWidget(self.terminal_filter)
         row2_lay.addWidget(self.terminal)
         row2_lay.addWidget(self.lbl_status)
 
@@ -563,9 +568,8 @@ class GSFlightRaspPage(GSFlightSinglePage):
         pg.setConfigOptions(antialias=True)
         self.alt_plot = pg.PlotWidget(title="Altitude (m) vs Tempo (s)")
         self.alt_plot.showGrid(x=True, y=True, alpha=0.3)
-        self.alt_curve = self.alt_plot.plot(
-            [], [], pen=pg.mkPen(QColor(0, 150, 255), width=2)
-        )
+        self.alt_curve = LodCurve(pen=pg.mkPen(QColor(0, 150, 255), width=2))
+        self.alt_plot.addItem(self.alt_curve)
         self.alt_plot.setMinimumHeight(240)
         self.alt_plot.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
         graph_lay.addWidget(self.alt_plot)
@@ -817,12 +821,7 @@ class GSFlightRaspPage(GSFlightSinglePage):
             self.ser.write((text.strip() + "\n").encode("utf-8"))
 
         def append_terminal(text: str):
-            self.terminal.appendPlainText(text)
-
-            if self.chk_autoscroll.isChecked():
-                self.terminal.verticalScrollBar().setValue(
-                    self.terminal.verticalScrollBar().maximum()
-                )
+            self.terminal.append_line(text, autoscroll=self.chk_autoscroll.isChecked())
 
         def finish_error(status_text: str, message_text: str):
             self._set_status(status_text, "#b00")
@@ -906,12 +905,7 @@ class GSFlightRaspPage(GSFlightSinglePage):
         # ============================================================
         # PAUSA O LEITOR SERIAL NORMAL PARA EVITAR CONFLITO
         # ============================================================
-        timer_was_active = False
-
-        try:
-            timer_was_active = self.timer_serial.isActive()
-        except Exception:
-            timer_was_active = False
+        reader_was_active = False
 
         busy = None
 
@@ -921,8 +915,7 @@ class GSFlightRaspPage(GSFlightSinglePage):
             if hasattr(self, "btn_lora_force_change"):
                 self.btn_lora_force_change.setEnabled(False)
 
-            if timer_was_active:
-                self.timer_serial.stop()
+            reader_was_active = self._stop_serial_reader()
 
             try:
                 self.ser.reset_input_buffer()
@@ -1103,5 +1096,5 @@ class GSFlightRaspPage(GSFlightSinglePage):
             if hasattr(self, "btn_lora_force_change"):
                 self.btn_lora_force_change.setEnabled(True)
 
-            if timer_was_active and self.ser and self.ser.is_open and self.connected_ok:
-                self.timer_serial.start(50)
\ No newline at end of file
+            if reader_was_active and self.ser and self.ser.is_open and self.connected_ok:
+                self._start_serial_reader()
\ No newline at end of file
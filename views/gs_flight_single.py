@@ -5,11 +5,11 @@ from typing import Optional, Tuple, List
 import sys
 import platform
 
-from PySide6.QtCore import Qt, QTimer, Slot
+from PySide6.QtCore import Qt, QTimer, QThread, Signal, Slot
 from PySide6.QtGui import QColor
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QSplitter, QFrame, QLabel,
-    QPushButton, QPlainTextEdit, QCheckBox, QGroupBox, QSizePolicy, QMessageBox, QComboBox,
+    QPushButton, QCheckBox, QGroupBox, QSizePolicy, QMessageBox, QComboBox,
     QStackedLayout, QFileDialog, QProgressDialog, QApplication, QDialog
 )
 
@@ -24,16 +24,55 @@ import time
 from dataclasses import dataclass, field
 import pyqtgraph as pg
 import math
-import re
 
 from views.net_manager import NetManager
 from views.config_dialog import ConfigDialog
 from views.map_widget import MapWidget
 from views.rocket_3d import Rocket3DView
 from views.logger import Logger
+from views.telemetry import FLIGHT_LOG_COLUMNS, FLIGHT_LOG_HEADER, FLIGHT_SCHEMA
+from views.serial_framer import LineFramer
+from views.timeseries import TimeSeriesBuffer
+from views.plot_lod import LodCurve
+from views.terminal_view import HANDSHAKE, PACKET, TerminalFilterBar, TerminalView
+from views.trace import TRACE, trace_error, trace_info, trace_warn
+
+
+# ordem das colunas do log (mesma do cabeçalho FLIGHT_LOG_HEADER escrito em connect_serial)
+LOG_COLUMNS = FLIGHT_LOG_COLUMNS
+_LOG_COLUMN_IDX = tuple(FLIGHT_SCHEMA.index[k] for k in LOG_COLUMNS)
+_LOG_COLUMN_BITS = tuple(1 << i for i in _LOG_COLUMN_IDX)
+
+# chaves do índice lateral do log (nome, coluna)
+_LOG_INDEX_KEYS = (("linha", LOG_COLUMNS.index("linha")), ("tempo", LOG_COLUMNS.index("tempo")))
+
+# colunas de eventos de voo: mudança de valor faz o logger sincronizar na hora
+_LOG_EVENT_COLUMNS = tuple(
+    LOG_COLUMNS.index(k)
+    for k in ("apogeu_h", "apogeu_t", "pqd_mn", "pqd_dn", "pqd_mb", "pqd_db")
+)
+
 
+def _last_valid(*cols: np.ndarray) -> Optional[Tuple[float, ...]]:
+    """Último índice do lote em que todas as colunas são finitas (valores como float) ou None."""
+    ok = np.isfinite(cols[0])
+    for col in cols[1:]:
+        ok &= np.isfinite(col)
+    idx = np.flatnonzero(ok)
+    if idx.size == 0:
+        return None
+    i = idx[-1]
+    return tuple(float(col[i]) for col in cols)
 
 
+def _log_batch(logger: Logger, packets: np.ndarray):
+    """Salva RAW (sem NaN do filtro do app) de cada pacote do lote; campo ausente vira None."""
+    cols = [packets[k].tolist() for k in LOG_COLUMNS]
+    for r, present in enumerate(packets["present"].tolist()):
+        logger.save_line(*[
+            col[r] if present & bit else None
+            for col, bit in zip(cols, _LOG_COLUMN_BITS)
+        ])
 
 
 def get_os_info():
@@ -54,6 +93,25 @@ class RuntimeConfig:
     # Tiles (NÃO persistir depois que fechar app)
     tiles_folder: str = ""
 
+    # Durabilidade do log: "every-line", "interval" ou "os-buffered" (ver Logger)
+    log_durability: str = "interval"
+    # grava também o log colunar binário (.cols/) ao lado do TSV
+    log_columnar: bool = True
+    # segmentos do log (0 = sem limite) + índice lateral de linha/tempo
+    log_segment_max_mb: float = 32.0
+    log_segment_max_min: float = 30.0
+
+    # taxa de atualização dos widgets (Hz), independente da taxa de pacotes
+    ui_refresh_hz: int = 20
+
+    # terminal: linhas no widget / linhas no histórico pesquisável
+    terminal_max_blocks: int = 2000
+    terminal_history_lines: int = 200_000
+
+    # gráfico de altitude: pontos máximos e janela recente em resolução cheia (s)
+    alt_plot_capacity: int = 20_000
+    alt_plot_recent_s: float = 120.0
+
     # (opcional) modo teste
     test_lat: float = 0.0
     test_lon: float = 0.0
@@ -61,6 +119,38 @@ class RuntimeConfig:
     pq_enabled: list[bool] = field(default_factory=lambda: [False]*4)
     pq_time: list[float] = field(default_factory=lambda: [0.0]*4)
 
+UI_REFRESH_RATES = (10, 15, 20, 30, 60)
+
+
+@dataclass
+class PendingUiUpdate:
+    """
+    Atualizações de tela acumuladas entre dois frames (modelo -> _render_ui).
+    None / vazio = nada novo desde o último frame.
+    """
+    serial_status: Optional[str] = None
+    valid_fields: Optional[int] = None
+    map_points: List[Tuple[float, float]] = field(default_factory=list)
+    distance: bool = False
+    latlon: Optional[Tuple[float, ...]] = None
+    horario: Optional[Tuple[float, ...]] = None
+    precisao: Optional[float] = None
+    plot: bool = False
+    apogeu: Optional[float] = None
+    sd: Optional[float] = None
+    parachutes: bool = False
+    temp: Optional[float] = None
+    euler: Optional[Tuple[float, ...]] = None
+
+    def has_updates(self) -> bool:
+        return bool(
+            self.serial_status is not None or self.map_points
+            or self.plot or self.parachutes or self.euler or self.latlon
+            or self.horario or self.precisao is not None or self.apogeu is not None
+            or self.sd is not None or self.temp is not None
+        )
+
+
 class LoadingSpinner(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -111,6 +201,76 @@ class BusySpinnerDialog(QDialog):
 
     def setLabelText(self, text: str):
         self.label.setText(text)
+
+class SerialReaderThread(QThread):
+    """
+    Thread de aquisição da serial da GS Flight (depois do handshake).
+
+    Enquanto roda, é a dona de `ser`: lê os bytes, separa as linhas, faz o
+    parse do lote (FLIGHT_SCHEMA.parse_many) e grava o log. A UI só recebe,
+    via sinal enfileirado, o lote já parseado.
+    """
+
+    batch_received = Signal(object, object)  # (linhas, array de parse_many já gravado no log)
+    overflow = Signal()                      # buffer sem '\n' passou do limite
+    error = Signal(str)
+
+    # -------- Proteções anti-lag / anti-buffer infinito --------
+    MAX_BUF_BYTES = 256_000          # corta buffer se crescer demais (256 KB)
+    MAX_LINE_BYTES = 4096            # descarta linha absurda (>4 KB)
+    EMIT_INTERVAL_S = 0.05           # agrupa linhas e entrega à UI no máximo a cada 50 ms
+
+    def __init__(self, ser: serial.Serial, logger: Optional[Logger] = None, parent=None):
+        super().__init__(parent)
+        self.ser = ser
+        self.logger = logger
+        self._running = False
+
+    def run(self):
+        self._running = True
+
+        framer = LineFramer(max_buf_bytes=self.MAX_BUF_BYTES, max_line_bytes=self.MAX_LINE_BYTES)
+        pending: List[str] = []
+        last_emit = time.monotonic()
+
+        while self._running:
+            try:
+                # bloqueia no máximo ser.timeout esperando o 1º byte
+                chunk = self.ser.read(max(1, self.ser.in_waiting))
+            except Exception as e:
+                self.error.emit(str(e))
+                break
+
+            if chunk:
+                # se buffer explodiu (ex.: sem \n por muito tempo), o framer corta o mais antigo
+                if framer.feed(chunk):
+                    self.overflow.emit()
+
+                pending.extend(framer.decoded_lines())
+
+            now = time.monotonic()
+            if pending and now - last_emit >= self.EMIT_INTERVAL_S:
+                self._emit_batch(pending)
+                pending = []
+                last_emit = now
+
+        if pending:
+            self._emit_batch(pending)
+
+    def _emit_batch(self, lines: List[str]):
+        batch = FLIGHT_SCHEMA.parse_many(lines)
+
+        if self.logger:
+            try:
+                _log_batch(self.logger, batch[batch["present"] != 0])
+            except Exception as e:
+                self.error.emit(f"logger: {e}")
+
+        self.batch_received.emit(lines, batch)
+
+    def stop(self):
+        self._running = False
+
         
 class GSFlightSinglePage(QWidget):
    
@@ -124,14 +284,26 @@ class GSFlightSinglePage(QWidget):
 
         self.os_system = get_os_info()
         self.is_linux = self.os_system == "linux"
-        print(f"[GS_FLIGHT]: Running on OS: {self.os_system}, Linux mode: {self.is_linux}")
+        trace_info("GS_FLIGHT", f"Running on OS: {self.os_system}, Linux mode: {self.is_linux}")
 
         self._build_ui(self.os_system)
         self._reset_state()
 
+        # render da UI em taxa fixa: pacotes só atualizam self._pending_ui
+        self.timer_render = QTimer(self)
+        self.timer_render.timeout.connect(self._render_ui)
+        self.set_ui_refresh_hz(self.runtime_cfg.ui_refresh_hz)
+        self.timer_render.start()
+
         self.ser = None   # objeto serial
-        self.timer_serial = QTimer(self)
-        self.timer_serial.timeout.connect(self._read_serial)
+        self._serial_reader: Optional[SerialReaderThread] = None  # dono de self.ser após o handshake
+
+        # não deixa a thread de leitura viva quando o app fecha
+        # (e depois grava o que faltar na fila do logger)
+        app = QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self._stop_serial_reader)
+            app.aboutToQuit.connect(self._close_logger)
         self.connected_ok = False
         
         self.lastvalue_dn = 0.0
@@ -323,7 +495,10 @@ class GSFlightSinglePage(QWidget):
         self.btn_disconnect = QPushButton("Desconectar")
         self.btn_disconnect.setMaximumHeight(24)
 
+        self.combo_ui_hz = self._make_ui_rate_combo()
+
         lg.addWidget(self.chk_autoscroll)
+        lg.addWidget(self.combo_ui_hz)
         lg.addWidget(QLabel("Porta:"))
         lg.addWidget(self.combo_ports)
         lg.addWidget(self.btn_connect)
@@ -395,9 +570,8 @@ class GSFlightSinglePage(QWidget):
 
 
         # --- terminal ---
-        self.terminal = QPlainTextEdit()
-        self.terminal.setReadOnly(True)
-        self.terminal.setMinimumSize(300, 200)  
+        self.terminal = self._make_terminal()
+        self.terminal.setMinimumSize(300, 200)
         self.terminal.setStyleSheet("""
             QPlainTextEdit {
                 background: #0f0f0f;
@@ -406,8 +580,7 @@ class GSFlightSinglePage(QWidget):
                 border: 1px solid #3a3a3a;
             }
         """)
-        self.terminal.setLineWrapMode(QPlainTextEdit.NoWrap)
-        self.terminal.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+        self.terminal_filter = TerminalFilterBar(self.terminal, FLIGHT_SCHEMA.keys)
 
         # --- header ---
         self.lbl_header = QLabel("Terminal de Dados")
@@ -418,6 +591,7 @@ class GSFlightSinglePage(QWidget):
         term_layout = QVBoxLayout(term_widget)
         term_layout.setContentsMargins(0, 0, 0, 0)
         term_layout.addWidget(self.lbl_header)
+        term_layout.addWidget(self.terminal_filter)
         term_layout.addWidget(self.terminal)
 
         # adiciona no lado esquerdo
@@ -456,7 +630,8 @@ class GSFlightSinglePage(QWidget):
         pg.setConfigOptions(antialias=True)
         self.alt_plot = pg.PlotWidget(title="Altitude (m) vs Tempo (s)")
         self.alt_plot.showGrid(x=True, y=True, alpha=0.3)
-        self.alt_curve = self.alt_plot.plot([], [], pen=pg.mkPen(QColor(0, 150, 255), width=2))
+        self.alt_curve = LodCurve(pen=pg.mkPen(QColor(0, 150, 255), width=2))
+        self.alt_plot.addItem(self.alt_curve)
         self.alt_plot.setMinimumHeight(250)
         right_lay.addWidget(self.alt_plot, stretch=2)
 
@@ -749,8 +924,11 @@ class GSFlightSinglePage(QWidget):
         self.t_last: Optional[float] = None
         self.alt_last: Optional[float] = None
         self.alt_max: float = float("-inf")
-        self.series_t: List[float] = []
-        self.series_alt: List[float] = []
+        # histórico do gráfico de altitude (t, alt) em arrays NumPy
+        self.alt_series = TimeSeriesBuffer(
+            capacity=self.runtime_cfg.alt_plot_capacity,
+            recent_s=self.runtime_cfg.alt_plot_recent_s,
+        )
         self.last_latlon: Optional[Tuple[float, float]] = None
         self.base_latlon: Optional[Tuple[float, float]] = None  # para distância
         self.alt_max: float = float("-inf")
@@ -762,7 +940,10 @@ class GSFlightSinglePage(QWidget):
         self.minuto: float = 0.0
 
         self.temperatura: Optional[float] = None
-        
+
+        # descarta o que ainda não foi desenhado
+        self._pending_ui = PendingUiUpdate()
+
         # reset paraquedas
         for i in range(4):
             self._set_pq(i, 0.0)
@@ -783,32 +964,6 @@ class GSFlightSinglePage(QWidget):
         except Exception:
             return None
 
-    def _in_range(self, name: str, v: float) -> bool:
-        # ranges “seguros” (ajuste como quiser)
-        R = {
-            "linha": (0, 1e9),
-            "tempo": (0, 1e9),
-            "latitude": (-90.0, 90.0),
-            "longitude": (-180.0, 180.0),
-            "hora": (0, 23),
-            "minuto": (0, 59),
-            "precisao": (0.0, 101.0),         # HDOP
-            "altitude": (-15000.0, 15000.0),
-            "sd": (0.0, 1.0),
-            "apogeu_h": (-15000.0, 15000.0),
-            "apogeu_t": (0.0, 1e9),
-            "pqd_mn": (-15000.0, 15000.0),
-            "pqd_dn": (-15000.0, 15000.0),
-            "pqd_mb": (-15000.0, 15000.0),
-            "pqd_db": (-15000.0, 15000.0),
-            "temp": (-80.0, 150.0),
-            "roll": (-720.0, 720.0),
-            "pitch": (-720.0, 720.0),
-            "yaw": (-720.0, 720.0),
-        }
-        lo, hi = R.get(name, (-float("inf"), float("inf")))
-        return lo <= v <= hi
-
     def _fmt(self, v, fmt="{:.2f}"):
         return fmt.format(v) if self._is_ok(v) else "—"
 
@@ -921,200 +1076,186 @@ class GSFlightSinglePage(QWidget):
 
     #     return raw, app
 
-    def _parse_packet(self, line: str):
-        if not line:
-            return None
-
-        line = line.strip()
-
-        LIST = [
-            "linha", "tempo", "latitude", "longitude", "hora", "minuto", "precisao",
-            "altitude", "sd", "apogeu_h", "apogeu_t",
-            "pqd_dn", "pqd_db", "pqd_mn", "pqd_mb",
-            "temp", "roll", "pitch", "yaw"
-        ]
-
-        # Tabela chave valor
-        TAG = {
-            "L": "linha",
-            "T": "tempo",
-            "A": "latitude",
-            "O": "longitude",
-
-            "h": "hora",
-            "n": "minuto",
-            "g": "precisao",
-
-            "H": "altitude",
-            "s": "sd",
-
-            "a": "apogeu_h",
-            "t": "apogeu_t",
-
-            "D": "pqd_dn",   
-            "d": "pqd_db",   
-            "N": "pqd_mn",   
-            "B": "pqd_mb",
-
-            "c": "temp",
-
-            "R": "roll",
-            "P": "pitch",
-            "Y": "yaw",
-        }
-
-        # Número com sinal, decimal e notação científica
-        NUM = r"[-+]?(?:(?:\d+\.\d*)|(?:\.\d+)|(?:\d+))(?:[eE][-+]?\d+)?"
-
-        # Formatos aceitos:
-        # H3000
-        # T342.17
-        # R-1.55
-        # A0.000000
-        tokens = re.findall(rf"([A-Za-z])\s*({NUM})", line)
-
-        if not tokens:
-            return None
-
-        raw = {k: None for k in LIST}
-        app = {k: self.NAN for k in LIST}
-
-        used_keys = set()
-
-        for key_txt, value_txt in tokens:
-
-            key_txt = key_txt.strip()
-
-            key = TAG.get(key_txt)
-
-            # ignora chave desconhecida
-            if key is None:
-                continue
+    def feed_line(self, line: str):
+        """Processa uma linha isolada (mesmo caminho do lote)."""
+        self.feed_lines([line])
 
-            # ignora chave duplicada no mesmo pacote
-            if key in used_keys:
-                continue
+    def feed_lines(self, lines: List[str]):
+        """
+        Processa de uma vez um lote de linhas (fora da thread da serial:
+        injeção manual / simulação). Faz parse, grava o log e atualiza a UI.
+        """
+        if not lines:
+            return
 
-            used_keys.add(key)
+        batch = FLIGHT_SCHEMA.parse_many(lines)
 
-            num = self._to_float(value_txt)
+        if self.logger:
+            _log_batch(self.logger, batch[batch["present"] != 0])
 
-            # salva RAW sempre
-            raw[key] = num
+        self._apply_batch(lines, batch)
 
-            # valida número para uso no app
-            if num is not None and self._in_range(key, num):
-                app[key] = num
-            else:
-                app[key] = self.NAN
+    @Slot(object, object)
+    def _on_serial_batch(self, lines: List[str], batch: np.ndarray):
+        """Lote vindo da SerialReaderThread (já parseado e gravado no log)."""
+        if self._serial_reader is None:
+            return
+        self._apply_batch(lines, batch)
 
-        return raw, app
+    def _apply_batch(self, lines: List[str], batch: np.ndarray):
+        """
+        Atualiza o modelo com um lote parseado (array de FLIGHT_SCHEMA.parse_many).
 
+        Nada de widget aqui: o lote só acumula em self._pending_ui (último valor
+        válido de cada campo, linhas do terminal, pontos do mapa) e no histórico
+        do gráfico; _render_ui aplica isso na taxa de atualização da UI.
+        """
+        ui = self._pending_ui
 
-    def feed_line(self, line: str):
-        self._hz_counter += 1
+        self._hz_counter += len(lines)
 
         # marcou que recebeu algo (para watchdog)
         self._last_rx_time = time.time()
 
-        parsed = self._parse_packet(line)
-
-        # Mostra linha bruta formatada (substitui TAB por espaço)
-        # ui_line = line.replace("\t", " ")
-        # self.terminal.appendPlainText(ui_line)
-
-        # Mostra linha bruta original (com TAB, para debug)
-        self.terminal.appendPlainText(line)
-
+        # linhas brutas originais (com TAB) vão para o histórico; o widget recebe no frame
+        self.terminal.queue_lines(lines, PACKET, batch["valid"].tolist())
 
         # ---------------- STATUS SERIAL ----------------
-        if not parsed:
+        packets = batch[batch["present"] != 0]
+        if len(packets) == 0:
             # string veio quebrada
-            self._set_serial_status("bad")
+            ui.serial_status = "bad"
             return
 
-        raw, app = parsed
-
-        #  buzzer beep a cada linha valida recebida 
+        #  buzzer beep a cada lote com linha valida recebida
         self._serial_rx_beep()
 
-        # ================= DEBUG TERMINAL =================
-        print("------- Linha {} -------".format(app["linha"] if self._is_ok(app["linha"]) else "?"))
-
-        for key, value in app.items():
-            if self._is_ok(value):
-                print(f"[{key.upper()}] = {value}")
-            else:
-                print(f"[{key.upper()}] = INVALID")
-
-        # ============================================
+        # app: colunas validadas pelo range (NaN onde falhou)
+        app = {k: FLIGHT_SCHEMA.column(packets, k) for k in FLIGHT_SCHEMA.keys}
+
+        # diagnóstico: só com trace em DEBUG (linha bruta + campos inválidos)
+        if TRACE.debug:
+            for line, present, valid in zip(lines, batch["present"], batch["valid"]):
+                if present:
+                    TRACE.packet("gs_flight", line, FLIGHT_SCHEMA.invalid_keys(valid))
+
+        # -------- STATUS (último pacote do lote) --------
+        valid_mask = int(packets["valid"][-1])
+        ui.valid_fields = bin(valid_mask).count("1")
+        ui.serial_status = "ok" if valid_mask == FLIGHT_SCHEMA.full_mask else "bad"
+
+        # ---- APP: usa APP (com NaN onde falhou); o RAW já foi para o logger ----
+
+        # GPS/mapa: todos os pontos válidos do lote vão para o mapa
+        latitude, longitude = app["latitude"], app["longitude"]
+        gps_ok = np.isfinite(latitude) & np.isfinite(longitude)
+        gps_fix = gps_ok & (latitude != 0.0) & (longitude != 0.0)
+        if gps_fix.any():
+            ui.map_points.extend(zip(latitude[gps_fix].tolist(), longitude[gps_fix].tolist()))
+            self.last_latlon = ui.map_points[-1]
+            ui.distance = True
+
+        ui.latlon = _last_valid(latitude, longitude) or ui.latlon
+        ui.horario = _last_valid(app["hora"], app["minuto"]) or ui.horario
+
+        last = _last_valid(app["precisao"])
+        if last:
+            ui.precisao = last[0]
+
+        # altitude + gráfico: histórico estendido de uma vez
+        tempo, altitude = app["tempo"], app["altitude"]
+        alt_ok = np.isfinite(tempo) & np.isfinite(altitude)
+        if alt_ok.any():
+            self.alt_series.extend(tempo[alt_ok], altitude[alt_ok])
+            ui.plot = True
+
+        last = _last_valid(app["apogeu_h"])
+        if last:
+            ui.apogeu = last[0]
+
+        last = _last_valid(app["sd"])
+        if last:
+            ui.sd = last[0]
+
+        # Paraquedas: guarda o último valor válido de cada um
+        last = _last_valid(app["pqd_dn"])
+        if last:
+            self.lastvalue_dn = last[0]
+        last = _last_valid(app["pqd_db"])
+        if last:
+            self.lastvalue_db = last[0]
+        last = _last_valid(app["pqd_mn"])
+        if last:
+            self.lastvalue_mn = last[0]
+        last = _last_valid(app["pqd_mb"])
+        if last:
+            self.lastvalue_mb = last[0]
+        ui.parachutes = True
+
+        last = _last_valid(app["temp"])
+        if last:
+            ui.temp = last[0]
 
-        # -------- STATUS POR LINHA --------
-        total_fields = len(app)
-        valid_fields = sum(1 for v in app.values() if self._is_ok(v))
-
-        self.lbl_serial_packets.setText(f"{valid_fields}/{total_fields}")
+        # Euler só se vierem válidos (senão não atualiza 3D)
+        ui.euler = _last_valid(app["roll"], app["pitch"], app["yaw"]) or ui.euler
+
+    # ---------- render (taxa da UI) ----------
+    def set_ui_refresh_hz(self, hz: int):
+        """Taxa de atualização dos widgets (independente da taxa de pacotes)."""
+        hz = max(1, min(60, int(hz)))
+        self.runtime_cfg.ui_refresh_hz = hz
+        self.timer_render.setInterval(int(round(1000 / hz)))
+
+    def _make_terminal(self) -> TerminalView:
+        return TerminalView(
+            max_blocks=self.runtime_cfg.terminal_max_blocks,
+            history_lines=self.runtime_cfg.terminal_history_lines,
+            full_mask=FLIGHT_SCHEMA.full_mask,
+        )
 
-        if valid_fields == total_fields:
-            self._set_serial_status("ok")
-        else:
-            self._set_serial_status("bad")
-        # ----------------------------------
+    def _make_ui_rate_combo(self) -> QComboBox:
+        combo = QComboBox()
+        combo.setMaximumHeight(24)
+        combo.setToolTip("Taxa de atualização da tela (independente da taxa de telemetria)")
+        for hz in UI_REFRESH_RATES:
+            combo.addItem(f"UI {hz} Hz", hz)
+        combo.setCurrentIndex(combo.findData(self.runtime_cfg.ui_refresh_hz))
+        combo.currentIndexChanged.connect(lambda _i: self.set_ui_refresh_hz(combo.currentData()))
+        return combo
 
-        # ------------------------------------------------
+    @Slot()
+    def _render_ui(self):
+        """Empurra para os widgets só o estado mais recente acumulado desde o último frame."""
+        # terminal: um append com as linhas do frame
+        self.terminal.flush(self.chk_autoscroll.isChecked())
 
+        ui = self._pending_ui
+        if not ui.has_updates():
+            return
+        self._pending_ui = PendingUiUpdate()
 
-        # ---- 1) LOGGER: salva RAW (sem NaN do filtro do app) ----
-        if self.logger:
-            self.logger.save_line(
-                raw["linha"], raw["tempo"], raw["latitude"], raw["longitude"],
-                raw["hora"], raw["minuto"], raw["precisao"], raw["altitude"], raw["sd"],
-                raw["apogeu_h"], raw["apogeu_t"],
-                raw["pqd_mn"], raw["pqd_dn"], raw["pqd_mb"], raw["pqd_db"],
-                raw["temp"], raw["roll"], raw["pitch"], raw["yaw"]
-            )
+        if ui.serial_status is not None:
+            if ui.valid_fields is not None:
+                self.lbl_serial_packets.setText(f"{ui.valid_fields}/{FLIGHT_SCHEMA.size}")
+            self._set_serial_status(ui.serial_status)
 
-        # ---- 2) APP: usa APP (com NaN onde falhou) ----
-        linha      = app["linha"]
-        tempo      = app["tempo"]
-        latitude   = app["latitude"]
-        longitude  = app["longitude"]
-        hora       = app["hora"]
-        minuto     = app["minuto"]
-        precisao   = app["precisao"]
-        altitude   = app["altitude"]
-        sd         = app["sd"]
-        apogeu_h   = app["apogeu_h"]
-        pqd_mn     = app["pqd_mn"]
-        pqd_dn     = app["pqd_dn"]
-        pqd_mb     = app["pqd_mb"]
-        pqd_db     = app["pqd_db"]
-        temperatura= app["temp"]
-        roll       = app["roll"]
-        pitch      = app["pitch"]
-        yaw        = app["yaw"]
-
-        # Auto-scroll
-        if self.chk_autoscroll.isChecked():
-            self.terminal.verticalScrollBar().setValue(
-                self.terminal.verticalScrollBar().maximum()
-            )
+        if ui.map_points:
+            self.map.add_points(ui.map_points)
+            self.map.flush_points()
+        if ui.distance:
+            self._update_distance()
 
-        # GPS/mapa: só processa se não for NaN
-        if self._is_ok(latitude) and self._is_ok(longitude):
-            if latitude != 0.0 and longitude != 0.0:
-                self.last_latlon = (latitude, longitude)
-                self.map.add_point(latitude, longitude)
-                self._update_distance()
-            self.lbl_lat.setText(self._fmt(latitude, "{:.6f}"))
-            self.lbl_lon.setText(self._fmt(longitude, "{:.6f}"))
+        if ui.latlon:
+            self.lbl_lat.setText(self._fmt(ui.latlon[0], "{:.6f}"))
+            self.lbl_lon.setText(self._fmt(ui.latlon[1], "{:.6f}"))
 
         # horário: só se válido
-        if self._is_ok(hora) and self._is_ok(minuto):
-            self.lbl_horario.setText(f"{int(hora):02d}:{int(minuto):02d}")
+        if ui.horario:
+            self.lbl_horario.setText(f"{int(ui.horario[0]):02d}:{int(ui.horario[1]):02d}")
 
         # precisão
-        if self._is_ok(precisao):
+        if ui.precisao is not None:
+            precisao = ui.precisao
             if precisao <= 1.0:
                 color = "green"
             elif precisao <= 2.5:
@@ -1125,49 +1266,32 @@ class GSFlightSinglePage(QWidget):
                 color = "red"
             self.lbl_precisao.setStyleSheet(f"background: {color}; border: 1px solid #ccc; border-radius: 6px;")
 
-        # altitude + gráfico
-        if self._is_ok(altitude) and self._is_ok(tempo):
-            self.series_t.append(tempo)
-            self.series_alt.append(altitude)
-            self.alt_curve.setData(self.series_t, self.series_alt)
+        # altitude + gráfico: um único setData por frame
+        if ui.plot and len(self.alt_series):
+            self._update_altitude_plot()
+            self.lbl_alt_max.setText(self._fmt(float(self.alt_series.y[-1]), "{:.2f}"))
 
-            if len(self.series_t) >= 2:
-                dt = self.series_t[-1] - self.series_t[-2]
-                if dt > 1e-6:
-                    vel = (self.series_alt[-1] - self.series_alt[-2]) / dt
-                    self.lbl_vel.setText(self._fmt(vel, "{:.2f}"))
-            self.lbl_alt_max.setText(self._fmt(altitude, "{:.2f}"))
-
-        if self._is_ok(apogeu_h):
-            self.lbl_alt_apogeu.setText(self._fmt(apogeu_h, "{:.2f}"))
+        if ui.apogeu is not None:
+            self.lbl_alt_apogeu.setText(self._fmt(ui.apogeu, "{:.2f}"))
 
         # SD
-        if self._is_ok(sd):
-            self.sd_box.setStyleSheet("background: green; border: 1px solid #ccc; border-radius: 6px;" if sd == 1 else
+        if ui.sd is not None:
+            self.sd_box.setStyleSheet("background: green; border: 1px solid #ccc; border-radius: 6px;" if ui.sd == 1 else
                                     "background: red; border: 1px solid #ccc; border-radius: 6px;")
 
-        # Paraquedas 
-        if self._is_ok(pqd_dn):
-            self.lastvalue_dn = self._is_ok(pqd_dn)
-        if self._is_ok(pqd_db):
-            self.lastvalue_db = self._is_ok(pqd_db)
-        if self._is_ok(pqd_mn):
-            self.lastvalue_mn = self._is_ok(pqd_mn)
-        if self._is_ok(pqd_mb):
-            self.lastvalue_mb = self._is_ok(pqd_mb)
-        
-        self._set_pq(0, pqd_dn if self._is_ok(pqd_dn) else self.lastvalue_dn)
-        self._set_pq(1, pqd_db if self._is_ok(pqd_db) else self.lastvalue_db)
-        self._set_pq(2, pqd_mn if self._is_ok(pqd_mn) else self.lastvalue_mn)
-        self._set_pq(3, pqd_mb if self._is_ok(pqd_mb) else self.lastvalue_mb )
+        if ui.parachutes:
+            self._set_pq(0, self.lastvalue_dn)
+            self._set_pq(1, self.lastvalue_db)
+            self._set_pq(2, self.lastvalue_mn)
+            self._set_pq(3, self.lastvalue_mb)
 
-        if self._is_ok(temperatura):
-            self.lbl_temp.setText(self._fmt(temperatura, "{:.2f}"))
+        if ui.temp is not None:
+            self.lbl_temp.setText(self._fmt(ui.temp, "{:.2f}"))
 
-        # Euler só se vierem válidos (senão não atualiza 3D)
-        if self._is_ok(roll) and self._is_ok(pitch) and self._is_ok(yaw):
+        if ui.euler:
+            roll, pitch, yaw = ui.euler
             self.set_orientation(roll=roll, pitch=pitch, yaw=yaw, degrees=True)
-    
+
     @Slot()
     def _update_hz_display(self):
         now = time.time()
@@ -1211,18 +1335,25 @@ class GSFlightSinglePage(QWidget):
     def inject_altitude(self, alt: float, t: Optional[float] = None):
         """Injeta altitude manual (modo teste)."""
         if t is None:
-            t = self.series_t[-1] + 0.1 if self.series_t else 0.0
-        self.series_t.append(t)
-        self.series_alt.append(alt)
-        self.alt_curve.setData(self.series_t, self.series_alt)
+            t = float(self.alt_series.t[-1]) + 0.1 if len(self.alt_series) else 0.0
+        self.alt_series.append(t, alt)
+        self._update_altitude_plot()
         if alt > self.alt_max:
             self.alt_max = alt
             self.lbl_alt_max.setText(f"{self.alt_max:.2f}")
-        if len(self.series_t) >= 2:
-            dt = self.series_t[-1] - self.series_t[-2]
+
+    def _update_altitude_plot(self):
+        """Passa o histórico ao gráfico (a LodCurve só copia o final novo) e atualiza a velocidade."""
+        series = self.alt_series
+        self.alt_curve.setData(series.t, series.y)
+
+        if len(series) >= 2:
+            t = series.t
+            y = series.y
+            dt = t[-1] - t[-2]
             if dt > 1e-6:
-                vel = (self.series_alt[-1] - self.series_alt[-2]) / dt
-                self.lbl_vel.setText(f"{vel:.2f}")
+                vel = (y[-1] - y[-2]) / dt
+                self.lbl_vel.setText(self._fmt(float(vel), "{:.2f}"))
 
     # def set_parachute_state(self, idx: int, activated: bool, t_s: float):
     #     """Define estado e tempo de disparo de um paraquedas."""
@@ -1315,54 +1446,47 @@ class GSFlightSinglePage(QWidget):
         self.feed_line(line)
 
     # ---------- serial --------------
-    def _read_serial(self):
-        if not (self.ser and self.ser.is_open):
+    def _start_serial_reader(self):
+        """Passa self.ser para a thread de aquisição (chamar depois do handshake)."""
+        if self._serial_reader is not None or not (self.ser and self.ser.is_open):
             return
 
-        if not hasattr(self, "_rx_buf"):
-            self._rx_buf = b""
-
-        try:
-            n = self.ser.in_waiting
-            if n <= 0:
-                return
-
-            chunk = self.ser.read(n)
-            if not chunk:
-                return
-
-            self._rx_buf += chunk
-
-            # -------- Proteções anti-lag / anti-buffer infinito --------
-            MAX_LINES_PER_TICK = 50          # processa no máximo 50 linhas por tick do timer
-            MAX_BUF_BYTES = 256_000          # corta buffer se crescer demais (256 KB)
-            MAX_LINE_BYTES = 4096            # descarta linha absurda (>4 KB)
-
-            # se buffer explodiu (ex.: sem \n por muito tempo), corta o mais antigo
-            if len(self._rx_buf) > MAX_BUF_BYTES:
-                self._rx_buf = self._rx_buf[-MAX_BUF_BYTES:]
-                self._set_serial_status("bad")  # indica que algo estranho aconteceu
-
-            processed = 0
-            while b"\n" in self._rx_buf and processed < MAX_LINES_PER_TICK:
-                raw_line, self._rx_buf = self._rx_buf.split(b"\n", 1)
-                raw_line = raw_line.strip(b"\r")
-                if not raw_line:
-                    continue
+        reader = SerialReaderThread(self.ser, logger=self.logger, parent=self)
+        reader.batch_received.connect(self._on_serial_batch)
+        reader.overflow.connect(self._on_serial_overflow)
+        reader.error.connect(self._on_serial_error)
+        reader.finished.connect(self._on_serial_reader_finished)
+        self._serial_reader = reader
+        reader.start()
 
-                if len(raw_line) > MAX_LINE_BYTES:
-                    processed += 1
-                    continue
+    def _stop_serial_reader(self) -> bool:
+        """
+        Para a thread de aquisição e devolve self.ser para a thread da UI
+        (handshake, configuração LoRa, desconexão). Retorna se estava rodando.
+        """
+        reader = self._serial_reader
+        if reader is None:
+            return False
 
-                line = raw_line.decode(errors="ignore").strip()
-                if line:
-                    self.feed_line(line)
+        self._serial_reader = None
+        reader.stop()
+        if not reader.wait(2000):
+            trace_warn("SERIAL", "Thread de leitura não terminou a tempo")
+        return True
 
-                processed += 1
+    @Slot()
+    def _on_serial_overflow(self):
+        self._set_serial_status("bad")  # indica que algo estranho aconteceu
 
-        except Exception as e:
-            print("Erro serial (read_serial):", e)
+    @Slot(str)
+    def _on_serial_error(self, msg: str):
+        trace_error("SERIAL", f"Erro serial (reader): {msg}")
 
+    @Slot()
+    def _on_serial_reader_finished(self):
+        # thread terminou sozinha (erro de leitura: porta caiu / foi removida)
+        if self._serial_reader is not None and self._serial_reader.isFinished():
+            self._force_disconnect_serial(reason="Erro: Serial desconectada")
 
     def _clear_terminal(self):
         """Limpa o terminal e, se não houver conexão ativa, reseta o status."""
@@ -1415,22 +1539,14 @@ class GSFlightSinglePage(QWidget):
                 return
 
             if self.logger:
-                self.logger.write_header([
-                    "linha", "tempo.s", "lat.GPS", "lon.GPS", "hora.GPS", "min.GPS",
-                    "precisao.GPS", "baro.h.m", "sd.ok.bool", "apogeu.h.m", "apogeu.t.s",
-                    "pqd.mainN.m", "pqd.drogueN.m", "pqd.mainB.m", "pqd.drogueB.m",
-                    "temperatura", "roll", "pitch", "yaw"
-                ])
+                self.logger.write_header(list(FLIGHT_LOG_HEADER))
 
             # abre serial
             self.ser = serial.Serial(port, 115200, timeout=0.2)
             self.connected_ok = False
 
-            # durante o handshake, não deixa o timer paralelo lendo ao mesmo tempo
-            try:
-                self.timer_serial.stop()
-            except Exception:
-                pass
+            # durante o handshake, não deixa a thread de leitura lendo ao mesmo tempo
+            self._stop_serial_reader()
 
             # limpa buffers
             try:
@@ -1513,12 +1629,12 @@ class GSFlightSinglePage(QWidget):
                 busy.close()
 
             
-            self.terminal.appendPlainText("                                                                                                 UFABC Rocket Design")
-            self.terminal.appendPlainText("                                                                                                 Ground Station Online")
-            self.terminal.appendPlainText("-------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------")
+            self.terminal.append_line("                                                                                                 UFABC Rocket Design")
+            self.terminal.append_line("                                                                                                 Ground Station Online")
+            self.terminal.append_line("-------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------")
 
-            
-            self.timer_serial.start(50)
+
+            self._start_serial_reader()
 
         except serial.SerialException as e:
             self._cleanup_serial_on_error()
@@ -1545,27 +1661,18 @@ class GSFlightSinglePage(QWidget):
     def _force_disconnect_serial(self, reason: str = "Desconectado", send_rst: bool = False):
         ser = self.ser
 
-        try:
-            if self.timer_serial.isActive():
-                self.timer_serial.stop()
-        except Exception:
-            pass
+        self._stop_serial_reader()
 
         self.ser = None
         self.connected_ok = False
 
-        try:
-            self._rx_buf = b""
-        except Exception:
-            pass
-
         if ser is not None and send_rst:
             try:
                 if getattr(ser, "is_open", False):
                     ser.write(b"RST\n")
                     ser.flush()
             except Exception as e:
-                print("[SERIAL] Não foi possível enviar RST antes de desconectar:", e)
+                trace_warn("SERIAL", f"Não foi possível enviar RST antes de desconectar: {e}")
 
         if ser is not None:
             try:
@@ -1584,7 +1691,7 @@ class GSFlightSinglePage(QWidget):
                 if getattr(ser, "is_open", False):
                     ser.close()
             except Exception as e:
-                print("[SERIAL] Erro ignorado ao fechar porta:", e)
+                trace_info("SERIAL", f"Erro ignorado ao fechar porta: {e}")
 
         try:
             self._set_status(reason, "#666")
@@ -1729,12 +1836,7 @@ class GSFlightSinglePage(QWidget):
         if self._is_boot_noise_line(line):
             return
 
-        self.terminal.appendPlainText(line)
-
-        if self.chk_autoscroll.isChecked():
-            self.terminal.verticalScrollBar().setValue(
-                self.terminal.verticalScrollBar().maximum()
-            )
+        self.terminal.append_line(line, HANDSHAKE, self.chk_autoscroll.isChecked())
 
 
     def _drain_serial_input(self, seconds: float = 1.0):
@@ -1848,11 +1950,7 @@ class GSFlightSinglePage(QWidget):
 
 
     def _cleanup_serial_on_error(self):
-        try:
-            if self.timer_serial.isActive():
-                self.timer_serial.stop()
-        except Exception:
-            pass
+        self._stop_serial_reader()
 
         try:
             if self.ser and self.ser.is_open:
@@ -1906,6 +2004,9 @@ class GSFlightSinglePage(QWidget):
         self.serial_beep_enabled = bool(enabled)
 
     def reset_altitude_graph(self):
+        if hasattr(self, "alt_series"):
+            self.alt_series.clear()
+
         try:
             self.alt_curve.setData([], [])
         except Exception:
@@ -1928,6 +2029,9 @@ class GSFlightSinglePage(QWidget):
     
     # -------- Controle de execução --------
     def pause(self):
+        # widgets
+        self.timer_render.stop()
+
         # mapa
         if hasattr(self, "map"):
             self.map.page().runJavaScript("if(window.pauseRender) pauseRender();")
@@ -1937,6 +2041,10 @@ class GSFlightSinglePage(QWidget):
             self.rocket3d.pause()
 
     def resume(self):
+        # widgets: aplica o que acumulou enquanto estava pausado
+        self._render_ui()
+        self.timer_render.start()
+
         # mapa
         if hasattr(self, "map"):
             self.map.page().runJavaScript("if(window.resumeRender) resumeRender();")
@@ -1945,6 +2053,10 @@ class GSFlightSinglePage(QWidget):
         if hasattr(self, "rocket3d"):
             self.rocket3d.resume()
 
+    def _close_logger(self):
+        if self.logger:
+            self.logger.close()
+
     def ask_logger(self):
             reply = QMessageBox.question(
                 self,
@@ -1961,10 +2073,21 @@ class GSFlightSinglePage(QWidget):
                     "Text Files (*.txt)"
                 )
                 if filename:
-                    self.logger = Logger(filename)
+                    self.logger = Logger(
+                        filename,
+                        durability=self.runtime_cfg.log_durability,
+                        event_columns=_LOG_EVENT_COLUMNS,
+                        columnar=self.runtime_cfg.log_columnar,
+                        segment_max_bytes=int(self.runtime_cfg.log_segment_max_mb * 1024 * 1024),
+                        segment_max_s=self.runtime_cfg.log_segment_max_min * 60.0,
+                        index_keys=_LOG_INDEX_KEYS,
+                    )
                 else:
                     self.logger = None
 
+                if self._serial_reader is not None:
+                    self._serial_reader.logger = self.logger
+
 
 
 
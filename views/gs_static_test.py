@@ -1,7 +1,7 @@
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QSplitter, QLabel,
     QPushButton, QPlainTextEdit, QGroupBox, QComboBox,
-    QMessageBox, QFileDialog, QInputDialog
+    QMessageBox, QFileDialog, QInputDialog, QApplication
 )
 from PySide6.QtCore import Qt, QTimer
 import pyqtgraph as pg
@@ -9,6 +9,8 @@ import serial, time
 import serial.tools.list_ports
 
 from views.logger import Logger
+from views.serial_framer import LineFramer
+from views.trace import trace_warn
 
 
 class GSTestEstaticoPage(QWidget):
@@ -18,6 +20,7 @@ class GSTestEstaticoPage(QWidget):
 
         # estado serial
         self.ser = None
+        self.framer = LineFramer()
         self.timer_serial = QTimer(self)
         self.timer_serial.timeout.connect(self._read_serial)
         self.connected_ok = False
@@ -42,6 +45,11 @@ class GSTestEstaticoPage(QWidget):
         self.logger = None
         QTimer.singleShot(100, self.ask_logger)
 
+        # grava o que faltar na fila do logger quando o app fecha
+        app = QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self._close_logger)
+
     # ---------------- UI ----------------
     def _build_ui(self):
         root = QVBoxLayout(self)
@@ -224,6 +232,7 @@ class GSTestEstaticoPage(QWidget):
                 QMessageBox.information(self, "Conexão", f"Já está conectado em {self.ser.port}")
                 return
             self.ser = serial.Serial(port, 115200, timeout=0.2)
+            self.framer.clear()
             self.timer_serial.start(50)
             self.ser.write(b"RST\n")
             time.sleep(1)
@@ -252,63 +261,21 @@ class GSTestEstaticoPage(QWidget):
     def _read_serial(self):
         if self.ser and self.ser.is_open:
             try:
-                line = self.ser.readline().decode(errors="ignore").strip()
-                if not line:
-                    return
-                if not self.connected_ok:
-                    if line == "OK":
-                        self.connected_ok = True
-                        self._set_status(f"Conectado em {self.ser.port}", "#060")
-                    return
-                self.terminal.appendPlainText(line)
-
-                if line.startswith("PONG"):
-                    self.btn_ping.setStyleSheet("background-color: green; color: black")
-                    if line == "PONG0":
-                        self.cont_led.setStyleSheet("color: red; font-size: 32px;")
-                    if line == "PONG1":
-                        self.cont_led.setStyleSheet("color: green; font-size: 32px;")
+                n = self.ser.in_waiting
+                if n <= 0:
                     return
-                
-                if self.logger:
-                    self.logger.save_line(line)  # salva a linha inteira no arquivo
 
-                 # Se recebeu o cabeçalho, só ignora
-                if line.startswith("Tempo"):
-                    return
+                self.framer.feed(self.ser.read(n))
+
+                n_samples = len(self.data_tempo)
+                for line in self.framer.decoded_lines():
+                    self._handle_line(line)
+
+                # Atualiza curvas no gráfico (uma vez por tick)
+                if len(self.data_tempo) != n_samples:
+                    self.curva_empuxo.setData(self.data_tempo, self.data_empuxo)
+                    self.curva_pressao.setData(self.data_tempo, self.data_pressao)
 
-                # Divide por tabulação
-                parts = line.split("\t")
-                if len(parts) >= 5:
-                    try:
-                        tempo = float(parts[0])
-                        avgCell = float(parts[1])
-                        avgKgf = float(parts[2])
-                        avgTransd = float(parts[3])
-                        avgPSI = float(parts[4])
-
-            
-                        # Atualiza arrays
-                        self.data_tempo.append(tempo)
-                        self.data_empuxo.append(avgKgf)
-                        self.data_pressao.append(avgPSI)
-
-                        # Atualiza curvas no gráfico
-                        self.curva_empuxo.setData(self.data_tempo, self.data_empuxo)
-                        self.curva_pressao.setData(self.data_tempo, self.data_pressao)
-
-                        # Atualiza máximos
-                        if avgKgf > self.max_thrust_val:
-                            self.max_thrust_val = avgKgf
-                            self.max_thrust.setText(f"{self.max_thrust_val:.2f} kgf")
-
-                        if avgPSI > self.max_pressure_val:
-                            self.max_pressure_val = avgPSI
-                            self.max_pressure.setText(f"{self.max_pressure_val:.2f} psi")
-
-
-                    except ValueError:
-                        print(f"[WARN] Linha inválida: {line}")
             except Exception as e:
                 QMessageBox.critical(self, "Erro", f"A porta {self.ser.port} foi desconectada.\nErro: {e}")
                 self._set_status("Desconectado", "#666")
@@ -318,6 +285,58 @@ class GSTestEstaticoPage(QWidget):
                 self.ser = None
                 self.connected_ok = False
 
+    def _handle_line(self, line: str):
+        if not self.connected_ok:
+            if line == "OK":
+                self.connected_ok = True
+                self._set_status(f"Conectado em {self.ser.port}", "#060")
+            return
+        self.terminal.appendPlainText(line)
+
+        if line.startswith("PONG"):
+            self.btn_ping.setStyleSheet("background-color: green; color: black")
+            if line == "PONG0":
+                self.cont_led.setStyleSheet("color: red; font-size: 32px;")
+            if line == "PONG1":
+                self.cont_led.setStyleSheet("color: green; font-size: 32px;")
+            return
+        
+        if self.logger:
+            self.logger.save_line(line)  # salva a linha inteira no arquivo
+
+         # Se recebeu o cabeçalho, só ignora
+        if line.startswith("Tempo"):
+            return
+
+        # Divide por tabulação
+        parts = line.split("\t")
+        if len(parts) >= 5:
+            try:
+                tempo = float(parts[0])
+                avgCell = float(parts[1])
+                avgKgf = float(parts[2])
+                avgTransd = float(parts[3])
+                avgPSI = float(parts[4])
+
+    
+                # Atualiza arrays
+                self.data_tempo.append(tempo)
+                self.data_empuxo.append(avgKgf)
+                self.data_pressao.append(avgPSI)
+
+                # Atualiza máximos
+                if avgKgf > self.max_thrust_val:
+                    self.max_thrust_val = avgKgf
+                    self.max_thrust.setText(f"{self.max_thrust_val:.2f} kgf")
+
+                if avgPSI > self.max_pressure_val:
+                    self.max_pressure_val = avgPSI
+                    self.max_pressure.setText(f"{self.max_pressure_val:.2f} psi")
+
+
+            except ValueError:
+                trace_warn("STATIC", f"Linha inválida: {line}")
+
     def _clear_terminal(self):
         self.terminal.clear()
         self.btn_ping.setStyleSheet("background-color: red; color: black")
@@ -423,8 +442,13 @@ class GSTestEstaticoPage(QWidget):
                 "Text Files (*.txt)"
             )
             if filename:
-                self.logger = Logger(filename)
+                # fsync a cada linha, como antes do writer em thread
+                self.logger = Logger(filename, durability="every-line")
             else:
                 self.logger = None
         else:
             self.logger = None
+
+    def _close_logger(self):
+        if self.logger:
+            self.logger.close()
@@ -0,0 +1,207 @@
+# views/log_index.py
+"""
+Segmentos de log e índice lateral (sidecar) do Logger.
+
+Para o log "log_20250101_120000.txt":
+
+    log_20250101_120000.txt         segmento 0 (nome original)
+    log_20250101_120000.001.txt     segmento 1 (depois de rolar por tamanho/tempo)
+    log_20250101_120000.002.txt     ...
+    log_20250101_120000.index.tsv   índice
+
+Cada segmento repete o cabeçalho, então abre sozinho no pandas. O índice é
+um TSV esparso (uma entrada a cada N linhas e no início de cada segmento):
+
+    segmento  offset  host_ts  linha:0  tempo:1
+
+"linha:0" = chave "linha" na coluna 0 do log. offset é a posição em bytes
+do começo da linha dentro do segmento; host_ts é o time.time() de quando a
+linha foi enfileirada.
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+import os
+from typing import Iterator, Optional, Sequence
+
+from views.trace import trace_warn
+
+INDEX_SUFFIX = ".index.tsv"
+
+
+def index_path_for(log_path: str) -> str:
+    base, _ = os.path.splitext(log_path)
+    return base + INDEX_SUFFIX
+
+
+def segment_path_for(log_path: str, segment: int) -> str:
+    """Caminho do segmento n (o 0 é o próprio log)."""
+    if segment == 0:
+        return log_path
+    base, ext = os.path.splitext(log_path)
+    return f"{base}.{segment:03d}{ext}"
+
+
+def _to_float(s) -> float:
+    try:
+        return float(s)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+class LogIndexWriter:
+    """
+    Escreve o índice lateral. Usado só pela thread de escrita do Logger.
+
+    keys: pares (nome, coluna do log) que entram em cada entrada.
+    """
+
+    def __init__(self, log_path: str, keys: Sequence[tuple[str, int]]):
+        self.path = index_path_for(log_path)
+        self.keys = tuple(keys)
+
+        new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        self.file = open(self.path, "a", encoding="utf-8")
+
+        if new_file:
+            cols = ["segmento", "offset", "host_ts"] + [f"{name}:{col}" for name, col in self.keys]
+            self.file.write("\t".join(cols) + "\n")
+
+    def add(self, segment: int, offset: int, host_ts: float, args: Sequence):
+        values = []
+        for _, col in self.keys:
+            v = args[col] if col < len(args) else None
+            values.append("" if v is None else str(v))
+        self.file.write(f"{segment}\t{offset}\t{host_ts:.3f}\t" + "\t".join(values) + "\n")
+
+    def flush(self):
+        self.file.flush()
+
+    def sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        if not self.file.closed:
+            self.sync()
+            self.file.close()
+
+
+class LogIndex:
+    """
+    Leitor do índice: lista de segmentos e busca de janela por chave
+    (ex.: "tempo", "linha" ou "host_ts"), sem varrer o arquivo inteiro.
+
+    Assume a chave crescente ao longo da sessão (como tempo/linha do firmware).
+    """
+
+    def __init__(self, log_path: str):
+        self.log_path = log_path
+        self.path = index_path_for(log_path)
+
+        self.key_columns: dict[str, int] = {}
+        self.entries: list[tuple[int, int, dict[str, float]]] = []  # (segmento, offset, chaves)
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            header = f.readline().rstrip("\n").split("\t")
+            keys = []
+            for h in header[3:]:
+                name, _, col = h.partition(":")
+                self.key_columns[name] = int(col)
+                keys.append(name)
+
+            for line in f:
+                parts = line.rstrip("\n").split("\t")
+                if len(parts) < 3:
+                    continue
+                values = {"host_ts": _to_float(parts[2])}
+                for name, v in zip(keys, parts[3:]):
+                    values[name] = _to_float(v)
+                self.entries.append((int(parts[0]), int(parts[1]), values))
+
+        n_segments = max((e[0] for e in self.entries), default=0) + 1
+        self.segments = [segment_path_for(log_path, i) for i in range(n_segments)]
+
+    @classmethod
+    def for_log(cls, log_path: str) -> Optional["LogIndex"]:
+        if not os.path.isfile(index_path_for(log_path)):
+            return None
+        try:
+            return cls(log_path)
+        except Exception as e:
+            trace_warn("LOGINDEX", f"Índice ignorado: {e}")
+            return None
+
+    @property
+    def keys(self) -> list[str]:
+        return ["host_ts"] + list(self.key_columns)
+
+    def seek(self, key: str, value: float) -> tuple[int, int]:
+        """(segmento, offset) da última entrada do índice com chave <= value."""
+        entries = [(e[2].get(key, math.nan), e[0], e[1]) for e in self.entries]
+        entries = [e for e in entries if not math.isnan(e[0])]
+        if not entries:
+            return 0, 0
+
+        i = bisect.bisect_right([e[0] for e in entries], value) - 1
+        if i < 0:
+            return entries[0][1], entries[0][2]
+        return entries[i][1], entries[i][2]
+
+    def header(self) -> str:
+        """Cabeçalho do log (primeira linha do segmento 0)."""
+        with open(self.segments[0], "r", encoding="utf-8", errors="ignore") as f:
+            return f.readline().rstrip("\n")
+
+    def iter_window(self, key: str, t0: float, t1: float) -> Iterator[str]:
+        """
+        Linhas do log (sem cabeçalho) com t0 <= chave <= t1.
+
+        Pula direto para o offset indicado pelo índice e para de ler assim que
+        a chave passa de t1. Para "host_ts" a janela é aplicada só pelo índice
+        (o TSV não guarda o horário do host).
+        """
+        segment, offset = self.seek(key, t0)
+        col = self.key_columns.get(key)
+        header = self.header()
+
+        # host_ts: limita pelo índice (última entrada <= t1 + um passo)
+        stop_at = None
+        if col is None:
+            after = [(e[0], e[1]) for e in self.entries if e[2].get("host_ts", math.nan) > t1]
+            stop_at = after[0] if after else None
+
+        for seg in range(segment, len(self.segments)):
+            path = self.segments[seg]
+            if not os.path.isfile(path):
+                continue
+
+            with open(path, "rb") as f:
+                if seg == segment:
+                    f.seek(offset)
+
+                while True:
+                    pos = f.tell()
+                    if stop_at is not None and (seg, pos) >= stop_at:
+                        return
+
+                    raw = f.readline()
+                    if not raw:
+                        break
+
+                    line = raw.decode("utf-8", errors="ignore").rstrip("\r\n")
+                    if not line or line == header:
+                        continue
+
+                    if col is not None:
+                        parts = line.split("\t")
+                        v = _to_float(parts[col]) if col < len(parts) else math.nan
+                        if not math.isnan(v):
+                            if v < t0:
+                                continue
+                            if v > t1:
+                                return
+
+                    yield line
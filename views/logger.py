@@ -1,28 +1,400 @@
 import os
+import queue
+import threading
+import time
+
+from views.log_index import LogIndexWriter, segment_path_for
+from views.trace import trace_warn
+
+# tipos de item da fila do writer
+_LINE = 0
+_HEADER = 1
+_SYNC = 2
+_STOP = 3
+
 
 class Logger:
-    def __init__(self, filename):
+    """
+    Log em arquivo texto (colunas separadas por TAB) com escrita em thread própria.
+
+    save_line() só coloca a linha numa fila limitada; a thread de escrita grava
+    em lote e faz fsync conforme a durabilidade escolhida:
+
+    - "every-line":  fsync a cada linha (comportamento antigo, mas fora da UI)
+    - "interval":    fsync a cada fsync_interval_ms ou fsync_every_lines linhas (group commit)
+    - "os-buffered": só entrega ao SO (flush); fsync só no cabeçalho, sync() e close()
+
+    event_columns: índices de colunas de eventos de voo (ex.: apogeu, paraquedas).
+    Quando uma delas muda de valor, a linha é sincronizada na hora (exceto em
+    "os-buffered"). O cabeçalho também é sempre sincronizado.
+
+    columnar: grava também um log colunar binário (views/columnar_log.py) ao
+    lado do TSV, a partir das mesmas linhas. Começa no write_header(), que dá
+    os nomes das colunas.
+
+    segment_max_bytes / segment_max_s: rola o TSV para um novo segmento
+    (log.001.txt, log.002.txt, ...) por tamanho e/ou tempo; 0 = sem limite.
+    index_keys: pares (nome, coluna), ex. (("linha", 0), ("tempo", 1)); com
+    eles é mantido o índice lateral (views/log_index.py) com offsets por
+    segmento a cada index_every_lines linhas.
+    """
+
+    DURABILITY_MODES = ("every-line", "interval", "os-buffered")
+
+    def __init__(
+        self,
+        filename,
+        durability: str = "interval",
+        fsync_interval_ms: int = 250,
+        fsync_every_lines: int = 100,
+        queue_size: int = 10_000,
+        event_columns=(),
+        columnar: bool = False,
+        columnar_chunk_rows: int = 4096,
+        segment_max_bytes: int = 0,
+        segment_max_s: float = 0.0,
+        index_keys=(),
+        index_every_lines: int = 50,
+    ):
+        if durability not in self.DURABILITY_MODES:
+            raise ValueError(f"durability inválida: {durability!r} (use {', '.join(self.DURABILITY_MODES)})")
+
         self.filename = filename
-        self.file = open(self.filename, "a", buffering=1)  # line-buffered
+        self.durability = durability
+        self.fsync_interval_s = max(0.0, fsync_interval_ms / 1000.0)
+        self.fsync_every_lines = max(1, int(fsync_every_lines))
+        self.event_columns = tuple(event_columns)
+        self.columnar = columnar
+        self.columnar_chunk_rows = columnar_chunk_rows
+        self._columnar_writer = None  # criado no cabeçalho (só thread de escrita)
+
+        self.segment_max_bytes = max(0, int(segment_max_bytes))
+        self.segment_max_s = max(0.0, float(segment_max_s))
+        self.index_every_lines = max(1, int(index_every_lines))
+
+        # binário: o offset de cada linha (para o índice) é contado aqui mesmo
+        self.segment = 0
+        self.file = open(self.filename, "ab")
+        self._offset = self.file.tell()
+        self._segment_started = time.monotonic()
+        self._segment_lines = 0
+        self._header_bytes = b""
+
+        self._index = LogIndexWriter(self.filename, index_keys) if index_keys else None
+        self._lines_since_index = None  # None = próxima linha sempre entra no índice
+
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._closed = False
+        self._last_events = {}  # coluna -> último valor (só thread de escrita)
+
+        # contadores (leitura livre pela UI; escritos só pela thread de escrita)
+        self.lines_written = 0
+        self.fsync_count = 0
+        self.queue_full_count = 0
+        self.max_queue_depth = 0
+        self.last_write_ms = 0.0
+        self.max_write_ms = 0.0
+        self.last_fsync_ms = 0.0
+        self.max_fsync_ms = 0.0
+        self.last_error = ""
+
+        self._thread = threading.Thread(target=self._run, name="LoggerWriter", daemon=True)
+        self._thread.start()
+
+    # ---------- API pública ----------
 
     def write_header(self, headers: list[str]):
         """
         Escreve cabeçalho no arquivo (apenas uma vez).
         """
-        line = "\t".join(headers) + "\n"
-        self.file.write(line)
-        self.file.flush()
-        os.fsync(self.file.fileno())
+        self._put((_HEADER, tuple(headers), None))
 
     def save_line(self, *args):
         """
-        Salva linha com tabulação.
+        Salva linha com tabulação (enfileira; a gravação acontece na thread de escrita).
         """
-        line = "\t".join(str(x) for x in args) + "\n"
-        self.file.write(line)
-        self.file.flush()
-        os.fsync(self.file.fileno())
+        self._put((_LINE, args, time.time()))
+
+    def sync(self):
+        """Pede flush + fsync de tudo que já foi enfileirado."""
+        self._put((_SYNC, None, None))
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self) -> dict:
+        return {
+            "durability": self.durability,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "queue_full_count": self.queue_full_count,
+            "lines_written": self.lines_written,
+            "fsync_count": self.fsync_count,
+            "last_write_ms": self.last_write_ms,
+            "max_write_ms": self.max_write_ms,
+            "last_fsync_ms": self.last_fsync_ms,
+            "max_fsync_ms": self.max_fsync_ms,
+            "segment": self.segment,
+            "last_error": self.last_error,
+        }
+
+    def close(self, timeout_s: float = 5.0):
+        """
+        Grava o que falta na fila, faz flush + fsync e fecha o arquivo.
+
+        Quem fecha o arquivo e o índice é a própria thread de escrita, ao
+        terminar a fila: se o join estourar (cartão SD lento), ela continua e
+        fecha sozinha; aqui ninguém mexe no arquivo enquanto ela ainda grava.
+        """
+        if self._closed:
+            return
+        self._closed = True
+
+        self._queue.put((_STOP, None, None))
+        self._thread.join(timeout_s)
 
-    def close(self):
+        if self._thread.is_alive():
+            self.last_error = f"fechamento ainda em andamento após {timeout_s:.1f} s"
+            trace_warn("LOGGER", "Escrita ainda em andamento; o arquivo será fechado pela thread de escrita")
+
+    # ---------- fila ----------
+
+    def _put(self, item):
+        if self._closed:
+            return
+
+        q = self._queue
+        if q.full():
+            # fila cheia: segura quem chamou (back-pressure) em vez de perder linha
+            self.queue_full_count += 1
+
+        q.put(item)
+
+        depth = q.qsize()
+        if depth > self.max_queue_depth:
+            self.max_queue_depth = depth
+
+    # ---------- thread de escrita ----------
+
+    def _run(self):
+        try:
+            self._write_loop()
+        finally:
+            self._finish()
+
+    def _finish(self):
+        """Fim da thread de escrita: flush + fsync e fecha o arquivo e o índice."""
         if not self.file.closed:
+            try:
+                self.file.flush()
+                os.fsync(self.file.fileno())
+            except Exception as e:
+                self.last_error = str(e)
+                trace_warn("LOGGER", f"Erro ao sincronizar no fechamento: {e}")
             self.file.close()
+
+        if self._index is not None:
+            try:
+                self._index.close()
+            except Exception as e:
+                self.last_error = str(e)
+                trace_warn("LOGGER", f"Erro ao fechar índice: {e}")
+
+    def _write_loop(self):
+        q = self._queue
+        pending = 0                 # linhas escritas e ainda não sincronizadas
+        last_sync = time.monotonic()
+        running = True
+
+        while running:
+            if pending and self.durability == "interval":
+                timeout = max(0.0, self.fsync_interval_s - (time.monotonic() - last_sync))
+            else:
+                timeout = None
+
+            try:
+                items = [q.get(timeout=timeout)]
+            except queue.Empty:
+                items = []
+
+            # group commit: drena o que mais estiver na fila
+            while len(items) < 1000:
+                try:
+                    items.append(q.get_nowait())
+                except queue.Empty:
+                    break
+
+            force_sync = False      # cabeçalho / sync() / close()
+            event_sync = False      # evento de voo
+            t0 = time.perf_counter()
+
+            try:
+                for kind, payload, host_ts in items:
+                    if kind == _LINE:
+                        self._write_line(payload, host_ts)
+                        self.lines_written += 1
+                        pending += 1
+
+                        if self._columnar_writer is not None:
+                            self._columnar_append(payload)
+
+                        if self.durability == "every-line":
+                            self._flush_and_sync()
+                            pending = 0
+                        elif self.event_columns and self._is_flight_event(payload):
+                            event_sync = True
+
+                    elif kind == _HEADER:
+                        self._header_bytes = ("\t".join(payload) + "\n").encode("utf-8")
+                        self._write_bytes(self._header_bytes)
+                        force_sync = True
+
+                        if self.columnar:
+                            self._open_columnar(payload)
+
+                    elif kind == _SYNC:
+                        force_sync = True
+                        if self._columnar_writer is not None:
+                            self._columnar_writer.flush()
+
+                    elif kind == _STOP:
+                        force_sync = True
+                        running = False
+                        self._close_columnar()
+
+                if items:
+                    self.file.flush()
+                    if self._index is not None:
+                        self._index.flush()
+                    dt_ms = (time.perf_counter() - t0) * 1000.0
+                    self.last_write_ms = dt_ms
+                    if dt_ms > self.max_write_ms:
+                        self.max_write_ms = dt_ms
+
+                if self.durability == "os-buffered":
+                    if force_sync:
+                        self._flush_and_sync()
+                    pending = 0
+                    continue
+
+                now = time.monotonic()
+                if force_sync or event_sync or pending >= self.fsync_every_lines or (
+                    pending and now - last_sync >= self.fsync_interval_s
+                ):
+                    self._flush_and_sync()
+                    pending = 0
+                    last_sync = time.monotonic()
+
+            except Exception as e:
+                self.last_error = str(e)
+                trace_warn("LOGGER", f"Erro ao gravar log: {e}")
+                if any(item[0] == _STOP for item in items):
+                    running = False
+
+    # ---------- segmentos / índice ----------
+
+    def _write_bytes(self, data: bytes):
+        self.file.write(data)
+        self._offset += len(data)
+
+    def _write_line(self, args, host_ts: float):
+        if self._segment_lines and self._should_rotate():
+            self._rotate()
+
+        if self._index is not None:
+            if self._lines_since_index is None or self._lines_since_index >= self.index_every_lines:
+                self._index.add(self.segment, self._offset, host_ts, args)
+                self._lines_since_index = 0
+            self._lines_since_index += 1
+
+        self._write_bytes(("\t".join(str(x) for x in args) + "\n").encode("utf-8"))
+        self._segment_lines += 1
+
+    def _should_rotate(self) -> bool:
+        if self.segment_max_bytes and self._offset >= self.segment_max_bytes:
+            return True
+        if self.segment_max_s and time.monotonic() - self._segment_started >= self.segment_max_s:
+            return True
+        return False
+
+    def _rotate(self):
+        """Fecha o segmento atual (flush + fsync) e abre o próximo, com o mesmo cabeçalho."""
+        self._flush_and_sync()
+        self.file.close()
+
+        self.segment += 1
+        self.file = open(segment_path_for(self.filename, self.segment), "ab")
+        self._offset = self.file.tell()
+        self._segment_started = time.monotonic()
+        self._segment_lines = 0
+        self._lines_since_index = None
+
+        if self._header_bytes:
+            self._write_bytes(self._header_bytes)
+
+    # ---------- log colunar ----------
+
+    def _open_columnar(self, headers):
+        from views.columnar_log import ColumnarWriter, columnar_dir_for
+
+        self._close_columnar()
+        try:
+            self._columnar_writer = ColumnarWriter(
+                columnar_dir_for(self.filename), headers, chunk_rows=self.columnar_chunk_rows
+            )
+        except Exception as e:
+            self.last_error = str(e)
+            trace_warn("LOGGER", f"Log colunar desativado: {e}")
+
+    def _columnar_append(self, args):
+        try:
+            self._columnar_writer.append(args)
+        except Exception as e:
+            # erro no colunar não pode parar o TSV
+            self.last_error = str(e)
+            trace_warn("LOGGER", f"Log colunar desativado: {e}")
+            self._columnar_writer = None
+
+    def _close_columnar(self):
+        writer = self._columnar_writer
+        self._columnar_writer = None
+        if writer is not None:
+            try:
+                writer.close()
+            except Exception as e:
+                self.last_error = str(e)
+                trace_warn("LOGGER", f"Erro ao fechar log colunar: {e}")
+
+    def _is_flight_event(self, args) -> bool:
+        """True se alguma coluna de evento (não vazia) mudou desde a última linha."""
+        event = False
+        last = self._last_events
+
+        for col in self.event_columns:
+            if col >= len(args):
+                continue
+
+            value = args[col]
+            if value is None:
+                continue
+
+            prev = last.get(col)
+            if prev is not None and prev != value:
+                event = True
+            last[col] = value
+
+        return event
+
+    def _flush_and_sync(self):
+        t0 = time.perf_counter()
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        if self._index is not None:
+            self._index.flush()
+        dt_ms = (time.perf_counter() - t0) * 1000.0
+
+        self.fsync_count += 1
+        self.last_fsync_ms = dt_ms
+        if dt_ms > self.max_fsync_ms:
+            self.max_fsync_ms = dt_ms
@@ -3,16 +3,8 @@
 from __future__ import annotations
 
 import os
-import math
-import pathlib
-import threading
-import socket
-import http.server
-import socketserver
-import re
-from functools import partial
-
-from PySide6.QtCore import QUrl
+
+from PySide6.QtCore import QTimer, QUrl, Signal
 from PySide6.QtWebEngineWidgets import QWebEngineView
 from PySide6.QtWebEngineCore import (
     QWebEngineProfile,
@@ -21,128 +13,38 @@ from PySide6.QtWebEngineCore import (
     QWebEngineSettings,
 )
 
+from views.pack_index import load_pack_index
+from views.trace import DEBUG, ERROR, INFO, TRACE, WARN, trace_info
+from views.tile_pyramid import OVERZOOM_LEVELS, pillow_available
+from views.tile_scheme import ROOT_URL, SCHEME, TileSchemeHandler
+from views.track import TrackSimplifier
+from views.web_bridge import QWEBCHANNEL_JS, MapBridge
 
-def num2deg(x: int, y: int, z: int):
-    """Converte tile x/y/z em lat/lon (canto NW do tile)."""
-    n = 2.0 ** z
-    lon_deg = x / n * 360.0 - 180.0
-    lat_rad = math.atan(math.sinh(math.pi * (1 - 2 * y / n)))
-    lat_deg = math.degrees(lat_rad)
-    return lat_deg, lon_deg
 
+# sem flush_points() explícito (ex.: página sem render próprio), a fila sai sozinha
+TRACK_FLUSH_MS = 50
 
-def _safe_int_from_stem(stem: str):
-    """
-    Aceita nomes como "123", "123@2x", "123-something".
-    Retorna int ou None.
-    """
-    m = re.match(r"^(\d+)", stem)
-    if not m:
-        return None
-    return int(m.group(1))
+
+def _latlon_list(points) -> list:
+    return [[lat, lon] for lat, lon in points]
 
 
 def get_tile_info(tile_folder: str):
     """
-    Lê pasta de tiles e retorna:
+    Lê o pack (pasta com light/dark/sat, pasta {z}/{x}/{y}.png ou .mbtiles) e retorna:
     (min_zoom, max_zoom, lat_min, lon_min, lat_max, lon_max)
 
-    Estrutura esperada: {z}/{x}/{y}.png
+    Vem do índice do pack (views/pack_index.py): pack_index.json validado por
+    mtimes, sem varrer a árvore a cada abertura do mapa.
     """
-    path = pathlib.Path(tile_folder)
-    if not path.exists():
-        return None
-
-    zooms = sorted(
-        int(p.name) for p in path.iterdir()
-        if p.is_dir() and p.name.isdigit()
-    )
-    if not zooms:
-        return None
-
-    min_z, max_z = zooms[0], zooms[-1]
-
-    # bounds calculado no maior zoom disponível (melhor precisão)
-    z = max_z
-    z_path = path / str(z)
-    if not z_path.exists():
-        return None
-
-    xs = []
-    for p in z_path.iterdir():
-        if p.is_dir() and p.name.isdigit():
-            xs.append(int(p.name))
-    if not xs:
-        return None
-
-    min_x, max_x = min(xs), max(xs)
-
-    ys = []
-    for x in xs:
-        for f in (z_path / str(x)).glob("*.*"):
-            if not f.is_file():
-                continue
-            y = _safe_int_from_stem(f.stem)
-            if y is not None:
-                ys.append(y)
-
-    if not ys:
-        return None
-
-    min_y, max_y = min(ys), max(ys)
-
-    # canto superior esquerdo e inferior direito
-    lat_max, lon_min = num2deg(min_x, min_y, z)
-    lat_min, lon_max = num2deg(max_x + 1, max_y + 1, z)
-
-    return (min_z, max_z, lat_min, lon_min, lat_max, lon_max)
-
-
-def _find_free_port():
-    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    s.bind(("127.0.0.1", 0))
-    port = s.getsockname()[1]
-    s.close()
-    return port
-
-
-class _ThreadingHTTPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
-    daemon_threads = True
-    allow_reuse_address = True
-
-
-class TileServer:
-    def __init__(self, folder: str, port: int | None = None):
-        self.folder = folder
-        self.port = port or _find_free_port()
-        self.httpd = None
-        self.thread = None
-
-    def start(self):
-        handler = partial(http.server.SimpleHTTPRequestHandler, directory=self.folder)
-        self.httpd = _ThreadingHTTPServer(("127.0.0.1", self.port), handler)
-        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
-        self.thread.start()
-
-    def stop(self):
-        if self.httpd:
-            try:
-                self.httpd.shutdown()
-            except Exception:
-                pass
-            try:
-                self.httpd.server_close()
-            except Exception:
-                pass
-        self.httpd = None
-        self.thread = None
+    idx = load_pack_index(tile_folder)
+    return idx.info() if idx else None
 
 
 class OfflineRequestInterceptor(QWebEngineUrlRequestInterceptor):
     """
-    Quando enabled=True:
-      - bloqueia qualquer http/https que NÃO seja localhost/127.0.0.1
-      - permite file://, qrc:// e o tile server local
+    Quando enabled=True bloqueia qualquer http/https (modo offline).
+    file://, qrc:// e urdtiles:// (tiles do pack, views/tile_scheme.py) passam.
     """
     def __init__(self, enabled: bool = False, parent=None):
         super().__init__(parent)
@@ -156,17 +58,27 @@ class OfflineRequestInterceptor(QWebEngineUrlRequestInterceptor):
         scheme = url.scheme().lower()
 
         if scheme in ("http", "https"):
-            host = url.host().lower()
-            if host not in ("localhost", "127.0.0.1"):
-                info.block(True)
+            info.block(True)
+
+
+_JS_TRACE_LEVELS = {
+    QWebEnginePage.JavaScriptConsoleMessageLevel.InfoMessageLevel: DEBUG,
+    QWebEnginePage.JavaScriptConsoleMessageLevel.WarningMessageLevel: WARN,
+    QWebEnginePage.JavaScriptConsoleMessageLevel.ErrorMessageLevel: ERROR,
+}
 
 
 class DebugPage(QWebEnginePage):
     def javaScriptConsoleMessage(self, level, message, lineNumber, sourceID):
-        print(f"[JS] {sourceID}:{lineNumber} {message}")
+        trace_level = _JS_TRACE_LEVELS.get(level, INFO)
+        if TRACE.enabled(trace_level):
+            TRACE.event(trace_level, "JS", f"{sourceID}:{lineNumber} {message}")
 
 
 class MapWidget(QWebEngineView):
+    # vista do mapa mudou (lat, lon, zoom), informada pela página
+    viewChanged = Signal(float, float, int)
+
     def __init__(
         self,
         offline: bool = False,
@@ -183,16 +95,32 @@ class MapWidget(QWebEngineView):
         self._base_order = ["dark", "light", "sat"]
         self._base_key = "dark" if not satellite else "sat"
 
-        self._tile_server: TileServer | None = None
-        self._tile_folder_served: str | None = None
+        # tiles offline: handler do esquema urdtiles:// no profile deste mapa
+        self._tile_handler = TileSchemeHandler(self)
 
         self._profile = QWebEngineProfile(f"MapProfile-{id(self)}", self)
         self._interceptor = OfflineRequestInterceptor(enabled=self.offline, parent=self._profile)
         self._profile.setUrlRequestInterceptor(self._interceptor)
+        self._profile.installUrlSchemeHandler(SCHEME, self._tile_handler)
 
         self._page = DebugPage(self._profile, self._profile)
         self.setPage(self._page)
 
+        # trajeto: fila de pontos + simplificação do trecho antigo (views/track.py)
+        self._track = TrackSimplifier()
+        self._track_timer = QTimer(self)
+        self._track_timer.setSingleShot(True)
+        self._track_timer.setInterval(TRACK_FLUSH_MS)
+        self._track_timer.timeout.connect(self.flush_points)
+
+        # dados Python -> JS pela ponte QWebChannel (views/web_bridge.py)
+        self._base: tuple[float, float, int] | None = None
+        self._bridge = MapBridge(self)
+        self._bridge.attach(self._page)
+        self._bridge.ready.connect(self._on_bridge_ready)
+        self._bridge.viewChanged.connect(self.viewChanged)
+        self.loadStarted.connect(self._on_load_started)
+
         settings = self.page().settings()
         settings.setAttribute(QWebEngineSettings.LocalContentCanAccessRemoteUrls, True)
         settings.setAttribute(QWebEngineSettings.LocalContentCanAccessFileUrls, True)
@@ -200,28 +128,13 @@ class MapWidget(QWebEngineView):
         self._init_map()
 
     # -------------------------
-    # lifecycle / server control
+    # lifecycle / tiles offline
     # -------------------------
-    def _ensure_tile_server(self, folder: str):
-        folder = os.path.abspath(folder)
-
-        if self._tile_server and self._tile_folder_served == folder:
-            return
-
-        if self._tile_server:
-            self._tile_server.stop()
-            self._tile_server = None
-            self._tile_folder_served = None
-
-        self._tile_server = TileServer(folder)
-        self._tile_folder_served = folder
-        self._tile_server.start()
+    def _serve_tiles(self, folder: str, is_pack: bool):
+        self._tile_handler.set_root(folder, is_pack)
 
-    def _stop_tile_server(self):
-        if self._tile_server:
-            self._tile_server.stop()
-        self._tile_server = None
-        self._tile_folder_served = None
+    def _stop_serving_tiles(self):
+        self._tile_handler.set_root(None, False)
 
     def closeEvent(self, event):
         self.cleanup()
@@ -255,38 +168,34 @@ class MapWidget(QWebEngineView):
 
     def _get_offline_tiles_context(self):
         if not self.tile_folder:
-            self._stop_tile_server()
+            self._stop_serving_tiles()
             return {
                 "ok": False,
                 "html": self._offline_error_html("❌🔌 MODO OFFLINE<br/>Tiles não carregados"),
             }
 
         folder = self.tile_folder
-        pack_light = os.path.join(folder, "light")
-        pack_dark = os.path.join(folder, "dark")
-        pack_sat = os.path.join(folder, "sat")
 
-        is_pack = os.path.isdir(pack_light) or os.path.isdir(pack_dark) or os.path.isdir(pack_sat)
+        # índice do pack (pasta: pack_index.json; .mbtiles: tabela metadata)
+        idx = load_pack_index(folder)
+        info = idx.info() if idx else None
+        is_pack = bool(idx and idx.is_pack)
 
-        def _info_for(sub: str):
-            p = os.path.join(folder, sub) if is_pack else folder
-            return get_tile_info(p)
-
-        info = _info_for("light") or _info_for("dark") or _info_for("sat")
         if not info:
-            self._stop_tile_server()
+            self._stop_serving_tiles()
             return {
                 "ok": False,
                 "html": self._offline_error_html(
-                    "❌ Tiles offline não encontrados (estrutura {z}/{x}/{y}.png)"
+                    "❌ Tiles offline não encontrados (estrutura {z}/{x}/{y}.png ou .mbtiles)"
                 ),
             }
 
-        self._ensure_tile_server(folder)
-        port = self._tile_server.port
-        print(f"[TileServer] http://127.0.0.1:{port}/  folder={self._tile_folder_served}")
+        self._serve_tiles(folder, is_pack)
+        trace_info("TileScheme", f"{ROOT_URL}  folder={self._tile_handler.root}  pack={is_pack}")
 
         min_z, max_z, lat_min, lon_min, lat_max, lon_max = info
+        # acima do zoom máximo do pack o handler amplia o ancestral (overzoom)
+        view_max_z = min(19, max_z + OVERZOOM_LEVELS) if pillow_available() else max_z
 
         return {
             "ok": True,
@@ -295,20 +204,20 @@ class MapWidget(QWebEngineView):
             "map_config_js": f"""
                 {{
                     isPack: {str(is_pack).lower()},
-                    root: 'http://127.0.0.1:{port}/',
+                    root: '{ROOT_URL}',
                     minZoom: {min_z},
-                    maxZoom: {max_z}
+                    maxZoom: {view_max_z}
                 }}
             """,
             "after_layers_js": f"""
                 var bounds = L.latLngBounds([[{lat_min}, {lon_min}], [{lat_max}, {lon_max}]]);
                 map.fitBounds(bounds, {{padding:[20,20]}});
-                map.setMaxZoom({max_z});
+                map.setMaxZoom({view_max_z});
             """,
         }
 
     def _get_online_tiles_context(self):
-        self._stop_tile_server()
+        self._stop_serving_tiles()
         return {
             "ok": True,
             "mode": "online",
@@ -447,8 +356,8 @@ class MapWidget(QWebEngineView):
 
               if (mode === "offline") {
                 function mkOffline(rel) {
-                  var prefix = rel ? (rel + "/") : "";
-                  var url = cfg.root + prefix + "{z}/{x}/{y}.png";
+                  // urdtiles://<camada>/{z}/{x}/{y}  ("_" = pasta sem camadas)
+                  var url = cfg.root + (rel || "_") + "/{z}/{x}/{y}";
                   return makeTileLayer(url, {
                     minZoom: cfg.minZoom,
                     maxZoom: cfg.maxZoom,
@@ -503,6 +412,10 @@ class MapWidget(QWebEngineView):
 
           var rocketMarker = null;
           var baseMarker = null;
+          // trajeto: trecho antigo (simplificado no Python) + trecho recente (resolução cheia)
+          var pathOldLL = [];
+          var pathRecentLL = [];
+          var pathOld = L.polyline([], {{color: '#1e88e5'}}).addTo(map);
           var pathPoly = L.polyline([], {{color: '#1e88e5'}}).addTo(map);
           var baseLine = null;
           var lockView = true;
@@ -566,10 +479,7 @@ class MapWidget(QWebEngineView):
           window.setBaseLayer = setBaseLayer;
           window.cycleBaseLayer = cycleBaseLayer;
 
-          function addPoint(lat, lon) {{
-            var ll = [lat, lon];
-            pathPoly.addLatLng(ll);
-
+          function moveRocket(ll) {{
             if (!rocketMarker) {{
               rocketMarker = L.circleMarker(ll, {{
                 radius: 7, color: "#2e7d32",
@@ -592,6 +502,26 @@ class MapWidget(QWebEngineView):
             }}
           }}
 
+          // um lote por frame: newPts no fim do recente, drop do começo dele,
+          // oldPts (já simplificados) no fim do antigo
+          function pushTrack(newPts, drop, oldPts) {{
+            var i;
+            for (i = 0; i < newPts.length; i++) pathRecentLL.push(newPts[i]);
+            if (drop > 0) pathRecentLL.splice(0, drop);
+            pathPoly.setLatLngs(pathRecentLL);
+
+            if (oldPts.length) {{
+              for (i = 0; i < oldPts.length; i++) pathOldLL.push(oldPts[i]);
+              pathOld.setLatLngs(pathOldLL);
+            }}
+
+            if (newPts.length) moveRocket(newPts[newPts.length - 1]);
+          }}
+
+          function addPoint(lat, lon) {{
+            pushTrack([[lat, lon]], 0, []);
+          }}
+
           function setBase(lat, lon, zoom) {{
             if (baseMarker) map.removeLayer(baseMarker);
             baseMarker = L.circleMarker([lat, lon], {{
@@ -723,6 +653,9 @@ class MapWidget(QWebEngineView):
             if (rocketMarker){{ map.removeLayer(rocketMarker); rocketMarker = null; }}
             if (baseMarker){{ map.removeLayer(baseMarker); baseMarker = null; }}
             if (baseLine){{ map.removeLayer(baseLine); baseLine = null; }}
+            pathOldLL = [];
+            pathRecentLL = [];
+            pathOld.setLatLngs([]);
             pathPoly.setLatLngs([]);
           }}
 
@@ -737,8 +670,35 @@ class MapWidget(QWebEngineView):
           window.resetMap = resetMap;
 
           window.addPoint = addPoint;
+          window.pushTrack = pushTrack;
           window.setBase = setBase;
           window.setPosition = setPosition;
+
+          // ---- ponte com o Python (views/web_bridge.py: MapBridge) ----
+          var bridge = null;
+
+          function reportView(){{
+            if (!bridge) return;
+            var c = map.getCenter();
+            bridge.reportView(c.lat, c.lng, map.getZoom());
+          }}
+
+          if (window.qt && qt.webChannelTransport) {{
+            new QWebChannel(qt.webChannelTransport, function(channel){{
+              bridge = channel.objects.bridge;
+              bridge.trackPushed.connect(pushTrack);
+              bridge.baseChanged.connect(setBase);
+              bridge.positionRequested.connect(setPosition);
+              bridge.viewRequested.connect(function(lat, lon, z){{
+                setViewLL(lat, lon, z < 0 ? null : z);
+              }});
+              bridge.resetRequested.connect(resetMap);
+
+              map.on('moveend', reportView);
+              reportView();
+              bridge.pageReady();
+            }});
+          }}
         </script>
         """.replace("%BASE_KEY%", base_key)
 
@@ -750,7 +710,7 @@ class MapWidget(QWebEngineView):
           <meta charset="utf-8"/>
           <link rel="stylesheet" href="{leaflet_css}"/>
           <script src="{leaflet_js}"></script>
-          <script src="qrc:///qtwebchannel/qwebchannel.js"></script>
+          <script src="{QWEBCHANNEL_JS}"></script>
           {self._build_style_block()}
         </head>
         <body>
@@ -791,7 +751,7 @@ class MapWidget(QWebEngineView):
 
     def cleanup(self):
         try:
-            self._stop_tile_server()
+            self._stop_serving_tiles()
         except Exception:
             pass
 
@@ -808,21 +768,65 @@ class MapWidget(QWebEngineView):
     # Python -> JS
     # -------------------------
     def add_point(self, lat, lon):
-        self.page().runJavaScript(f"addPoint({lat}, {lon});")
+        """Enfileira um ponto do trajeto; vai para o JS no próximo flush_points()."""
+        self._track.add(lat, lon)
+        if not self._track_timer.isActive():
+            self._track_timer.start()
+
+    def add_points(self, points):
+        for lat, lon in points:
+            self.add_point(lat, lon)
+
+    def flush_points(self):
+        """Manda os pontos pendentes numa única mensagem da ponte (chamado uma vez por frame)."""
+        self._track_timer.stop()
+        update = self._track.take_update()
+        if update is not None:
+            self._push_track(update)
+
+    def _push_track(self, update: dict):
+        # página ainda carregando: o trajeto inteiro vai no _on_bridge_ready
+        if self._bridge.is_ready:
+            self._bridge.trackPushed.emit(_latlon_list(update["new"]), int(update["drop"]), _latlon_list(update["old"]))
+
+    def _on_load_started(self):
+        self._bridge.page_loading()
+
+    def _on_bridge_ready(self):
+        # página (re)carregada: redesenha base e trajeto inteiro
+        if self._base is not None:
+            self._bridge.baseChanged.emit(*self._base)
+        if len(self._track):
+            self._push_track(self._track.snapshot())
 
     def set_base(self, lat, lon, zoom=12):
-        self.page().runJavaScript(f"setBase({lat}, {lon}, {zoom});")
+        self._base = (float(lat), float(lon), int(zoom))
+        if self._bridge.is_ready:
+            self._bridge.baseChanged.emit(*self._base)
 
     def set_position(self, lat, lon, z=12):
-        self.page().runJavaScript(f"setPosition({lat}, {lon}, {z});")
+        if self._bridge.is_ready:
+            self._bridge.positionRequested.emit(float(lat), float(lon), int(z))
 
     def set_view(self, lat: float, lon: float, zoom: int | None = None):
-        if zoom is None:
-            self.page().runJavaScript(f"setViewLL({lat}, {lon});")
-        else:
-            self.page().runJavaScript(f"setViewLL({lat}, {lon}, {zoom});")
+        if self._bridge.is_ready:
+            self._bridge.viewRequested.emit(float(lat), float(lon), -1 if zoom is None else int(zoom))
+
+    def view_state(self) -> tuple[float, float, int] | None:
+        """(lat, lon, zoom) da última vista informada pela página, ou None se ainda não carregou."""
+        return self._bridge.view
 
     def get_view(self, callback):
+        """
+        callback("lat, lon|zoom"). Com a ponte pronta responde na hora com a
+        vista mantida por ela (sem consultar a página).
+        """
+        view = self._bridge.view
+        if view is not None:
+            lat, lon, zoom = view
+            callback(f"{lat:.6f}, {lon:.6f}|{zoom}")
+            return
+
         js = (
             "(()=>{"
             "  try{"
@@ -841,7 +845,11 @@ class MapWidget(QWebEngineView):
         self.page().runJavaScript(js, callback)
 
     def reset_map(self):
-        self.page().runJavaScript("resetMap();")
+        self._track_timer.stop()
+        self._track.reset()
+        self._base = None
+        if self._bridge.is_ready:
+            self._bridge.resetRequested.emit()
 
     # -------------------------
     # toggles
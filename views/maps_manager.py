@@ -1,13 +1,26 @@
 # views/maps_manager.py
-import math, os, requests, json, time, shutil
+import math, os, json, time, shutil
 from PySide6.QtWidgets import (
-    QWidget, QLabel, QPushButton,
+    QWidget, QLabel, QPushButton, QComboBox, QCheckBox,
     QFileDialog, QHBoxLayout, QDoubleSpinBox, QMessageBox,
     QInputDialog, QProgressBar, QSpinBox, QGridLayout, QFrame, QVBoxLayout
 )
 from PySide6.QtCore import Qt, QThread, Signal, QObject
 from PySide6.QtWebEngineWidgets import QWebEngineView
 
+from views.mbtiles import MBTILES_EXT, MBTilesWriter, convert_folder_pack, is_mbtiles, tile_hash
+from views.pack_index import invalidate_pack_index
+from views.tile_coverage import (
+    CoverageQuadtree, coverage_from_manifest, coverage_from_pack, load_pack_coverage, preview_blocks,
+)
+from views.tile_fetch import ThroughputMeter, TileFetcher
+from views.tile_manifest import (
+    DONE, NOT_FOUND, PENDING, TileManifest,
+    manifest_path_for, missing_report_path_for, pack_path_for_manifest,
+)
+from views.tile_pyramid import build_pyramid, pillow_available
+from views.web_bridge import QWEBCHANNEL_JS, ViewBridge
+
 
 # ---------------- Funções auxiliares ----------------
 def deg2num(lat, lon, zoom):
@@ -41,191 +54,593 @@ def fmt_gb(gib: float) -> str:
         return f"{gib:.2f} GB"
     return f"{gib:.1f} GB"
 
-def estimate_tiles_and_size(center_lat: float, center_lon: float, radius_km: float, zoom_min: int, zoom_max: int):
-    zmin, zmax = min(zoom_min, zoom_max), max(zoom_min, zoom_max)
-    zmin, zmax = int(clamp(zmin, 1, 19)), int(clamp(zmax, 1, 19))
+def fmt_eta(seconds: float) -> str:
+    if seconds < 0:
+        return "--:--"
+    s = int(seconds)
+    h, m = s // 3600, (s % 3600) // 60
+    if h > 0:
+        return f"{h}h{m:02d}"
+    return f"{m:02d}:{s % 60:02d}"
+
+# faixa de tamanho (mín–máx) por tile (KB), por camada
+TILE_KB_RANGE = {"light": (8, 30), "dark": (8, 30), "sat": (25, 180)}
+
+# fração de tiles com conteúdo único (o resto é repetido: mar, áreas lisas).
+# Valores conservadores; depois de cada download completo viram a média do
+# que o manifesto mediu (learn_dedup_fractions), só em memória: ao reabrir o
+# app voltam a estes. Por isso a UI mostra o tamanho com dedup como estimativa.
+DEDUP_UNIQUE_FRACTION = {"light": 0.7, "dark": 0.7, "sat": 0.95}
+DEDUP_MIN_SAMPLE = 1000  # tiles por camada para confiar na medida
+
+_EMPTY_COVERAGE = CoverageQuadtree()
+
+def learn_dedup_fractions(stats: dict):
+    """stats = {camada: (únicos, tiles)} do manifesto de um download completo."""
+    for layer, (unique, tiles) in stats.items():
+        if layer in DEDUP_UNIQUE_FRACTION and tiles >= DEDUP_MIN_SAMPLE:
+            measured = clamp(unique / tiles, 0.05, 1.0)
+            DEDUP_UNIQUE_FRACTION[layer] = (DEDUP_UNIQUE_FRACTION[layer] + measured) / 2
+
+def request_rects(center_lat, center_lon, radius_km, zoom_min, zoom_max):
+    """{z: (x0, x1, y0, y1)} dos tiles do pedido (centro + raio)."""
     lat_min, lon_min, lat_max, lon_max = bounds_from_center_km(center_lat, center_lon, radius_km)
-
-    tiles_total = 0
-    for z in range(zmin, zmax + 1):
+    rects = {}
+    for z in range(zoom_min, zoom_max + 1):
         x_min, y_max = deg2num(lat_min, lon_min, z)
         x_max, y_min = deg2num(lat_max, lon_max, z)
-        x0, x1 = min(x_min, x_max), max(x_min, x_max)
-        y0, y1 = min(y_min, y_max), max(y_min, y_max)
-        tiles_total += (x1 - x0 + 1) * (y1 - y0 + 1)
+        rects[z] = (min(x_min, x_max), max(x_min, x_max), min(y_min, y_max), max(y_min, y_max))
+    return rects
+
+def estimate_tiles_and_size(center_lat: float, center_lon: float, radius_km: float, zoom_min: int, zoom_max: int,
+                            coverage: dict | None = None, build_lower: bool = False):
+    """
+    Tiles e tamanho do pedido. Com `coverage` ({camada: CoverageQuadtree} de um
+    pack existente), conta só o que falta nele (ampliação). Com build_lower,
+    tiles_download conta só o zoom máximo (os menores são montados localmente).
+    """
+    zmin, zmax = min(zoom_min, zoom_max), max(zoom_min, zoom_max)
+    zmin, zmax = int(clamp(zmin, 1, 19)), int(clamp(zmax, 1, 19))
+    rects = request_rects(center_lat, center_lon, radius_km, zmin, zmax)
+
+    def missing(zooms):
+        if coverage is None:
+            return sum((x1 - x0 + 1) * (y1 - y0 + 1) for z, (x0, x1, y0, y1) in rects.items() if z in zooms)
+        return max(
+            sum(coverage.get(layer, _EMPTY_COVERAGE).count_missing(z, r) for z, r in rects.items() if z in zooms)
+            for layer in TILE_KB_RANGE
+        )
+
+    tiles_request = sum((x1 - x0 + 1) * (y1 - y0 + 1) for x0, x1, y0, y1 in rects.values())
+    tiles_total = missing(set(rects))
+    tiles_download = missing({zmax}) if build_lower else tiles_total
 
     per_layer = tiles_total
     total_files = tiles_total * 3
 
-    # faixa de tamanho (mín–máx) por tile (KB): light, dark, sat
-    kb_min = (8 + 8 + 25)        # ~41KB por tile (leve)
-    kb_max = (30 + 30 + 180)     # ~240KB por tile (pior caso comum)
-    bytes_min = tiles_total * kb_min * 1024
-    bytes_max = tiles_total * kb_max * 1024
-    gib_min = bytes_min / (1024**3)
-    gib_max = bytes_max / (1024**3)
+    # ~41KB (leve) a ~240KB (pior caso comum) por posição, somando as 3 camadas;
+    # no pack cada imagem repetida é gravada uma vez só
+    kb_min = sum(lo for lo, _ in TILE_KB_RANGE.values())
+    kb_max = sum(hi for _, hi in TILE_KB_RANGE.values())
+    kb_min_dedup = sum(lo * DEDUP_UNIQUE_FRACTION[k] for k, (lo, _) in TILE_KB_RANGE.items())
+    kb_max_dedup = sum(hi * DEDUP_UNIQUE_FRACTION[k] for k, (_, hi) in TILE_KB_RANGE.items())
+    to_gib = tiles_total * 1024 / (1024**3)
 
     return {
         "tiles_per_layer": per_layer,
+        "tiles_request": tiles_request,
+        "tiles_download": tiles_download,
         "total_files": total_files,
-        "gib_min": gib_min,
-        "gib_max": gib_max,
+        "gib_min": kb_min_dedup * to_gib,
+        "gib_max": kb_max_dedup * to_gib,
+        "gib_min_raw": kb_min * to_gib,
+        "gib_max_raw": kb_max * to_gib,
         "zoom_min": zmin,
         "zoom_max": zmax
     }
 
 
+def pack_coverage_rects(coverage):
+    """{z: (x0, x1, y0, y1)} envolvendo os tiles de todas as camadas."""
+    out = {}
+    for tree in coverage.values():
+        for z, zc in tree.zooms.items():
+            b = zc.bounds()
+            if b is None:
+                continue
+            old = out.get(z)
+            out[z] = b if old is None else (min(old[0], b[0]), max(old[1], b[1]), min(old[2], b[2]), max(old[3], b[3]))
+    return out
+
+# ---------------- Destino dos tiles (pasta ou .mbtiles) ----------------
+PACK_FORMAT_MBTILES = "mbtiles"
+PACK_FORMAT_FOLDER = "folder"
+
+
+class _FolderStore:
+    """
+    Pack em pasta: {camada}/{z}/{x}/{y}.png + meta.json (mesma interface do MBTilesWriter).
+
+    Cada imagem única fica uma vez em _blobs/<sha1[:2]>/<sha1>.png e os tiles
+    são hardlinks para ela. Sistema de arquivos sem hardlink (FAT/exFAT do
+    cartão): cai para um arquivo por tile, como antes. Para copiar o pack
+    mantendo os links use rsync -H / cp -a (ou o formato .mbtiles).
+    """
+
+    BLOBS_DIR = "_blobs"
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.use_links = True
+
+    def _path(self, layer, z, x, y):
+        return os.path.join(self.folder, layer, str(z), str(x), f"{y}.png")
+
+    def _blob_path(self, digest):
+        return os.path.join(self.folder, self.BLOBS_DIR, digest[:2], f"{digest}.png")
+
+    def has(self, layer, z, x, y):
+        return os.path.exists(self._path(layer, z, x, y))
+
+    def get(self, layer, z, x, y):
+        try:
+            with open(self._path(layer, z, x, y), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def put(self, layer, z, x, y, data, tile_id=None):
+        """Grava o tile; retorna o sha1 do conteúdo (o mesmo do manifesto)."""
+        digest = tile_id or tile_hash(data)
+        out_path = self._path(layer, z, x, y)
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+        # nunca escreve por cima: o arquivo antigo pode ser um link para um blob
+        if os.path.lexists(out_path):
+            os.remove(out_path)
+
+        if self.use_links:
+            blob = self._blob_path(digest)
+            try:
+                if not os.path.exists(blob):
+                    os.makedirs(os.path.dirname(blob), exist_ok=True)
+                    _write_file(blob, data)
+                os.link(blob, out_path)
+                return digest
+            except OSError:
+                self.use_links = False
+
+        _write_file(out_path, data)
+        return digest
+
+    def set_metadata(self, meta):
+        with open(os.path.join(self.folder, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+
+    def flush(self):
+        pass
+
+    def _drop_orphan_blobs(self):
+        """Blobs sem nenhum tile apontando (st_nlink == 1): tile regravado ou sem hardlink."""
+        blobs = os.path.join(self.folder, self.BLOBS_DIR)
+        if not os.path.isdir(blobs):
+            return
+        for root, _dirs, files in os.walk(blobs, topdown=False):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    if os.stat(path).st_nlink <= 1:
+                        os.remove(path)
+                except OSError:
+                    pass
+            if root != blobs and not os.listdir(root):
+                os.rmdir(root)
+        if not os.listdir(blobs):
+            os.rmdir(blobs)
+
+    def close(self, finalize=True):
+        if finalize:
+            self._drop_orphan_blobs()
+
+
+def _write_file(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def pack_path_for(base_folder, name, pack_format):
+    if pack_format == PACK_FORMAT_MBTILES:
+        return os.path.join(base_folder, name + MBTILES_EXT)
+    return os.path.join(base_folder, name)
+
+
 # ---------------- Thread para baixar tiles ----------------
+TILE_SOURCES = {
+    "light": "https://cartodb-basemaps-a.global.ssl.fastly.net/light_all/{z}/{x}/{y}.png",
+    "dark":  "https://cartodb-basemaps-a.global.ssl.fastly.net/dark_all/{z}/{x}/{y}.png",
+    "sat":   "https://server.arcgisonline.com/ArcGIS/rest/services/World_Imagery/MapServer/tile/{z}/{y}/{x}",
+}
+
+
 class TilePackDownloader(QThread):
-    layer_progress = Signal(str, int, int, int)  # layer, done, total, zoom
+    layer_progress = Signal(str, int, int, int, float, float)  # layer, done, total, zoom, tiles/s, eta (s, -1 = ?)
     status = Signal(str)
     finished = Signal(str)
     failed = Signal(str)
 
-    def __init__(self, center_lat, center_lon, radius_km, zoom_min, zoom_max, pack_folder):
+    def __init__(self, center_lat, center_lon, radius_km, zoom_min, zoom_max, pack_folder,
+                 pack_format=PACK_FORMAT_MBTILES, sources=None, fetcher: TileFetcher | None = None,
+                 max_passes: int = 3, retry_delay_s: float = 10.0, build_lower: bool = False):
         super().__init__()
         self.center_lat = float(center_lat)
         self.center_lon = float(center_lon)
         self.radius_km = float(radius_km)
         self.zoom_min = int(zoom_min)
         self.zoom_max = int(zoom_max)
-        self.pack_folder = pack_folder
-
-        self._session = requests.Session()
-        self._session.headers.update({"User-Agent": "URD-GS-MapsManager/1.0"})
+        self.pack_folder = pack_folder  # pasta do pack ou caminho do .mbtiles
+        self.pack_format = pack_format
 
-        self.sources = {
-            "light": "https://cartodb-basemaps-a.global.ssl.fastly.net/light_all/{z}/{x}/{y}.png",
-            "dark":  "https://cartodb-basemaps-a.global.ssl.fastly.net/dark_all/{z}/{x}/{y}.png",
-            "sat":   "https://server.arcgisonline.com/ArcGIS/rest/services/World_Imagery/MapServer/tile/{z}/{y}/{x}",
-        }
+        # sources/fetcher trocáveis: servidor de tiles local nos testes
+        self.sources = dict(sources or TILE_SOURCES)
         self.layers = ["light", "dark", "sat"]
+        self.fetcher = fetcher or TileFetcher()
+
+        # baixa só o zoom máximo e monta os menores localmente (views/tile_pyramid.py)
+        self.build_lower = bool(build_lower)
+
+        # rodadas sobre os tiles que falharam (cada tile já tem os retries do fetcher)
+        self.max_passes = max(1, int(max_passes))
+        self.retry_delay_s = float(retry_delay_s)
         self._stop = False
 
     def request_stop(self):
         self._stop = True
-
-    def _download_one(self, url, out_path):
-        if os.path.exists(out_path):
-            return True
-        os.makedirs(os.path.dirname(out_path), exist_ok=True)
-        try:
-            # timeout separado ajuda a fechar o app mais rápido
-            r = self._session.get(url, timeout=(3, 8))
-            if r.status_code == 200 and r.content:
-                with open(out_path, "wb") as f:
-                    f.write(r.content)
-                return True
-            return False
-        except Exception:
-            return False
+        self.fetcher.stop()
+
+    def _open_store(self):
+        if self.pack_format == PACK_FORMAT_MBTILES:
+            # um commit a cada 500 tiles (ou 2 s), não um por tile
+            return MBTilesWriter(self.pack_folder, self.layers, batch_size=500, batch_seconds=2.0)
+        for k in self.layers:
+            os.makedirs(os.path.join(self.pack_folder, k), exist_ok=True)
+        return _FolderStore(self.pack_folder)
+
+    def _wait(self, seconds):
+        """Pausa entre rodadas; False se cancelaram no meio."""
+        end = time.monotonic() + seconds
+        while time.monotonic() < end:
+            if self._stop:
+                return False
+            time.sleep(0.2)
+        return not self._stop
 
     def run(self):
+        store = manifest = None
         try:
-            lat_min, lon_min, lat_max, lon_max = bounds_from_center_km(self.center_lat, self.center_lon, self.radius_km)
-
-            for k in self.layers:
-                os.makedirs(os.path.join(self.pack_folder, k), exist_ok=True)
-
-            zmin = int(clamp(min(self.zoom_min, self.zoom_max), 1, 19))
-            zmax = int(clamp(max(self.zoom_min, self.zoom_max), 1, 19))
-            zooms = list(range(zmin, zmax + 1))
-
-            tiles_per_zoom = {}
-            tiles_total = 0
-            for z in zooms:
-                x_min, y_max = deg2num(lat_min, lon_min, z)
-                x_max, y_min = deg2num(lat_max, lon_max, z)
-                x0, x1 = min(x_min, x_max), max(x_min, x_max)
-                y0, y1 = min(y_min, y_max), max(y_min, y_max)
-                tiles = [(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
-                tiles_per_zoom[z] = tiles
-                tiles_total += len(tiles)
-
-            if tiles_total <= 0:
-                self.failed.emit("Nenhum tile calculado (bounds inválidos).")
-                return
-
-            per_layer_total = tiles_total
-            layer_done = {k: 0 for k in self.layers}
+            pack_existed = os.path.exists(self.pack_folder)
+            store = self._open_store()
+            manifest = TileManifest(manifest_path_for(self.pack_folder))
+            if not pack_existed and not manifest.created:
+                # manifesto órfão (pack apagado): nada do que ele diz estar pronto existe
+                manifest.reset_done()
+            self._run(store, manifest, pack_existed)
+        except Exception as e:
+            self.failed.emit(str(e))
+        finally:
+            # cancelado/erro: grava o que veio (pack antes do manifesto), sem metadata final
+            if store is not None:
+                try:
+                    store.close(finalize=False)
+                except Exception:
+                    pass
+            if manifest is not None:
+                try:
+                    manifest.close()
+                except Exception:
+                    pass
+            invalidate_pack_index(self.pack_folder)
+
+    def _run(self, store, manifest, pack_existed):
+        zmin = int(clamp(min(self.zoom_min, self.zoom_max), 1, 19))
+        zmax = int(clamp(max(self.zoom_min, self.zoom_max), 1, 19))
+        zooms = list(range(zmin, zmax + 1))
+
+        rects = request_rects(self.center_lat, self.center_lon, self.radius_km, zmin, zmax)
+        tiles_total = sum((x1 - x0 + 1) * (y1 - y0 + 1) for x0, x1, y0, y1 in rects.values())
+
+        if tiles_total <= 0:
+            self.failed.emit("Nenhum tile calculado (bounds inválidos).")
+            return
 
+        build_lower = self.build_lower and zmax > zmin
+        if build_lower and not pillow_available():
+            self.failed.emit("Montar zooms menores localmente precisa do Pillow (pip install pillow).")
+            return
+        download_rects = {zmax: rects[zmax]} if build_lower else rects
+
+        # ---- plano no manifesto (retomar = só o que está PENDING) ----
+        self.status.emit("Preparando lista de tiles...")
+        # pirâmide que ficou pela metade (cancelado) numa rodada anterior: refaz inteira
+        rebuild_pyramid = manifest.meta().get("pyramid_dirty") == "1"
+        manifest.set_meta({
+            "center_lat": self.center_lat,
+            "center_lon": self.center_lon,
+            "radius_km": self.radius_km,
+            "zoom_min": zmin,
+            "zoom_max": zmax,
+            "pack_format": self.pack_format,
+            "build_lower": int(build_lower),
+            "pyramid_dirty": int(build_lower or rebuild_pyramid),
+        })
+        if manifest.created:
+            # pack antigo sem manifesto: adota o que já está gravado (única vez que o pack é lido)
+            have = coverage_from_pack(self.pack_folder) if pack_existed else {}
+            keys = ((layer, z, x, y) for z, (x0, x1, y0, y1) in download_rects.items()
+                    for x in range(x0, x1 + 1) for y in range(y0, y1 + 1) for layer in self.layers)
+            manifest.plan(keys, already_done=lambda layer, z, x, y: layer in have and (z, x, y) in have[layer])
+            new_tiles = manifest.count(PENDING)
+        else:
+            # ampliar/retomar: só entra no plano o que o manifesto ainda não conhece
+            # (a quadtree pula os blocos do pedido que já estão no pack)
+            known = coverage_from_manifest(manifest)
+            keys = ((layer, z, x, y) for layer in self.layers for z, rect in download_rects.items()
+                    for x, y in known.get(layer, _EMPTY_COVERAGE).missing(z, rect))
+            new_tiles = manifest.plan(keys)
+            if new_tiles:
+                self.status.emit(f"Ampliando pacote: {new_tiles} tiles novos")
+        manifest.reopen_missing()
+
+        counts = manifest.counts()
+        layer_total = {k: max(1, sum(counts.get(k, {}).values())) for k in self.layers}
+        layer_done = {k: counts.get(k, {}).get(DONE, 0) + counts.get(k, {}).get(NOT_FOUND, 0) for k in self.layers}
+        layer_zoom = {k: zmin for k in self.layers}
+        all_total = sum(layer_total.values())
+
+        for layer in self.layers:
+            self.layer_progress.emit(layer, layer_done[layer], layer_total[layer], zmin, 0.0, -1.0)
+
+        meter = ThroughputMeter(window_s=10.0)
+        last = {"emit": 0.0, "commit": time.monotonic()}
+        fresh = {k: set() for k in self.layers}  # (x, y) do zoom máximo baixados agora (pirâmide)
+
+        def commit(force=False):
+            now = time.monotonic()
+            if force or manifest.buffered >= 500 or (now - last["commit"]) >= 2.0:
+                store.flush()      # pack primeiro...
+                manifest.flush()   # ...depois o manifesto
+                last["commit"] = now
+
+        def emit_progress():
+            now = time.monotonic()
+            if (now - last["emit"]) < 0.25:
+                return
+            last["emit"] = now
+            rate = meter.rate()
+            eta = meter.eta(all_total - sum(layer_done.values()))
             for layer in self.layers:
-                self.layer_progress.emit(layer, 0, per_layer_total, zmin)
+                self.layer_progress.emit(layer, layer_done[layer], layer_total[layer], layer_zoom[layer], rate, eta)
+            if rate > 0:
+                self.status.emit(f"z{max(layer_zoom.values())} | {rate:.1f} tiles/s | ETA {fmt_eta(eta)}")
+
+        def jobs():
+            for key in manifest.pending():
+                layer, z, x, y = key
+                yield key, self.sources[layer].format(z=z, x=x, y=y)
+
+        def on_result(key, data, err):
+            if self._stop:
+                return False
+            layer, z, x, y = key
+            if err is not None:
+                # não aborta o pack: fica PENDING para a próxima rodada (ou NOT_FOUND se 4xx)
+                manifest.mark_failed(key, err.reason, err.permanent)
+                if err.permanent:
+                    layer_done[layer] += 1
+            else:
+                digest = store.put(layer, z, x, y, data)
+                manifest.mark_done(key, data, digest)
+                if build_lower:
+                    fresh[layer].add((x, y))
+                layer_done[layer] += 1
+                layer_zoom[layer] = z
+                meter.add()
+            commit()
+            emit_progress()
+            return True
 
-            last_emit_layer = {k: 0 for k in self.layers}
-            emit_every = 25
-            last_status_time = 0.0
+        for n in range(self.max_passes):
+            commit(force=True)
+            pending = manifest.count(PENDING)
+            if pending == 0:
+                break
+            if n > 0:
+                self.status.emit(f"Rodada {n + 1}/{self.max_passes}: {pending} tiles com falha, tentando de novo...")
+                if not self._wait(self.retry_delay_s * n):
+                    break
+            self.fetcher.run(jobs(), on_result)
+
+        commit(force=True)
+        if self._stop:
+            self.failed.emit("Download cancelado.")
+            return
 
-            for z in zooms:
-                if self._stop:
-                    self.failed.emit("Download cancelado.")
-                    return
+        # o que sobrou depois das rodadas: faltando (volta a ser tentado se retomar)
+        manifest.give_up_pending()
 
-                tiles = tiles_per_zoom[z]
-                self.status.emit(f"Baixando zoom {z} ({len(tiles)} tiles por camada)")
+        built = 0
+        if build_lower:
+            if rebuild_pyramid:
+                fresh = {k: {(x, y) for _, x, y in manifest.keys(k, (DONE,), zmax)} for k in self.layers}
+            else:
+                # além dos recém-baixados: tiles do zoom máximo que ainda não têm pai (pack ampliado/adotado)
+                done = coverage_from_manifest(manifest, (DONE,))
+                for k in self.layers:
+                    tree = done.get(k, _EMPTY_COVERAGE)
+                    fresh[k].update((x, y) for _, x, y in manifest.keys(k, (DONE,), zmax)
+                                    if (zmax - 1, x >> 1, y >> 1) not in tree)
+            built = self._build_lower_zooms(store, manifest, fresh, zmin, zmax, commit)
+            if self._stop:
+                self.failed.emit("Download cancelado.")
+                return
+            manifest.set_meta({"pyramid_dirty": 0})
+        missing = manifest.missing()
+        report_path = missing_report_path_for(self.pack_folder)
+        if missing:
+            manifest.write_report(report_path)
+        elif os.path.exists(report_path):
+            os.remove(report_path)
+
+        for layer in self.layers:
+            self.layer_progress.emit(layer, layer_total[layer], layer_total[layer], zmax, 0.0, 0.0)
+
+        # metadata/meta.json só com o manifesto consistente (todo tile com estado final)
+        if not manifest.is_consistent():
+            self.failed.emit("Manifesto inconsistente: o pacote não foi finalizado.")
+            return
+        dedup = manifest.dedup_stats()
+        learn_dedup_fractions(dedup)
+
+        created_at = time.strftime("%Y-%m-%d %H:%M:%S")
+        if self.pack_format == PACK_FORMAT_MBTILES:
+            # minzoom/maxzoom/bounds/center (padrão MBTiles) saem do close()
+            meta = {
+                "pack_center": f"{self.center_lat},{self.center_lon}",
+                "radius_km": self.radius_km,
+                "created_at": created_at,
+                "missing_tiles": len(missing),
+            }
+        else:
+            # pack ampliado: zooms/cobertura são os do pack inteiro, não só deste pedido
+            coverage = pack_coverage_rects(coverage_from_manifest(manifest, (DONE, NOT_FOUND)))
+            pack_zooms = sorted(coverage)
+            meta = {
+                "center": [self.center_lat, self.center_lon],
+                "radius_km": self.radius_km,
+                "zoom_min": pack_zooms[0] if pack_zooms else zmin,
+                "zoom_max": pack_zooms[-1] if pack_zooms else zmax,
+                "zooms": pack_zooms or zooms,
+                "created_at": created_at,
+                "layers": self.layers,
+                "missing_tiles": len(missing),
+                # retângulo de tiles por zoom: o índice do pack (pack_index) sai daqui, sem varrer a pasta
+                "coverage": {str(z): list(r) for z, r in coverage.items()},
+            }
+        try:
+            store.set_metadata(meta)
+        except Exception:
+            pass
+
+        self.status.emit("Finalizando pacote...")
+        store.close()
+        manifest.close()
+
+        msg = (
+            "Download concluído!\n\n"
+            f"Pacote:\n{self.pack_folder}\n\n"
+            f"Camadas: light / dark / sat\n"
+            f"Zoom: {zmin} → {zmax}\n"
+            f"Raio: {self.radius_km:.1f} km\n"
+            f"Tiles por camada: {tiles_total}"
+        )
+        if pack_existed:
+            msg += f"\nTiles novos neste download: {new_tiles}"
+        if build_lower:
+            msg += f"\nZoom {zmin} → {zmax - 1} montado localmente: {built} tiles"
+        tiles_done = sum(n for _, n in dedup.values())
+        if tiles_done:
+            unique = sum(u for u, _ in dedup.values())
+            msg += f"\nImagens únicas: {unique} de {tiles_done} ({100.0 * unique / tiles_done:.0f}%)"
+        if missing:
+            not_found = sum(1 for row in missing if row[4] == NOT_FOUND)
+            msg += (
+                f"\n\nTiles faltando: {len(missing)} ({not_found} inexistentes no servidor)\n"
+                f"Relatório: {report_path}\n"
+                "Baixar de novo o mesmo pacote (ou “Retomar download”) tenta só os que faltam."
+            )
 
-                for (x, y) in tiles:
-                    if self._stop:
-                        self.failed.emit("Download cancelado.")
-                        return
+        self.status.emit("Concluído.")
+        self.finished.emit(msg)
 
-                    for layer in self.layers:
-                        url = self.sources[layer].format(z=z, x=x, y=y)
-                        out_dir = os.path.join(self.pack_folder, layer, str(z), str(x))
-                        out_path = os.path.join(out_dir, f"{y}.png")
 
-                        ok = self._download_one(url, out_path)
-                        if not ok:
-                            self.failed.emit(f"Falha ao baixar: {url}")
-                            return
+    def _build_lower_zooms(self, store, manifest, dirty, zmin, zmax, commit):
+        """Zooms zmin..zmax-1 a partir do zmax (pool de processos); pais só dos tiles em `dirty`."""
+        def write(layer, z, x, y, data):
+            digest = store.put(layer, z, x, y, data)
+            manifest.mark_built((layer, z, x, y), data, digest)
+            commit()
+
+        def progress(layer, z, done, total):
+            self.status.emit(f"Montando zoom {z} ({layer}): {done}/{total}")
+
+        commit(force=True)
+        return build_pyramid(
+            dirty, zmax, zmin,
+            read=store.get,
+            write=write,
+            end_level=lambda z: commit(force=True),  # filhos gravados antes de montar o próximo zoom
+            progress=progress,
+            should_stop=lambda: self._stop,
+        )
 
-                        layer_done[layer] += 1
 
-                        now = time.time()
-                        if (now - last_status_time) > 0.15:
-                            last_status_time = now
-                            self.status.emit(f"{layer.upper()} | z{z} | x{x} y{y}")
+# ---------------- Thread para converter pack em pasta -> .mbtiles ----------------
+class PackConvertWorker(QThread):
+    progress = Signal(int, str)  # tiles gravados, camada
+    finished = Signal(str)
+    failed = Signal(str)
 
-                        if (layer_done[layer] - last_emit_layer[layer]) >= emit_every:
-                            last_emit_layer[layer] = layer_done[layer]
-                            self.layer_progress.emit(layer, layer_done[layer], per_layer_total, z)
+    def __init__(self, folder, out_path):
+        super().__init__()
+        self.folder = folder
+        self.out_path = out_path
+        self._stop = False
 
-            for layer in self.layers:
-                self.layer_progress.emit(layer, per_layer_total, per_layer_total, zmax)
+    def request_stop(self):
+        self._stop = True
 
-            meta = {
-                "center": [self.center_lat, self.center_lon],
-                "radius_km": self.radius_km,
-                "zoom_min": zmin,
-                "zoom_max": zmax,
-                "zooms": zooms,
-                "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
-                "layers": self.layers
-            }
-            try:
-                with open(os.path.join(self.pack_folder, "meta.json"), "w", encoding="utf-8") as f:
-                    json.dump(meta, f, ensure_ascii=False, indent=2)
-            except Exception:
-                pass
-
-            self.status.emit("Concluído.")
-            self.finished.emit(
-                "Download concluído!\n\n"
-                f"Pasta do pacote:\n{self.pack_folder}\n\n"
-                f"Camadas: light / dark / sat\n"
-                f"Zoom: {zmin} → {zmax}\n"
-                f"Raio: {self.radius_km:.1f} km\n"
-                f"Tiles por camada: {per_layer_total}"
+    def run(self):
+        try:
+            count = convert_folder_pack(
+                self.folder, self.out_path,
+                progress=self.progress.emit,
+                should_stop=lambda: self._stop,
             )
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
 
+        if self._stop:
+            self.failed.emit("Conversão cancelada.")
+        elif count == 0:
+            self.failed.emit("Nenhum tile encontrado na pasta (estrutura {z}/{x}/{y}.png).")
+        else:
+            self.finished.emit(f"Pacote convertido!\n\n{self.out_path}\n\nTiles: {count}")
+
+
+# ---------------- Thread para ler a cobertura de um pack existente ----------------
+class CoverageLoadWorker(QThread):
+    loaded = Signal(str, object)  # caminho do pack, {camada: CoverageQuadtree}
+    failed = Signal(str)
+
+    def __init__(self, pack_path):
+        super().__init__()
+        self.pack_path = pack_path
+
+    def run(self):
+        try:
+            coverage = load_pack_coverage(self.pack_path)
         except Exception as e:
             self.failed.emit(str(e))
+            return
+        if not any(t.count() for t in coverage.values()):
+            self.failed.emit(f"Nenhum tile encontrado no pacote:\n{self.pack_path}")
+            return
+        self.loaded.emit(self.pack_path, coverage)
 
 
 # ---------------- Serviço global (continua mesmo se sair da página) ----------------
 class MapsDownloadService(QObject):
     started = Signal()
-    layer_progress = Signal(str, int, int, int)
+    layer_progress = Signal(str, int, int, int, float, float)
     status = Signal(str)
     finished = Signal(str)
     failed = Signal(str)
@@ -236,9 +651,9 @@ class MapsDownloadService(QObject):
 
         self.last_status = "pronto"
         self.layer_state = {
-            "light": {"done": 0, "total": 1, "zoom": 0},
-            "dark":  {"done": 0, "total": 1, "zoom": 0},
-            "sat":   {"done": 0, "total": 1, "zoom": 0},
+            "light": {"done": 0, "total": 1, "zoom": 0, "rate": 0.0, "eta": -1.0},
+            "dark":  {"done": 0, "total": 1, "zoom": 0, "rate": 0.0, "eta": -1.0},
+            "sat":   {"done": 0, "total": 1, "zoom": 0, "rate": 0.0, "eta": -1.0},
         }
         self._pending_popup = None  # ("success"/"error"/"info", message)
 
@@ -253,11 +668,15 @@ class MapsDownloadService(QObject):
         self._pending_popup = None
         return p
 
-    def start_download(self, center_lat, center_lon, radius_km, zoom_min, zoom_max, pack_folder) -> bool:
+    def start_download(self, center_lat, center_lon, radius_km, zoom_min, zoom_max, pack_folder,
+                       pack_format=PACK_FORMAT_MBTILES, build_lower=False) -> bool:
         if self.is_running():
             return False
 
-        self.downloader = TilePackDownloader(center_lat, center_lon, radius_km, zoom_min, zoom_max, pack_folder)
+        self.downloader = TilePackDownloader(
+            center_lat, center_lon, radius_km, zoom_min, zoom_max, pack_folder, pack_format,
+            build_lower=build_lower,
+        )
         self.downloader.layer_progress.connect(self._on_layer_progress)
         self.downloader.status.connect(self._on_status)
         self.downloader.finished.connect(self._on_finished)
@@ -280,13 +699,15 @@ class MapsDownloadService(QObject):
         if d and d.isRunning():
             d.wait(wait_ms)
 
-    def _on_layer_progress(self, layer, done, total, zoom):
+    def _on_layer_progress(self, layer, done, total, zoom, rate, eta):
         layer = (layer or "").lower()
         if layer in self.layer_state:
             self.layer_state[layer]["done"] = int(done)
             self.layer_state[layer]["total"] = int(max(1, total))
             self.layer_state[layer]["zoom"] = int(zoom)
-        self.layer_progress.emit(layer, done, total, zoom)
+            self.layer_state[layer]["rate"] = float(rate)
+            self.layer_state[layer]["eta"] = float(eta)
+        self.layer_progress.emit(layer, done, total, zoom, rate, eta)
 
     def _on_status(self, text):
         self.last_status = text or ""
@@ -321,6 +742,8 @@ class MapsManagerPage(QWidget):
     def __init__(self, has_web: bool, parent=None):
         super().__init__(parent)
         self.has_web = has_web
+        self._extend = None  # pack sendo ampliado: {"path", "coverage"}
+        self._coverage_worker = None
         self._build_ui()
         install_maps_shutdown_hook()
         self._attach_download_service()
@@ -445,6 +868,20 @@ class MapsManagerPage(QWidget):
         self.zoom_max.setValue(16)
         self.zoom_max.setFixedWidth(70)
 
+        self.combo_format = QComboBox()
+        self.combo_format.addItem("MBTiles (arquivo único)", PACK_FORMAT_MBTILES)
+        self.combo_format.addItem("Pasta {z}/{x}/{y}.png", PACK_FORMAT_FOLDER)
+        self.combo_format.setToolTip("Arquivo único: bem mais rápido de copiar para o cartão SD do Pi")
+
+        self.chk_build_lower = QCheckBox("Montar zooms menores localmente")
+        self.chk_build_lower.setToolTip(
+            "Baixa só o zoom máximo e monta os menores a partir dele (mais rápido).\n"
+            "Acima do zoom máximo o mapa offline amplia os tiles do pacote na hora."
+        )
+        if not pillow_available():
+            self.chk_build_lower.setEnabled(False)
+            self.chk_build_lower.setToolTip("Precisa do Pillow (pip install pillow)")
+
         self.lbl_estimate = QLabel("Estimativa: --")
         self.lbl_estimate.setStyleSheet("color:#666;")
 
@@ -454,8 +891,11 @@ class MapsManagerPage(QWidget):
         dl_layout.addWidget(self.zoom_min, 0, 3, alignment=Qt.AlignVCenter)
         dl_layout.addWidget(QLabel("Zoom máx"), 0, 4, alignment=Qt.AlignRight | Qt.AlignVCenter)
         dl_layout.addWidget(self.zoom_max, 0, 5, alignment=Qt.AlignVCenter)
-        dl_layout.addWidget(self.lbl_estimate, 0, 6, alignment=Qt.AlignVCenter)
-        dl_layout.setColumnStretch(6, 1)
+        dl_layout.addWidget(QLabel("Formato"), 0, 6, alignment=Qt.AlignRight | Qt.AlignVCenter)
+        dl_layout.addWidget(self.combo_format, 0, 7, alignment=Qt.AlignVCenter)
+        dl_layout.addWidget(self.chk_build_lower, 0, 8, alignment=Qt.AlignVCenter)
+        dl_layout.addWidget(self.lbl_estimate, 0, 9, alignment=Qt.AlignVCenter)
+        dl_layout.setColumnStretch(9, 1)
         root.addWidget(dl_frame)
 
         # --- Mapa ---
@@ -464,6 +904,11 @@ class MapsManagerPage(QWidget):
         self.msg_offline.setStyleSheet("font-size:14px; color:#b00020;")
 
         self.map = QWebEngineView()
+        # centro do mapa (moveend) para a estimativa: o mesmo que o download usa
+        self._bridge = ViewBridge(self)
+        self._bridge.attach(self.map.page())
+        self._bridge.viewChanged.connect(self._on_view_changed)
+        self.map.loadStarted.connect(self._bridge.page_loading)
         self._init_map()
 
         if not self.has_web:
@@ -476,10 +921,24 @@ class MapsManagerPage(QWidget):
         root.addWidget(self.msg_offline, stretch=0)
         root.addWidget(self.map, stretch=1)
 
-        # --- Botão baixar ---
+        # --- Botões baixar / converter ---
+        btn_row = QHBoxLayout()
         self.btn_save = QPushButton("Baixar pacote offline")
         self.btn_save.setMinimumHeight(34)
-        root.addWidget(self.btn_save)
+        self.btn_convert = QPushButton("Converter pasta → MBTiles")
+        self.btn_convert.setMinimumHeight(34)
+        self.btn_convert.setToolTip("Converte um pacote em pasta (já baixado) para um arquivo .mbtiles")
+        self.btn_resume = QPushButton("Retomar download…")
+        self.btn_resume.setMinimumHeight(34)
+        self.btn_resume.setToolTip("Continua um pacote interrompido (ou com tiles faltando) a partir do manifesto")
+        self.btn_extend = QPushButton("Ampliar pacote existente…")
+        self.btn_extend.setMinimumHeight(34)
+        self.btn_extend.setToolTip("Mostra no mapa o que o pacote já tem e baixa só o que falta para a região/zoom atuais")
+        btn_row.addWidget(self.btn_save, 1)
+        btn_row.addWidget(self.btn_extend)
+        btn_row.addWidget(self.btn_resume)
+        btn_row.addWidget(self.btn_convert)
+        root.addLayout(btn_row)
 
         # --- Progresso (escondido até começar) ---
         self.prog_frame = QFrame()
@@ -521,12 +980,17 @@ class MapsManagerPage(QWidget):
         # conexões
         self.btn_help.clicked.connect(self._show_help)
         self.btn_save.clicked.connect(self._save_tiles)
+        self.btn_convert.clicked.connect(self._convert_pack)
+        self.btn_resume.clicked.connect(self._resume_download)
+        self.btn_extend.clicked.connect(self._toggle_extend)
+        self.map.loadFinished.connect(lambda ok: ok and self._push_coverage())
         self.btn_go.clicked.connect(self._go_to_region)
         self.btn_cancel.clicked.connect(self._cancel_download)
 
         self.radius_km.valueChanged.connect(self._refresh_estimate)
         self.zoom_min.valueChanged.connect(self._refresh_estimate)
         self.zoom_max.valueChanged.connect(self._refresh_estimate)
+        self.chk_build_lower.toggled.connect(self._refresh_estimate)
 
         self._refresh_estimate()
 
@@ -541,6 +1005,17 @@ class MapsManagerPage(QWidget):
             "- O ponto base é o centro do mapa (ponto vermelho).\n"
             "- Duplo-clique alterna preview (light/dark/satélite).\n"
             "- Você pode trocar de página: o download continua.\n"
+            "- Cancelou ou fechou o app? “Retomar download” (ou baixar de novo\n"
+            "  com o mesmo nome) continua de onde parou, pelo manifesto do pacote.\n"
+            "- “Ampliar pacote existente” mostra no mapa o que o pacote já tem\n"
+            "  (verde: completo, amarelo: parcial; o retângulo vermelho é a região\n"
+            "  pedida) e o download seguinte baixa só o que falta, no mesmo pacote.\n"
+            "- “Montar zooms menores localmente” baixa só o zoom máximo e monta\n"
+            "  os outros a partir dele. No mapa offline, os zooms acima do máximo\n"
+            "  do pacote são ampliados na hora (não precisa baixar 18–19).\n"
+            "- Formato MBTiles: o pacote é um único arquivo .mbtiles, bem mais\n"
+            "  rápido de copiar para o cartão SD. Pacotes antigos em pasta podem\n"
+            "  ser convertidos em “Converter pasta → MBTiles”.\n"
         )
         QMessageBox.information(self, "Manual", txt)
 
@@ -554,6 +1029,7 @@ class MapsManagerPage(QWidget):
         <meta name="viewport" content="width=device-width, initial-scale=1.0">
         <link rel="stylesheet" href="https://unpkg.com/leaflet@1.9.4/dist/leaflet.css"/>
         <script src="https://unpkg.com/leaflet@1.9.4/dist/leaflet.js"></script>
+        <script src="%QWEBCHANNEL_JS%"></script>
         <style>
           html, body { margin:0; height:100%; }
           #wrap { position:relative; height:100%; }
@@ -677,6 +1153,48 @@ class MapsManagerPage(QWidget):
 
           function goTo(lat, lon) { map.setView([lat, lon], map.getZoom()); }
 
+          // cobertura do pack sendo ampliado (verde/amarelo) + região pedida (vermelho)
+          var coverageLayer = L.layerGroup().addTo(map);
+          var requestRect = null;
+          var requestRadiusKm = 0;
+          var COVERAGE_STYLE = {
+            2: { color:"#2ca24f", weight:0, fillColor:"#2ca24f", fillOpacity:0.35, interactive:false },
+            1: { color:"#e0a800", weight:0, fillColor:"#e0a800", fillOpacity:0.35, interactive:false }
+          };
+
+          function updateRequestRect() {
+            if (!requestRadiusKm) { return; }
+            var c = map.getCenter();
+            var dlat = requestRadiusKm / 111.0;
+            var dlon = requestRadiusKm / (111.0 * Math.max(0.1, Math.cos(c.lat * Math.PI / 180)));
+            var b = [[c.lat - dlat, c.lng - dlon], [c.lat + dlat, c.lng + dlon]];
+            if (requestRect) { requestRect.setBounds(b); }
+            else {
+              requestRect = L.rectangle(b, {
+                color:"#d00000", weight:1, dashArray:"4 4", fillColor:"#d00000", fillOpacity:0.12, interactive:false
+              }).addTo(map);
+              requestRect.bringToBack();
+            }
+          }
+
+          function showCoverage(blocks, radiusKm) {
+            coverageLayer.clearLayers();
+            blocks.forEach(function(b){
+              L.rectangle([[b[1], b[2]], [b[3], b[4]]], COVERAGE_STYLE[b[0]]).addTo(coverageLayer);
+            });
+            requestRadiusKm = radiusKm;
+            updateRequestRect();
+          }
+
+          function clearCoverage() {
+            coverageLayer.clearLayers();
+            requestRadiusKm = 0;
+            if (requestRect) { map.removeLayer(requestRect); requestRect = null; }
+          }
+
+          window.showCoverage = showCoverage;
+          window.clearCoverage = clearCoverage;
+
           window.getBounds = getViewInfo;
           window.goTo = goTo;
           window.cycleBase = cycleBase;
@@ -691,30 +1209,119 @@ class MapsManagerPage(QWidget):
           zoomLabel.addTo(map);
 
           map.on('zoomend', function() { zoomLabel.update(); updateCenterInfo(); });
-          map.on('moveend', function() { updateCenterInfo(); });
+          map.on('moveend', function() { updateCenterInfo(); updateRequestRect(); });
           map.on('dblclick', function(){ cycleBase(); });
 
           map.whenReady(function(){ updateCenterInfo(); document.title="MAP_READY"; });
+
+          // ---- ponte com o Python (views/web_bridge.py: ViewBridge) ----
+          if (window.qt && qt.webChannelTransport) {
+            new QWebChannel(qt.webChannelTransport, function(channel){
+              var bridge = channel.objects.bridge;
+              function reportView(){
+                var c = map.getCenter();
+                bridge.reportView(c.lat, c.lng, map.getZoom());
+              }
+              map.on('moveend', reportView);
+              reportView();
+              bridge.pageReady();
+            });
+          }
         </script>
         </body>
         </html>
-        """
+        """.replace("%QWEBCHANNEL_JS%", QWEBCHANNEL_JS)
         self.map.setHtml(html)
 
     # ---------- Estimativa ----------
+    def _map_center(self) -> tuple[float, float]:
+        """Centro atual do mapa (ponte); antes da página responder, o da Navegação."""
+        if self._bridge.view is not None:
+            return self._bridge.view[0], self._bridge.view[1]
+        return float(self.lat.value()), float(self.lon.value())
+
+    def _on_view_changed(self, _lat, _lon, _zoom):
+        # só o texto: a cobertura no mapa não depende do centro
+        self._update_estimate_label()
+
     def _refresh_estimate(self):
+        self._update_estimate_label()
+        self._push_coverage()
+
+    def _update_estimate_label(self):
+        center_lat, center_lon = self._map_center()
         est = estimate_tiles_and_size(
-            center_lat=float(self.lat.value()),
-            center_lon=float(self.lon.value()),
+            center_lat=center_lat,
+            center_lon=center_lon,
             radius_km=float(self.radius_km.value()),
             zoom_min=int(self.zoom_min.value()),
-            zoom_max=int(self.zoom_max.value())
+            zoom_max=int(self.zoom_max.value()),
+            coverage=self._extend["coverage"] if self._extend else None,
+            build_lower=self.chk_build_lower.isChecked(),
         )
+        text = f"Estimativa: {est['tiles_per_layer']} tiles/camada ({est['total_files']} arquivos) | "
+        if self._extend:
+            text = f"Faltam no pacote: {est['tiles_per_layer']} de {est['tiles_request']} tiles/camada | "
+        if est["tiles_download"] != est["tiles_per_layer"]:
+            text += f"baixa {est['tiles_download']}/camada | "
         self.lbl_estimate.setText(
-            f"Estimativa: {est['tiles_per_layer']} tiles/camada ({est['total_files']} arquivos) | "
-            f"~{fmt_gb(est['gib_min'])} – {fmt_gb(est['gib_max'])}"
+            text + f"~{fmt_gb(est['gib_min'])} – {fmt_gb(est['gib_max'])} com dedup estimada "
+            f"(sem dedup: {fmt_gb(est['gib_max_raw'])})"
         )
 
+    # ---------- Ampliar pacote existente (cobertura no mapa) ----------
+    def _toggle_extend(self):
+        if self._extend is not None:
+            self._set_extend(None)
+            return
+        if self._coverage_worker is not None and self._coverage_worker.isRunning():
+            return
+
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Escolher pacote para ampliar", "",
+            "Pacote de tiles (*.mbtiles meta.json manifest.sqlite)"
+        )
+        if not path:
+            return
+        if path.endswith("manifest.sqlite"):
+            path = pack_path_for_manifest(path)
+        elif not is_mbtiles(path):
+            path = os.path.dirname(os.path.abspath(path))
+        self._load_coverage(path)
+
+    def _load_coverage(self, path):
+        self._coverage_worker = CoverageLoadWorker(path)
+        self._coverage_worker.loaded.connect(self._on_coverage_loaded)
+        self._coverage_worker.failed.connect(self._on_coverage_failed)
+        self.btn_extend.setEnabled(False)
+        self.btn_extend.setText("Lendo cobertura...")
+        self._coverage_worker.start()
+
+    def _on_coverage_loaded(self, path, coverage):
+        self.btn_extend.setEnabled(True)
+        self._set_extend({"path": path, "coverage": coverage})
+
+    def _on_coverage_failed(self, msg):
+        self.btn_extend.setEnabled(True)
+        self._set_extend(None)
+        QMessageBox.warning(self, "Erro", msg)
+
+    def _set_extend(self, extend):
+        self._extend = extend
+        if extend is None:
+            self.btn_extend.setText("Ampliar pacote existente…")
+        else:
+            self.btn_extend.setText(f"Parar de ampliar ({os.path.basename(os.path.normpath(extend['path']))})")
+        self._refresh_estimate()
+
+    def _push_coverage(self):
+        if self._extend is None:
+            self.map.page().runJavaScript("if(window.clearCoverage) clearCoverage();")
+            return
+        blocks = preview_blocks(self._extend["coverage"], int(self.zoom_max.value()))
+        radius = float(self.radius_km.value())
+        self.map.page().runJavaScript(f"if(window.showCoverage) showCoverage({json.dumps(blocks)}, {radius:.3f});")
+
     # ---------- Download / Confirmações ----------
     def _save_tiles(self):
         if not self.has_web:
@@ -740,25 +1347,40 @@ class MapsManagerPage(QWidget):
         center_lat = float(data.get("centerLat", 0.0))
         center_lon = float(data.get("centerLon", 0.0))
 
-        name, ok = QInputDialog.getText(self, "Nome do pacote", "Nome da pasta do pacote:")
-        if not ok:
-            return
-        name = safe_name(name)
-        if not name:
-            return
-
-        base_folder = QFileDialog.getExistingDirectory(self, "Escolher pasta para salvar")
-        if not base_folder:
-            return
-
-        pack_folder = os.path.join(base_folder, name)
-        os.makedirs(pack_folder, exist_ok=True)
-
         radius_km = float(self.radius_km.value())
         zoom_min = int(self.zoom_min.value())
         zoom_max = int(self.zoom_max.value())
+        build_lower = self.chk_build_lower.isChecked()
+
+        if self._extend is not None:
+            # ampliação: baixa no próprio pack só o que a cobertura não tem
+            pack_folder = self._extend["path"]
+            pack_format = PACK_FORMAT_MBTILES if is_mbtiles(pack_folder) else PACK_FORMAT_FOLDER
+            base_folder = os.path.dirname(os.path.abspath(pack_folder))
+            est = estimate_tiles_and_size(center_lat, center_lon, radius_km, zoom_min, zoom_max,
+                                          coverage=self._extend["coverage"], build_lower=build_lower)
+            if est["tiles_per_layer"] == 0:
+                QMessageBox.information(self, "Nada a baixar", "A região e os zooms pedidos já estão no pacote.")
+                return
+        else:
+            name, ok = QInputDialog.getText(self, "Nome do pacote", "Nome da pasta do pacote:")
+            if not ok:
+                return
+            name = safe_name(name)
+            if not name:
+                return
+
+            base_folder = QFileDialog.getExistingDirectory(self, "Escolher pasta para salvar")
+            if not base_folder:
+                return
+
+            pack_format = self.combo_format.currentData()
+            # a pasta do pack só é criada pelo downloader (_open_store): ele precisa
+            # saber se o pack já existia (adoção, manifesto órfão)
+            pack_folder = pack_path_for(base_folder, name, pack_format)
 
-        est = estimate_tiles_and_size(center_lat, center_lon, radius_km, zoom_min, zoom_max)
+            est = estimate_tiles_and_size(center_lat, center_lon, radius_km, zoom_min, zoom_max,
+                                          build_lower=build_lower)
 
         # espaço livre em disco
         try:
@@ -767,20 +1389,42 @@ class MapsManagerPage(QWidget):
         except Exception:
             free_gib = None
 
+        # pasta em FAT/exFAT (cartão SD) não tem hardlink e grava um arquivo por
+        # tile: sem saber o sistema de arquivos, conta o pior caso sem dedup
+        need_gib = est["gib_max_raw"] if pack_format == PACK_FORMAT_FOLDER else est["gib_max"]
+
         THRESHOLD_GIB = 5.0
-        need_confirm = est["gib_max"] >= THRESHOLD_GIB
+        need_confirm = need_gib >= THRESHOLD_GIB
 
         not_enough = False
-        if free_gib is not None and free_gib < (est["gib_max"] * 1.15):
+        if free_gib is not None and free_gib < (need_gib * 1.15):
             not_enough = True
 
         info_lines = [
             f"Centro: {center_lat:.6f}, {center_lon:.6f}",
             f"Raio: {radius_km:.1f} km",
             f"Zoom: {est['zoom_min']} → {est['zoom_max']}",
-            f"Arquivos: {est['total_files']}",
-            f"Tamanho estimado: ~{fmt_gb(est['gib_min'])} – {fmt_gb(est['gib_max'])}",
         ]
+        if self._extend is not None:
+            info_lines += [
+                f"Ampliando: {pack_folder}",
+                f"Tiles novos: {est['tiles_per_layer']} de {est['tiles_request']} por camada",
+            ]
+        if build_lower:
+            info_lines.append(
+                f"Baixados: {est['tiles_download']} por camada (zoom {est['zoom_max']}); "
+                f"zoom {est['zoom_min']} → {est['zoom_max'] - 1} montado localmente"
+            )
+        info_lines += [
+            (f"Tiles: {est['total_files']} (num único arquivo .mbtiles)" if pack_format == PACK_FORMAT_MBTILES
+             else f"Arquivos: {est['total_files']}"),
+            f"Tamanho estimado: ~{fmt_gb(est['gib_min'])} – {fmt_gb(est['gib_max'])} "
+            f"(estimativa com tiles repetidos gravados uma vez; sem isso até {fmt_gb(est['gib_max_raw'])})",
+        ]
+        if pack_format == PACK_FORMAT_FOLDER:
+            info_lines.append(
+                f"Pasta: reserve até {fmt_gb(est['gib_max_raw'])} (FAT/exFAT não tem hardlink, sem dedup)"
+            )
         if free_gib is not None:
             info_lines.append(f"Espaço livre no disco: {fmt_gb(free_gib)}")
 
@@ -809,7 +1453,9 @@ class MapsManagerPage(QWidget):
             radius_km=radius_km,
             zoom_min=zoom_min,
             zoom_max=zoom_max,
-            pack_folder=pack_folder
+            pack_folder=pack_folder,
+            pack_format=pack_format,
+            build_lower=build_lower,
         )
         if not ok:
             QMessageBox.warning(self, "Em andamento", "Já existe um download em andamento.")
@@ -818,6 +1464,97 @@ class MapsManagerPage(QWidget):
     def _cancel_download(self):
         _DOWNLOAD_SERVICE.cancel()
 
+    def _resume_download(self):
+        if not self.has_web:
+            QMessageBox.warning(self, "Erro", "Conecte à internet para baixar os mapas.")
+            return
+        if _DOWNLOAD_SERVICE.is_running():
+            QMessageBox.warning(self, "Em andamento", "Já existe um download em andamento.")
+            return
+
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Escolher manifesto do pacote", "", "Manifesto (manifest.sqlite *.manifest.sqlite)"
+        )
+        if not path:
+            return
+
+        try:
+            with TileManifest(path) as manifest:
+                meta = manifest.meta()
+                pending = manifest.count(PENDING)
+            req = {
+                "center_lat": float(meta["center_lat"]),
+                "center_lon": float(meta["center_lon"]),
+                "radius_km": float(meta["radius_km"]),
+                "zoom_min": int(meta["zoom_min"]),
+                "zoom_max": int(meta["zoom_max"]),
+            }
+            pack_format = meta.get("pack_format", PACK_FORMAT_FOLDER)
+            build_lower = meta.get("build_lower") == "1"
+        except Exception as e:
+            QMessageBox.warning(self, "Erro", f"Manifesto inválido: {e}")
+            return
+
+        pack_path = pack_path_for_manifest(path)
+        r = QMessageBox.question(
+            self, "Retomar download",
+            f"Pacote:\n{pack_path}\n\n"
+            f"Zoom: {req['zoom_min']} → {req['zoom_max']} | Raio: {req['radius_km']:.1f} km\n"
+            f"Tiles pendentes: {pending} (e os que faltaram da última vez)\n\nContinuar?",
+            QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes
+        )
+        if r != QMessageBox.Yes:
+            return
+
+        _DOWNLOAD_SERVICE.start_download(pack_folder=pack_path, pack_format=pack_format, build_lower=build_lower, **req)
+
+    # ---------- Conversão pasta -> .mbtiles ----------
+    def _convert_pack(self):
+        if getattr(self, "_convert_worker", None) is not None and self._convert_worker.isRunning():
+            QMessageBox.warning(self, "Em andamento", "Já existe uma conversão em andamento.")
+            return
+
+        folder = QFileDialog.getExistingDirectory(self, "Escolher pacote (pasta) para converter")
+        if not folder:
+            return
+
+        default = os.path.normpath(folder) + MBTILES_EXT
+        out_path, _ = QFileDialog.getSaveFileName(self, "Salvar pacote MBTiles", default, "MBTiles (*.mbtiles)")
+        if not out_path:
+            return
+        if not out_path.lower().endswith(MBTILES_EXT):
+            out_path += MBTILES_EXT
+
+        self._convert_worker = PackConvertWorker(folder, out_path)
+        self._convert_worker.progress.connect(
+            lambda n, layer: self.btn_convert.setText(f"Convertendo... {n} tiles" + (f" ({layer})" if layer else ""))
+        )
+        self._convert_worker.finished.connect(self._on_convert_finished)
+        self._convert_worker.failed.connect(self._on_convert_failed)
+        self.btn_convert.setEnabled(False)
+        self.btn_convert.setText("Convertendo...")
+
+        # fechar o app no meio: para e espera o último commit
+        from PySide6.QtWidgets import QApplication
+        app = QApplication.instance()
+        if app:
+            worker = self._convert_worker
+            app.aboutToQuit.connect(lambda: (worker.request_stop(), worker.wait(15000)))
+
+        self._convert_worker.start()
+
+    def _reset_convert_button(self):
+        self.btn_convert.setEnabled(True)
+        self.btn_convert.setText("Converter pasta → MBTiles")
+
+    def _on_convert_finished(self, msg: str):
+        self._reset_convert_button()
+        QMessageBox.information(self, "Sucesso", msg)
+
+    def _on_convert_failed(self, msg: str):
+        self._reset_convert_button()
+        QMessageBox.warning(self, "Erro", msg)
+
     # ---------- UI de progresso (persistente) ----------
     def _progress_bar_for_layer(self, layer: str):
         layer = (layer or "").lower()
@@ -831,7 +1568,8 @@ class MapsManagerPage(QWidget):
         self._show_progress_frame()
         self._restore_download_ui_if_needed()
 
-    def _update_layer_progress(self, layer: str, done: int, total: int, zoom: int):
+    def _update_layer_progress(self, layer: str, done: int, total: int, zoom: int,
+                               rate: float = 0.0, eta: float = -1.0):
         self._show_progress_frame()
         pb = self._progress_bar_for_layer(layer)
         total = max(1, int(total))
@@ -839,7 +1577,10 @@ class MapsManagerPage(QWidget):
         pb.setMaximum(total)
         pb.setValue(done)
         pct = (done / total) * 100.0
-        pb.setFormat(f"{pct:.1f}%  ({done}/{total})  z{int(zoom)}")
+        text = f"{pct:.1f}%  ({done}/{total})  z{int(zoom)}"
+        if rate > 0 and done < total:
+            text += f"  |  {rate:.1f} tiles/s  ETA {fmt_eta(eta)}"
+        pb.setFormat(text)
 
     def _update_status(self, text: str):
         self._show_progress_frame()
@@ -848,6 +1589,8 @@ class MapsManagerPage(QWidget):
     def _on_service_finished(self, msg: str):
         QMessageBox.information(self, "Sucesso", msg)
         self.prog_frame.hide()
+        if self._extend is not None:
+            self._load_coverage(self._extend["path"])  # mapa passa a mostrar o pack ampliado
 
     def _on_service_failed(self, msg: str):
         if (msg or "").strip().lower() == "download cancelado.":
@@ -861,7 +1604,7 @@ class MapsManagerPage(QWidget):
             self._show_progress_frame()
             self.lbl_status.setText(f"Status: {_DOWNLOAD_SERVICE.last_status}")
             for layer, st in _DOWNLOAD_SERVICE.layer_state.items():
-                self._update_layer_progress(layer, st["done"], st["total"], st["zoom"])
+                self._update_layer_progress(layer, st["done"], st["total"], st["zoom"], st["rate"], st["eta"])
 
         pending = _DOWNLOAD_SERVICE.pending_popup()
         if pending is not None:
@@ -901,8 +1644,10 @@ class MapsManagerPage(QWidget):
             self.map.hide()
             self.msg_offline.show()
             self.btn_save.setEnabled(False)
+            self.btn_resume.setEnabled(False)
         else:
             self.msg_offline.hide()
             self.map.show()
             self.btn_save.setEnabled(True)
+            self.btn_resume.setEnabled(True)
             self._init_map()
\ No newline at end of file
@@ -0,0 +1,423 @@
+# views/mbtiles.py
+"""
+Pacote de tiles em arquivo único SQLite (MBTiles 1.3, com camadas).
+
+Um pack em pasta ({camada}/{z}/{x}/{y}.png) vira centenas de milhares de
+arquivos pequenos, lentos para copiar para o cartão SD do Pi e para varrer.
+Aqui tudo fica num .mbtiles, com os tiles deduplicados pelo conteúdo
+(mar, áreas lisas do light/dark... são bytes idênticos):
+
+    images      (tile_id, tile_data)  cada imagem única uma vez (tile_id = sha1)
+    layer_map   (layer, zoom_level, tile_column, tile_row, tile_id)
+    layer_tiles view layer_map + images (tile_data por coordenada)
+    tiles       view MBTiles padrão (só a camada padrão, para outras ferramentas)
+    metadata    name/value: bounds, center, minzoom, maxzoom, format, layers...
+
+tile_row segue a convenção TMS do MBTiles (y invertido); a API usa o y XYZ
+do Leaflet e converte por dentro.
+
+A camada "_" (FLAT_LAYER) é a de um pack simples, sem light/dark/sat.
+Sem dependências de Qt: o downloader (QThread), o handler do urdtiles:// e
+a conversão de packs em pasta usam este módulo.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Iterator, Optional
+
+MBTILES_EXT = ".mbtiles"
+FLAT_LAYER = "_"  # pack sem subpastas de camada
+PACK_LAYERS = ("light", "dark", "sat")
+
+TILE_EXTS = (".png", ".jpg", ".jpeg", ".webp")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata (name TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS images (
+    tile_id TEXT PRIMARY KEY,
+    tile_data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS layer_map (
+    layer TEXT NOT NULL,
+    zoom_level INTEGER NOT NULL,
+    tile_column INTEGER NOT NULL,
+    tile_row INTEGER NOT NULL,
+    tile_id TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS layer_map_index
+    ON layer_map (layer, zoom_level, tile_column, tile_row);
+CREATE VIEW IF NOT EXISTS layer_tiles AS
+    SELECT m.layer, m.zoom_level, m.tile_column, m.tile_row, i.tile_data
+    FROM layer_map AS m JOIN images AS i ON i.tile_id = m.tile_id;
+"""
+
+# (min_zoom, max_zoom, lat_min, lon_min, lat_max, lon_max), igual ao get_tile_info
+TileInfo = tuple[int, int, float, float, float, float]
+
+
+def is_mbtiles(path: Optional[str]) -> bool:
+    return bool(path) and path.lower().endswith(MBTILES_EXT) and os.path.isfile(path)
+
+
+def tile_hash(data: bytes) -> str:
+    """Id do conteúdo do tile (sha1 hex), o mesmo usado no manifesto."""
+    return hashlib.sha1(data).hexdigest()
+
+
+def tms_row(z: int, y: int) -> int:
+    """y XYZ <-> tile_row TMS (a conversão é a mesma nos dois sentidos)."""
+    return (1 << z) - 1 - y
+
+
+def num2deg(x: int, y: int, z: int) -> tuple[float, float]:
+    """Canto NW do tile (x, y, z) em lat/lon."""
+    n = 2.0 ** z
+    lon = x / n * 360.0 - 180.0
+    lat = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+    return lat, lon
+
+
+def _connect(path: str, readonly: bool) -> sqlite3.Connection:
+    if readonly:
+        uri = "file:" + os.path.abspath(path).replace("?", "%3f").replace("#", "%23") + "?mode=ro"
+        return sqlite3.connect(uri, uri=True, check_same_thread=False)
+    return sqlite3.connect(path, check_same_thread=False)
+
+
+def _read_metadata(conn: sqlite3.Connection) -> dict:
+    try:
+        return {name: value for name, value in conn.execute("SELECT name, value FROM metadata")}
+    except sqlite3.Error:
+        return {}
+
+
+def _scan_info(conn: sqlite3.Connection, layer: Optional[str] = None) -> Optional[TileInfo]:
+    """Zooms e bounds calculados das próprias linhas (bounds no maior zoom)."""
+    where, args = ("WHERE layer = ?", (layer,)) if layer else ("", ())
+    row = conn.execute(f"SELECT MIN(zoom_level), MAX(zoom_level) FROM layer_map {where}", args).fetchone()
+    if not row or row[0] is None:
+        return None
+    min_z, max_z = int(row[0]), int(row[1])
+
+    where_z = (where + " AND" if where else "WHERE") + " zoom_level = ?"
+    x0, x1, r0, r1 = conn.execute(
+        f"SELECT MIN(tile_column), MAX(tile_column), MIN(tile_row), MAX(tile_row) FROM layer_map {where_z}",
+        args + (max_z,),
+    ).fetchone()
+
+    # TMS: tile_row maior = mais ao norte
+    y_top, y_bottom = tms_row(max_z, r1), tms_row(max_z, r0)
+    lat_max, lon_min = num2deg(x0, y_top, max_z)
+    lat_min, lon_max = num2deg(x1 + 1, y_bottom + 1, max_z)
+    return (min_z, max_z, lat_min, lon_min, lat_max, lon_max)
+
+
+def _info_from_metadata(meta: dict) -> Optional[TileInfo]:
+    try:
+        lon_min, lat_min, lon_max, lat_max = (float(v) for v in meta["bounds"].split(","))
+        return (int(meta["minzoom"]), int(meta["maxzoom"]), lat_min, lon_min, lat_max, lon_max)
+    except (KeyError, ValueError):
+        return None
+
+
+class MBTilesWriter:
+    """
+    Escrita em lote: put() acumula e grava numa transação a cada batch_size
+    tiles ou batch_seconds (o que vier antes). close() grava o resto e
+    atualiza minzoom/maxzoom/bounds/center no metadata.
+
+    Cada imagem entra uma vez em images (INSERT OR IGNORE pelo sha1); as
+    coordenadas só apontam para ela.
+
+    Pode ser reaberto sobre um arquivo existente (continuar um download):
+    has() consulta o índice, sem tocar no sistema de arquivos.
+    """
+
+    def __init__(self, path: str, layers=PACK_LAYERS, batch_size: int = 500, batch_seconds: float = 2.0):
+        self.path = path
+        self.layers = tuple(layers)
+        self.batch_size = max(1, int(batch_size))
+        self.batch_seconds = float(batch_seconds)
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = _connect(path, readonly=False)
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+        default = self.layers[0] if self.layers else FLAT_LAYER
+        self._conn.execute("DROP VIEW IF EXISTS tiles")
+        self._conn.execute(
+            "CREATE VIEW tiles AS SELECT zoom_level, tile_column, tile_row, tile_data "
+            f"FROM layer_tiles WHERE layer = {_sql_str(default)}"
+        )
+        self._conn.commit()
+
+        self._rows: list[tuple] = []    # coordenadas -> tile_id
+        self._images: list[tuple] = []  # (tile_id, bytes)
+        self._last_commit = time.monotonic()
+        self.tiles_written = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def has(self, layer: str, z: int, x: int, y: int) -> bool:
+        row = self._conn.execute(
+            "SELECT 1 FROM layer_map WHERE layer = ? AND zoom_level = ? AND tile_column = ? AND tile_row = ?",
+            (layer, z, x, tms_row(z, y)),
+        ).fetchone()
+        return row is not None
+
+    def get(self, layer: str, z: int, x: int, y: int) -> Optional[bytes]:
+        """Lê de volta um tile já gravado (flush antes, se acabou de entrar)."""
+        row = self._conn.execute(
+            "SELECT tile_data FROM layer_tiles WHERE layer = ? AND zoom_level = ? AND tile_column = ? AND tile_row = ?",
+            (layer, z, x, tms_row(z, y)),
+        ).fetchone()
+        return bytes(row[0]) if row else None
+
+    def put(self, layer: str, z: int, x: int, y: int, data: bytes, tile_id: Optional[str] = None) -> str:
+        """Enfileira o tile; retorna o tile_id (sha1) do conteúdo."""
+        tile_id = tile_id or tile_hash(data)
+        self._images.append((tile_id, sqlite3.Binary(data)))
+        self._rows.append((layer, z, x, tms_row(z, y), tile_id))
+        if len(self._rows) >= self.batch_size or (time.monotonic() - self._last_commit) >= self.batch_seconds:
+            self.flush()
+        return tile_id
+
+    def flush(self):
+        if self._rows:
+            with self._conn:
+                self._conn.executemany("INSERT OR IGNORE INTO images (tile_id, tile_data) VALUES (?, ?)", self._images)
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO layer_map (layer, zoom_level, tile_column, tile_row, tile_id) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    self._rows,
+                )
+            self.tiles_written += len(self._rows)
+            self._rows = []
+            self._images = []
+        self._last_commit = time.monotonic()
+
+    def dedup_stats(self) -> dict:
+        """Tiles (coordenadas), imagens únicas e bytes gravados."""
+        self.flush()
+        n = self._conn.execute("SELECT COUNT(*) FROM layer_map").fetchone()[0]
+        unique, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(tile_data)), 0) FROM images").fetchone()
+        return {"tiles": n, "unique": unique, "bytes": size}
+
+    def set_metadata(self, values: dict):
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO metadata (name, value) VALUES (?, ?)",
+                [(str(k), str(v)) for k, v in values.items()],
+            )
+
+    def close(self, finalize: bool = True):
+        if self._conn is None:
+            return
+        try:
+            self.flush()
+            if finalize:
+                self._drop_orphan_images()
+                self._write_extent()
+        finally:
+            self._conn.close()
+            self._conn = None
+
+    def _drop_orphan_images(self):
+        """Imagens sem coordenada (tile regravado com outro conteúdo)."""
+        with self._conn:
+            self._conn.execute("DELETE FROM images WHERE tile_id NOT IN (SELECT tile_id FROM layer_map)")
+
+    def _write_extent(self):
+        info = _scan_info(self._conn)
+        meta = {
+            "format": "png",
+            "type": "baselayer",
+            "version": "1.3",
+            "layers": ",".join(self.layers),
+        }
+        if info is not None:
+            min_z, max_z, lat_min, lon_min, lat_max, lon_max = info
+            meta.update({
+                "minzoom": min_z,
+                "maxzoom": max_z,
+                "bounds": f"{lon_min:.6f},{lat_min:.6f},{lon_max:.6f},{lat_max:.6f}",
+                "center": f"{(lon_min + lon_max) / 2:.6f},{(lat_min + lat_max) / 2:.6f},{min_z}",
+            })
+        existing = _read_metadata(self._conn)
+        meta.setdefault("name", existing.get("name") or os.path.splitext(os.path.basename(self.path))[0])
+        self.set_metadata(meta)
+
+
+class MBTilesReader:
+    """Leitura (somente leitura) de um .mbtiles; thread-safe por lock."""
+
+    def __init__(self, path: str):
+        self.path = os.path.abspath(path)
+        self._conn = _connect(self.path, readonly=True)
+        self._lock = threading.Lock()
+        self.metadata = _read_metadata(self._conn)
+        self._has_layers = self._table_exists("layer_map")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _table_exists(self, name: str) -> bool:
+        row = self._conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (name,)).fetchone()
+        return row is not None
+
+    @property
+    def layers(self) -> list[str]:
+        """Camadas do pack; um .mbtiles comum (só a tabela tiles) é FLAT_LAYER."""
+        if not self._has_layers:
+            return [FLAT_LAYER]
+        names = [l for l in (self.metadata.get("layers") or "").split(",") if l]
+        if names:
+            return names
+        with self._lock:
+            return [r[0] for r in self._conn.execute("SELECT DISTINCT layer FROM layer_map")]
+
+    @property
+    def is_pack(self) -> bool:
+        return any(l != FLAT_LAYER for l in self.layers)
+
+    def get(self, layer: str, z: int, x: int, y: int) -> Optional[bytes]:
+        with self._lock:
+            if self._has_layers:
+                row = self._conn.execute(
+                    "SELECT tile_data FROM layer_tiles "
+                    "WHERE layer = ? AND zoom_level = ? AND tile_column = ? AND tile_row = ?",
+                    (layer, z, x, tms_row(z, y)),
+                ).fetchone()
+            else:
+                row = self._conn.execute(
+                    "SELECT tile_data FROM tiles WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?",
+                    (z, x, tms_row(z, y)),
+                ).fetchone()
+        return bytes(row[0]) if row else None
+
+    def tile_keys(self, layer: str) -> Iterator[tuple[int, int, int]]:
+        """(z, x, y) XYZ de todos os tiles da camada (só as coordenadas, sem os bytes)."""
+        with self._lock:
+            if self._has_layers:
+                rows = self._conn.execute(
+                    "SELECT zoom_level, tile_column, tile_row FROM layer_map WHERE layer = ?", (layer,)
+                ).fetchall()
+            else:
+                rows = self._conn.execute("SELECT zoom_level, tile_column, tile_row FROM tiles").fetchall()
+        return ((z, x, tms_row(z, row)) for z, x, row in rows)
+
+    def info(self) -> Optional[TileInfo]:
+        """Zooms/bounds do metadata; se faltar, calcula das linhas."""
+        info = _info_from_metadata(self.metadata)
+        if info is not None or not self._has_layers:
+            return info
+        with self._lock:
+            return _scan_info(self._conn)
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def mbtiles_info(path: str) -> Optional[tuple[TileInfo, list[str]]]:
+    """(info, camadas) de um .mbtiles, ou None se não abrir / estiver vazio."""
+    try:
+        with MBTilesReader(path) as mb:
+            info = mb.info()
+            return (info, mb.layers) if info is not None else None
+    except sqlite3.Error:
+        return None
+
+
+def iter_folder_tiles(folder: str) -> Iterator[tuple[int, int, int, str]]:
+    """(z, x, y, caminho) de uma pasta {z}/{x}/{y}.ext."""
+    for z_name in sorted(os.listdir(folder)):
+        z_dir = os.path.join(folder, z_name)
+        if not (z_name.isdigit() and os.path.isdir(z_dir)):
+            continue
+        for x_name in os.listdir(z_dir):
+            x_dir = os.path.join(z_dir, x_name)
+            if not (x_name.isdigit() and os.path.isdir(x_dir)):
+                continue
+            for f in os.listdir(x_dir):
+                stem, ext = os.path.splitext(f)
+                if ext.lower() in TILE_EXTS and stem.isdigit():
+                    yield int(z_name), int(x_name), int(stem), os.path.join(x_dir, f)
+
+
+def folder_pack_layers(folder: str) -> list[str]:
+    """Camadas de um pack em pasta ([FLAT_LAYER] se for {z}/{x}/{y} direto)."""
+    layers = [l for l in PACK_LAYERS if os.path.isdir(os.path.join(folder, l))]
+    return layers or [FLAT_LAYER]
+
+
+def convert_folder_pack(
+    folder: str,
+    out_path: str,
+    progress: Optional[Callable[[int, str], None]] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+) -> int:
+    """
+    Converte um pack em pasta (com ou sem light/dark/sat) para .mbtiles.
+    Metadados do meta.json (centro, raio, data) são copiados.
+    Retorna quantos tiles foram gravados; parado no meio, o arquivo fica
+    válido com o que já entrou (e pode ser convertido de novo por cima).
+    """
+    layers = folder_pack_layers(folder)
+    count = 0
+
+    with MBTilesWriter(out_path, layers) as writer:
+        writer.set_metadata(_folder_meta(folder))
+        for layer in layers:
+            base = folder if layer == FLAT_LAYER else os.path.join(folder, layer)
+            for z, x, y, path in iter_folder_tiles(base):
+                if should_stop is not None and should_stop():
+                    return count
+                try:
+                    with open(path, "rb") as f:
+                        writer.put(layer, z, x, y, f.read())
+                except OSError:
+                    continue
+                count += 1
+                if progress is not None and count % 500 == 0:
+                    progress(count, layer)
+
+    if progress is not None:
+        progress(count, "")
+    return count
+
+
+def _folder_meta(folder: str) -> dict:
+    meta = {"name": os.path.basename(os.path.normpath(folder))}
+    try:
+        with open(os.path.join(folder, "meta.json"), "r", encoding="utf-8") as f:
+            src = json.load(f)
+    except (OSError, ValueError):
+        return meta
+
+    for key in ("radius_km", "created_at"):
+        if key in src:
+            meta[key] = src[key]
+    if isinstance(src.get("center"), list) and len(src["center"]) == 2:
+        meta["pack_center"] = f"{src['center'][0]},{src['center'][1]}"
+    return meta
+
+
+def _sql_str(s: str) -> str:
+    return "'" + s.replace("'", "''") + "'"
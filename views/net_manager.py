@@ -1,39 +1,157 @@
 # net_manager.py
-import socket
-from PySide6.QtCore import QObject, Signal
+"""
+Estado da internet (online/offline) para o app todo.
+
+A checagem roda numa thread própria (_ProbeThread), nunca na da UI: antes era
+um connect bloqueante de até 2 s a cada 2 s no QTimer da MainWindow (a GS
+travava quando o Wi-Fi caía) e ainda mexia no socket.setdefaulttimeout do
+processo inteiro.
+
+- sondas asyncio (open_connection) em paralelo contra `targets`; basta um
+  responder. Cada sonda tem o próprio timeout e o socket é sempre fechado
+- histerese: só muda de estado depois de DOWN_AFTER falhas / UP_AFTER
+  sucessos seguidos (um pacote perdido não derruba o "Online")
+- offline, o intervalo entre checagens dobra até OFFLINE_MAX_INTERVAL; o
+  primeiro sucesso volta para o intervalo normal para confirmar logo
+- a thread só avisa nas transições; o sinal atravessa para a thread da UI
+  por conexão enfileirada e é lá que netChanged é emitido
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Iterable, Optional
+
+from PySide6.QtCore import QObject, QThread, Qt, Signal
+from PySide6.QtWidgets import QApplication
+
+# (host, porta): DNS públicos em IP, sem depender de resolver nome
+DEFAULT_TARGETS = (("1.1.1.1", 53), ("8.8.8.8", 53), ("9.9.9.9", 53))
+
+PROBE_TIMEOUT = 1.5         # s por sonda
+ONLINE_INTERVAL = 3.0       # s entre checagens
+OFFLINE_MAX_INTERVAL = 30.0  # teto do backoff offline
+
+DOWN_AFTER = 2  # falhas seguidas para ir a offline
+UP_AFTER = 2    # sucessos seguidos para voltar a online
+
+
+async def _probe_one(host: str, port: int, timeout: float) -> bool:
+    try:
+        _reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    try:
+        await asyncio.wait_for(writer.wait_closed(), timeout)
+    except (OSError, asyncio.TimeoutError):
+        pass
+    return True
+
+
+async def probe_targets(targets: Iterable[tuple[str, int]], timeout: float = PROBE_TIMEOUT) -> bool:
+    """True assim que algum alvo aceitar a conexão; cancela os que sobrarem."""
+    pending = {asyncio.ensure_future(_probe_one(h, int(p), timeout)) for h, p in targets}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            if any(t.result() for t in done):
+                return True
+        return False
+    finally:
+        for t in pending:
+            t.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+class _ProbeThread(QThread):
+    # emitido só nas transições (e no primeiro resultado)
+    stateChanged = Signal(bool)
+
+    def __init__(self, targets, parent=None):
+        super().__init__(parent)
+        self.targets = tuple(targets)
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def wake(self):
+        """Checa agora, sem esperar o intervalo (ex.: saiu do modo offline forçado)."""
+        self._wake.set()
+
+    def run(self):
+        loop = asyncio.new_event_loop()
+        state: Optional[bool] = None
+        streak = 0
+        delay = ONLINE_INTERVAL
+        try:
+            while not self._stop.is_set():
+                ok = loop.run_until_complete(probe_targets(self.targets))
+
+                if state is None:
+                    state = ok
+                    self.stateChanged.emit(state)
+                elif ok == state:
+                    streak = 0
+                else:
+                    streak += 1
+                    if streak >= (UP_AFTER if ok else DOWN_AFTER):
+                        state, streak = ok, 0
+                        self.stateChanged.emit(state)
+
+                if state or ok:
+                    delay = ONLINE_INTERVAL
+                else:
+                    delay = min(delay * 2, OFFLINE_MAX_INTERVAL)
+
+                self._wake.wait(delay)
+                self._wake.clear()
+        finally:
+            loop.close()
+
 
 class NetManager(QObject):
     # Sinal emitido sempre que o estado mudar
     netChanged = Signal(bool)
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, targets=DEFAULT_TARGETS):
         super().__init__(parent)
-        self.hasNet = self._check_connection()
+        self.hasNet = False        # até a primeira sonda responder
         self.forceOffline = False  # se True, ignora internet real
 
-    def _check_connection(self, host="8.8.8.8", port=53, timeout=2) -> bool:
-        """Tenta conexão rápida com DNS Google para checar internet."""
-        try:
-            socket.setdefaulttimeout(timeout)
-            socket.socket(socket.AF_INET, socket.SOCK_STREAM).connect((host, port))
-            return True
-        except Exception:
-            return False
+        self._probe = _ProbeThread(targets)
+        self._probe.stateChanged.connect(self._on_probe_state, Qt.QueuedConnection)
+        self._probe.start()
 
-    def update(self):
-        """
-        Atualiza `hasNet`. Se o estado mudar, emite o sinal.
-        """
-        if self.forceOffline:
-            new_status = False
-        else:
-            new_status = self._check_connection()
+        app = QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.stop)
 
-        if new_status != self.hasNet:
-            self.hasNet = new_status
+    def _on_probe_state(self, online: bool):
+        """Roda na thread da UI (conexão enfileirada)."""
+        if online == self.hasNet:
+            return
+        self.hasNet = online
+        if not self.forceOffline:
             self.netChanged.emit(self.hasNet)  # 🔔 emite mudança
-            return True
-        return False
+
+    def set_targets(self, targets):
+        """Troca os alvos (lista de (host, porta)); vale a partir da próxima checagem."""
+        self._probe.targets = tuple((str(h), int(p)) for h, p in targets)
+        self._probe.wake()
+
+    def check_now(self):
+        self._probe.wake()
+
+    def stop(self):
+        if self._probe.isRunning():
+            self._probe.stop()
+            self._probe.wait(int((PROBE_TIMEOUT * 2 + 1) * 1000))
 
     def get_status(self) -> bool:
         """
@@ -51,13 +169,8 @@ class NetManager(QObject):
 
         if self.forceOffline:
             # efetivo = offline
-            if self.hasNet:
-                self.hasNet = False
             self.netChanged.emit(False)
         else:
-            # volta a checar na hora e emite imediatamente
-            new_status = self._check_connection()
-            self.hasNet = new_status
+            # volta com o último estado conhecido e pede uma checagem na hora
             self.netChanged.emit(self.hasNet)
-
-
+            self._probe.wake()
@@ -0,0 +1,288 @@
+# views/pack_index.py
+"""
+Índice persistido de um pack de tiles em pasta (pack_index.json na raiz).
+
+Abrir o mapa offline precisava varrer a árvore toda ({camada}/{z}/{x}/...)
+para achar zooms e bounds, três vezes (light/dark/sat), a cada _init_map e
+set_offline. O índice guarda, por camada:
+
+    zooms           {z: [x0, x1, y0, y1, tiles]}   cobertura por zoom
+    min/max zoom    e bounds (no maior zoom)
+
+Montado uma vez: a partir do meta.json do downloader (quando ele traz a
+cobertura e não faltou tile) ou varrendo a pasta. Depois é validado pelos
+mtimes da raiz, das pastas de camada, das pastas de zoom e do meta.json
+(algumas dezenas de stat, nada de listar x/y). Um tile novo dentro de uma
+coluna x já existente não muda esses mtimes; quem grava no pack (downloader,
+conversão) reescreve o meta.json, o que invalida o índice.
+
+Packs .mbtiles não precisam disso: zooms/bounds já vêm da tabela metadata.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Optional
+
+from views.mbtiles import FLAT_LAYER, PACK_LAYERS, TileInfo, is_mbtiles, mbtiles_info, num2deg
+
+INDEX_NAME = "pack_index.json"
+INDEX_VERSION = 1
+
+# [x0, x1, y0, y1, tiles]
+ZoomCoverage = list
+
+
+@dataclass
+class LayerIndex:
+    zooms: dict = field(default_factory=dict)  # {z: ZoomCoverage}
+
+    @property
+    def min_zoom(self) -> Optional[int]:
+        return min(self.zooms) if self.zooms else None
+
+    @property
+    def max_zoom(self) -> Optional[int]:
+        return max(self.zooms) if self.zooms else None
+
+    def info(self) -> Optional[TileInfo]:
+        if not self.zooms:
+            return None
+        z = self.max_zoom
+        x0, x1, y0, y1, _n = self.zooms[z]
+        lat_max, lon_min = num2deg(x0, y0, z)
+        lat_min, lon_max = num2deg(x1 + 1, y1 + 1, z)
+        return (self.min_zoom, z, lat_min, lon_min, lat_max, lon_max)
+
+
+@dataclass
+class PackIndex:
+    path: str
+    layers: dict = field(default_factory=dict)  # {camada: LayerIndex}
+    stamps: dict = field(default_factory=dict)  # {caminho relativo: mtime_ns}
+    source: str = "scan"                        # "scan" | "meta" | "mbtiles"
+    fixed_info: Optional[tuple] = None          # .mbtiles: info pronta do metadata
+
+    @property
+    def is_pack(self) -> bool:
+        return any(l != FLAT_LAYER for l in self.layers)
+
+    def info(self, layer: Optional[str] = None) -> Optional[TileInfo]:
+        """Info da camada pedida, ou da primeira que tiver tiles (light, dark, sat)."""
+        if self.fixed_info is not None:
+            return self.fixed_info
+        if layer is not None:
+            li = self.layers.get(layer)
+            return li.info() if li else None
+        for name in (*PACK_LAYERS, FLAT_LAYER):
+            li = self.layers.get(name)
+            if li and li.zooms:
+                return li.info()
+        return None
+
+    def to_json(self) -> dict:
+        return {
+            "version": INDEX_VERSION,
+            "source": self.source,
+            "stamps": self.stamps,
+            "layers": {name: {str(z): cov for z, cov in li.zooms.items()} for name, li in self.layers.items()},
+        }
+
+    @classmethod
+    def from_json(cls, path: str, data: dict) -> "PackIndex":
+        layers = {
+            name: LayerIndex({int(z): list(cov) for z, cov in zooms.items()})
+            for name, zooms in data["layers"].items()
+        }
+        return cls(path, layers, dict(data["stamps"]), data.get("source", "scan"))
+
+
+# ---------------- mtimes ----------------
+
+def _mtime(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _layer_dirs(folder: str) -> dict:
+    """{camada: pasta}; pasta simples ({z}/{x}/{y}) vira FLAT_LAYER."""
+    found = {l: os.path.join(folder, l) for l in PACK_LAYERS if os.path.isdir(os.path.join(folder, l))}
+    return found or {FLAT_LAYER: folder}
+
+
+def _zoom_names(layer_dir: str) -> list[str]:
+    try:
+        return [n for n in os.listdir(layer_dir) if n.isdigit() and os.path.isdir(os.path.join(layer_dir, n))]
+    except OSError:
+        return []
+
+
+def _collect_stamps(folder: str, layers: dict) -> dict:
+    rels = [".", "meta.json"]
+    for name, layer_dir in _layer_dirs(folder).items():
+        rel = "." if name == FLAT_LAYER else name
+        if rel != ".":
+            rels.append(rel)
+        zooms = layers.get(name).zooms if name in layers else {}
+        rels.extend(os.path.join(rel, str(z)) if rel != "." else str(z) for z in zooms)
+    return {rel: _mtime(os.path.join(folder, rel)) for rel in rels}
+
+
+def _stamps_valid(folder: str, stamps: dict) -> bool:
+    if not stamps:
+        return False
+    return all(_mtime(os.path.join(folder, rel)) == mt for rel, mt in stamps.items())
+
+
+# ---------------- montagem ----------------
+
+def _safe_int_from_stem(stem: str):
+    """Aceita nomes como "123", "123@2x", "123-something"."""
+    m = re.match(r"^(\d+)", stem)
+    return int(m.group(1)) if m else None
+
+
+def scan_layer(layer_dir: str) -> LayerIndex:
+    """Varredura completa de uma pasta {z}/{x}/{y}.ext (só na primeira vez)."""
+    li = LayerIndex()
+    for z_name in _zoom_names(layer_dir):
+        z_dir = os.path.join(layer_dir, z_name)
+        x0 = y0 = math.inf
+        x1 = y1 = -math.inf
+        n = 0
+        for x_name in os.listdir(z_dir):
+            x_dir = os.path.join(z_dir, x_name)
+            if not (x_name.isdigit() and os.path.isdir(x_dir)):
+                continue
+            x = int(x_name)
+            for f in os.listdir(x_dir):
+                y = _safe_int_from_stem(os.path.splitext(f)[0])
+                if y is None:
+                    continue
+                n += 1
+                x0, x1 = min(x0, x), max(x1, x)
+                y0, y1 = min(y0, y), max(y1, y)
+        if n:
+            li.zooms[int(z_name)] = [x0, x1, y0, y1, n]
+    return li
+
+
+def _from_meta(folder: str) -> Optional[dict]:
+    """Camadas a partir do meta.json do downloader (cobertura completa, sem tile faltando)."""
+    try:
+        with open(os.path.join(folder, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    coverage = meta.get("coverage")
+    if not isinstance(coverage, dict) or meta.get("missing_tiles", 0):
+        return None
+
+    zooms = {}
+    for z, cov in coverage.items():
+        x0, x1, y0, y1 = (int(v) for v in cov[:4])
+        zooms[int(z)] = [x0, x1, y0, y1, (x1 - x0 + 1) * (y1 - y0 + 1)]
+
+    layer_dirs = _layer_dirs(folder)
+    names = [l for l in meta.get("layers", []) if l in layer_dirs]
+    if not names:
+        return None
+    return {name: LayerIndex(dict(zooms)) for name in names}
+
+
+def build_pack_index(folder: str) -> PackIndex:
+    layers = _from_meta(folder)
+    source = "meta"
+    if layers is None:
+        source = "scan"
+        layers = {name: scan_layer(d) for name, d in _layer_dirs(folder).items()}
+        layers = {name: li for name, li in layers.items() if li.zooms}
+    return PackIndex(folder, layers, _collect_stamps(folder, layers), source)
+
+
+# ---------------- cache (memória + disco) ----------------
+
+_MEMO: dict[str, PackIndex] = {}
+
+
+def load_pack_index(path: str, persist: bool = True) -> Optional[PackIndex]:
+    """
+    Índice do pack em `path` (pasta ou .mbtiles). Ordem: memória -> pack_index.json
+    -> montagem (meta.json ou varredura), salvando no disco se der.
+    """
+    if not path:
+        return None
+    path = os.path.abspath(path)
+
+    if is_mbtiles(path):
+        found = mbtiles_info(path)
+        if found is None:
+            return None
+        info, names = found
+        # só zooms/bounds (cobertura por zoom não é guardada no metadata)
+        return PackIndex(path, {n: LayerIndex() for n in names}, {}, "mbtiles", info)
+
+    if not os.path.isdir(path):
+        return None
+
+    idx = _MEMO.get(path)
+    if idx is not None and _stamps_valid(path, idx.stamps):
+        return idx
+
+    idx = None
+    index_file = os.path.join(path, INDEX_NAME)
+    try:
+        with open(index_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == INDEX_VERSION:
+            idx = PackIndex.from_json(path, data)
+            if not _stamps_valid(path, idx.stamps):
+                idx = None
+    except (OSError, ValueError, KeyError, TypeError):
+        idx = None
+
+    if idx is None:
+        idx = build_pack_index(path)
+        if persist:
+            _save(idx, index_file)
+
+    _MEMO[path] = idx
+    return idx if idx.layers else None
+
+
+def _save(idx: PackIndex, index_file: str):
+    """
+    Grava o índice (pasta só-leitura / cartão travado: fica só em memória).
+    O arquivo é criado antes de tirar os mtimes e depois reescrito no lugar,
+    senão a própria criação mudaria o mtime da raiz e invalidaria o índice.
+    """
+    try:
+        if not os.path.exists(index_file):
+            open(index_file, "w").close()
+        idx.stamps = _collect_stamps(idx.path, idx.layers)
+        with open(index_file, "w", encoding="utf-8") as f:
+            json.dump(idx.to_json(), f)
+    except OSError:
+        pass
+
+
+def invalidate_pack_index(path: str):
+    """
+    Esquece o índice do pack (memória e pack_index.json). O TilePackDownloader
+    chama ao terminar, inclusive cancelado: sem o meta.json final, tiles novos
+    em colunas x já existentes não mudariam nenhum mtime do índice.
+    """
+    path = os.path.abspath(path)
+    _MEMO.pop(path, None)
+    if os.path.isdir(path):
+        try:
+            os.remove(os.path.join(path, INDEX_NAME))
+        except OSError:
+            pass
@@ -0,0 +1,328 @@
+# views/plot_lod.py
+"""
+Nível de detalhe (LOD) para curvas longas do pyqtgraph.
+
+- MinMaxPyramid: pirâmide de decimação min/max montada uma vez por série e
+  estendida com os pontos novos (extend). Nível 0 = cópia dos dados; cada
+  nível seguinte tem metade dos pontos (grupos de 4 -> mínimo e máximo, na
+  ordem do tempo), então picos como o apogeu ou o pico de empuxo nunca
+  somem. Memória extra ~= tamanho da série.
+- LodCurve: PlotCurveItem que, a cada pan/zoom/resize, escolhe o nível que
+  dá ~2 pontos por pixel na largura visível e só passa esse trecho (views,
+  sem cópia) para o setData. Funciona em qualquer ViewBox, inclusive no
+  right_viewbox do eixo duplo da análise estática.
+
+x precisa ser crescente (tempo); se não for, a curva desenha a série cheia.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+import pyqtgraph as pg
+
+
+def _minmax_groups(x: np.ndarray, y: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Grupos de 4 pontos -> 2 (mínimo e máximo de y, na ordem de x). len(x) múltiplo de 4."""
+    groups = len(x) // 4
+    yg = y.reshape(groups, 4)
+    xg = x.reshape(groups, 4)
+
+    # NaN (buraco na série) não pode ganhar o argmin/argmax
+    i_min = np.where(np.isnan(yg), np.inf, yg).argmin(axis=1)
+    i_max = np.where(np.isnan(yg), -np.inf, yg).argmax(axis=1)
+    first = np.minimum(i_min, i_max)
+    second = np.maximum(i_min, i_max)
+    rows = np.arange(groups)
+
+    x_out = np.empty(groups * 2, dtype=np.float64)
+    y_out = np.empty_like(x_out)
+    x_out[0::2] = xg[rows, first]
+    x_out[1::2] = xg[rows, second]
+    y_out[0::2] = yg[rows, first]
+    y_out[1::2] = yg[rows, second]
+    return x_out, y_out
+
+
+def _same(a: float, b: float) -> bool:
+    return a == b or (a != a and b != b)  # NaN == NaN aqui
+
+
+class MinMaxPyramid:
+    """
+    Níveis (x, y) de uma série; o último nível tem no máximo min_points pontos.
+
+    A pirâmide é dona dos dados (o nível 0 é cópia, não view do buffer de quem
+    chamou) e cresce com extend(): só os grupos de 4 completados pelos pontos
+    novos são decimados. Cada nível é a parte já decimada ("estável") seguida
+    dos pontos que ainda não fecharam um grupo nos níveis abaixo (menos de 4
+    por nível), então o final da série aparece em todos os níveis.
+    """
+
+    def __init__(self, x, y, min_points: int = 2048):
+        self.min_points = min_points
+        self.monotonic = True
+        self.x_bounds: Optional[tuple[float, float]] = None
+        self.y_bounds: Optional[tuple[float, float]] = None
+
+        self._x: list[np.ndarray] = []      # buffers por nível (crescem por dobra)
+        self._y: list[np.ndarray] = []
+        self._stable: list[int] = []        # pontos decimados (definitivos) do nível
+        self._folded: list[int] = []        # pontos estáveis já levados ao nível de cima
+        self.levels: list[tuple[np.ndarray, np.ndarray]] = []
+        self._add_level()
+
+        self.extend(x, y)
+
+    def __len__(self) -> int:
+        return self._stable[0]
+
+    # ---------- crescimento ----------
+
+    def continues(self, x, y) -> bool:
+        """True se (x, y) é esta mesma série com pontos a mais no final (O(1))."""
+        n = len(self)
+        if n == 0:
+            return True
+        if min(len(x), len(y)) < n:
+            return False
+        x0, y0 = self._x[0], self._y[0]
+        return (_same(float(x[0]), x0[0]) and _same(float(x[n - 1]), x0[n - 1])
+                and _same(float(y[n - 1]), y0[n - 1]))
+
+    def extend(self, x, y):
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        k = min(len(x), len(y))
+        if k == 0:
+            self._refresh_levels()
+            return
+        x, y = x[:k], y[:k]
+
+        n = len(self)
+        if self.monotonic:
+            prev_ok = n == 0 or x[0] >= self._x[0][n - 1]
+            if not (prev_ok and bool(np.all(np.diff(x) >= 0))):
+                # x fora de ordem: fica só o nível 0 (a curva desenha a série cheia)
+                self.monotonic = False
+                del self._x[1:], self._y[1:], self._stable[1:], self._folded[1:]
+
+        self._append(0, x, y)
+
+        self.x_bounds = (float(self._x[0][0]), float(x[-1]))
+        finite = y[np.isfinite(y)]
+        if len(finite):
+            lo, hi = float(finite.min()), float(finite.max())
+            if self.y_bounds is not None:
+                lo, hi = min(lo, self.y_bounds[0]), max(hi, self.y_bounds[1])
+            self.y_bounds = (lo, hi)
+
+        if self.monotonic:
+            for level in range(len(self._x) - 1):
+                self._fold(level)
+            while self._visible_len(len(self._x) - 1) > max(8, self.min_points):
+                self._add_level()
+                self._fold(len(self._x) - 2)
+
+        self._refresh_levels()
+
+    def _add_level(self):
+        self._x.append(np.empty(1024, dtype=np.float64))
+        self._y.append(np.empty(1024, dtype=np.float64))
+        self._stable.append(0)
+        self._folded.append(0)
+
+    def _reserve(self, level: int, size: int):
+        if size <= len(self._x[level]):
+            return
+        new = max(size, 2 * len(self._x[level]))
+        for bufs in (self._x, self._y):
+            grown = np.empty(new, dtype=np.float64)
+            grown[:self._stable[level]] = bufs[level][:self._stable[level]]
+            bufs[level] = grown
+
+    def _append(self, level: int, x: np.ndarray, y: np.ndarray):
+        n = self._stable[level]
+        self._reserve(level, n + len(x) + 3 * level)
+        self._x[level][n:n + len(x)] = x
+        self._y[level][n:n + len(y)] = y
+        self._stable[level] = n + len(x)
+
+    def _fold(self, level: int):
+        """Decima os grupos de 4 completos e ainda não levados ao nível de cima."""
+        f = self._folded[level]
+        m = (self._stable[level] - f) // 4 * 4
+        if m == 0:
+            return
+        xs, ys = _minmax_groups(self._x[level][f:f + m], self._y[level][f:f + m])
+        self._folded[level] = f + m
+        self._append(level + 1, xs, ys)
+
+    def _pending(self, level: int) -> tuple[np.ndarray, np.ndarray]:
+        a, b = self._folded[level], self._stable[level]
+        return self._x[level][a:b], self._y[level][a:b]
+
+    def _visible_len(self, level: int) -> int:
+        return self._stable[level] + sum(self._stable[j] - self._folded[j] for j in range(level))
+
+    def _refresh_levels(self):
+        """Monta as views de cada nível, copiando o final pendente dos níveis de baixo."""
+        levels = []
+        for level in range(len(self._x)):
+            pos = self._stable[level]
+            self._reserve(level, self._visible_len(level))
+            xb, yb = self._x[level], self._y[level]
+            for j in range(level - 1, -1, -1):
+                px, py = self._pending(j)
+                xb[pos:pos + len(px)] = px
+                yb[pos:pos + len(py)] = py
+                pos += len(px)
+            levels.append((xb[:pos], yb[:pos]))
+        self.levels = levels
+
+    # ---------- consulta ----------
+
+    def select(self, x0: float, x1: float, max_points: int) -> tuple[int, int, int]:
+        """
+        (nível, i0, i1) com o trecho [x0, x1] (mais um ponto de cada lado)
+        no nível mais fino que cabe em max_points.
+        """
+        if not self.monotonic:
+            return 0, 0, len(self)
+
+        for level, (x, _y) in enumerate(self.levels):
+            i0 = max(0, int(np.searchsorted(x, x0, side="left")) - 1)
+            i1 = min(len(x), int(np.searchsorted(x, x1, side="right")) + 1)
+            if i1 - i0 <= max_points or level == len(self.levels) - 1:
+                return level, i0, i1
+
+        return 0, 0, len(self)
+
+    def slice(self, level: int, i0: int, i1: int) -> tuple[np.ndarray, np.ndarray]:
+        x, y = self.levels[level]
+        return x[i0:i1], y[i0:i1]
+
+
+class LodCurve(pg.PlotCurveItem):
+    """
+    PlotCurveItem com LOD. setData(x, y) monta a pirâmide, ou só estende a
+    atual quando (x, y) é a mesma série com pontos novos no final (gráfico ao
+    vivo); o que vai para a tela é sempre o trecho visível no nível adequado
+    à largura do ViewBox.
+
+    Bounds (auto-range) continuam sendo os da série inteira.
+    """
+
+    points_per_px = 2.0
+    min_points = 2048
+
+    # padrões na classe: PlotCurveItem.__init__ já chama setData
+    _pyramid: Optional[MinMaxPyramid] = None
+    _shown = None           # (nível, i0, i1) passado ao updateData
+    _updating = False
+    _opts_kargs: dict = {}  # opções (pen, name...) do último setData
+
+    def __init__(self, *args, points_per_px: Optional[float] = None, **kargs):
+        super().__init__(*args, **kargs)
+        if points_per_px is not None:
+            self.points_per_px = points_per_px
+
+    # ---------- dados ----------
+
+    def setData(self, *args, **kargs):
+        x, y = _xy_from_args(args, kargs)
+        pyr = self._pyramid
+        if x is None:
+            pyr = None
+        elif pyr is not None and pyr.continues(x, y):
+            # série ao vivo: só o final é novo (buffer compactado/trocado -> remonta)
+            n = len(pyr)
+            pyr.extend(x[n:], y[n:])
+        else:
+            pyr = MinMaxPyramid(x, y, self.min_points)
+        self._pyramid = pyr
+        self._shown = None
+        self._opts_kargs = kargs
+        self._refresh(force=True)
+
+    def clear_lod(self):
+        self._pyramid = None
+        self._shown = None
+        self.updateData([], [])
+
+    @property
+    def level_count(self) -> int:
+        return len(self._pyramid.levels) if self._pyramid is not None else 0
+
+    # ---------- view ----------
+
+    def viewRangeChanged(self):
+        super().viewRangeChanged()
+        self._refresh()
+
+    def viewTransformChanged(self):
+        super().viewTransformChanged()
+        self._refresh()
+
+    def dataBounds(self, ax, frac=1.0, orthoRange=None):
+        pyr = self._pyramid
+        if pyr is None or len(pyr) == 0:
+            return super().dataBounds(ax, frac, orthoRange)
+        bounds = pyr.x_bounds if ax == 0 else pyr.y_bounds
+        return bounds if bounds is not None else (None, None)
+
+    def _visible_budget(self) -> tuple[Optional[tuple[float, float]], int]:
+        vb = self.getViewBox()
+        if vb is None:
+            return None, 0
+        try:
+            x_range = vb.viewRange()[0]
+            width_px = float(vb.width())
+        except Exception:
+            return None, 0
+        return (x_range[0], x_range[1]), max(self.min_points // 4, int(width_px * self.points_per_px))
+
+    def _refresh(self, force: bool = False):
+        if self._updating:
+            return
+        pyr = self._pyramid
+        if pyr is None:
+            if force:
+                self.updateData([], [], **self._opts_kargs)
+            return
+
+        x_range, budget = self._visible_budget()
+        if x_range is None:
+            # ainda sem ViewBox: mostra o nível mais grosso (série inteira)
+            choice = (len(pyr.levels) - 1, 0, len(pyr.levels[-1][0]))
+        else:
+            choice = pyr.select(x_range[0], x_range[1], budget)
+
+        if not force and choice == self._shown:
+            return
+
+        self._updating = True
+        try:
+            self._shown = choice
+            x, y = pyr.slice(*choice)
+            kargs = self._opts_kargs if force else {}
+            self.updateData(x=x, y=y, **kargs)
+        finally:
+            self._updating = False
+
+
+def _xy_from_args(args, kargs):
+    """Mesmos formatos de setData do pyqtgraph: (y), (x, y) ou x=/y= por nome."""
+    x = kargs.pop("x", None)
+    y = kargs.pop("y", None)
+    if len(args) == 1:
+        y = args[0]
+    elif len(args) >= 2:
+        x, y = args[0], args[1]
+
+    if y is None:
+        return None, None
+    y = np.asarray(y, dtype=np.float64)
+    x = np.arange(len(y), dtype=np.float64) if x is None else np.asarray(x, dtype=np.float64)
+    return x, y
@@ -2,6 +2,8 @@ import os, math
 from PySide6.QtWidgets import QWidget, QVBoxLayout
 from PySide6.QtWebEngineWidgets import QWebEngineView
 
+from views.web_bridge import QWEBCHANNEL_JS, Rocket3DBridge
+
 
 
 class Rocket3DView(QWidget):
@@ -18,6 +20,11 @@ class Rocket3DView(QWidget):
         # conecta para só marcar como pronto quando carregar
         self.web.loadFinished.connect(self._on_load_finished)
 
+        # orientação vai pela ponte QWebChannel (views/web_bridge.py)
+        self._bridge = Rocket3DBridge(self)
+        self._bridge.attach(self.web.page())
+        self.web.loadStarted.connect(self._bridge.page_loading)
+
         self._init_html()
 
     def _on_load_finished(self, ok: bool):
@@ -102,6 +109,7 @@ class Rocket3DView(QWidget):
         <script>
         {three_js}
         </script>
+        <script src="{QWEBCHANNEL_JS}"></script>
 
         <script>
         var scene = new THREE.Scene();
@@ -155,23 +163,86 @@ class Rocket3DView(QWidget):
 
         scene.add(rocket);
 
-        // --- Render loop ---
-        var animId;
+        // --- Render sob demanda ---
+        // Só desenha quando a orientação muda (ou resize). Cada amostra nova
+        // entra numa fila curta; a cada frame do display o foguete faz slerp
+        // da orientação atual até a próxima amostra, num tempo igual ao
+        // intervalo médio entre amostras. Parado = nenhum frame.
+        var animId = null;
+        var paused = true;      // resumeRender() no loadFinished
+
+        const MAX_QUEUE = 4;             // amostras pendentes (backlog: descarta as mais velhas)
+        const MIN_SEG_MS = 16, MAX_SEG_MS = 300;
+        var oriQueue = [];               // THREE.Quaternion alvo
+        var segFrom = new THREE.Quaternion();
+        var segTo = null;
+        var segStart = 0, segMs = 100;
+        var lastSampleAt = 0, sampleIntervalMs = 100;
+
+        function requestRender() {{
+            if (paused || animId) return;
+            animId = requestAnimationFrame(frame);
+        }}
 
-        function animate() {{
-            animId = requestAnimationFrame(animate);
+        function frame(now) {{
+            animId = null;
+            var moving = stepOrientation(now);
             renderer.render(scene, camera);
+            if (moving) requestRender();
+        }}
+
+        function stepOrientation(now) {{
+            if (!segTo) {{
+                if (!oriQueue.length) return false;
+                segFrom.copy(rocket.quaternion);
+                segTo = oriQueue.shift();
+                segStart = now;
+                // atrasado (fila cheia): anda mais rápido para alcançar
+                segMs = Math.max(MIN_SEG_MS, Math.min(MAX_SEG_MS, sampleIntervalMs / (1 + oriQueue.length)));
+            }}
+
+            var k = Math.min(1, (now - segStart) / segMs);
+            rocket.quaternion.slerpQuaternions(segFrom, segTo, k);
+
+            if (k >= 1) {{
+                segTo = null;
+                return oriQueue.length > 0;
+            }}
+            return true;
+        }}
+
+        function queueOrientation(roll, pitch, yaw) {{
+            var now = performance.now();
+            if (lastSampleAt) {{
+                // média móvel do intervalo entre amostras
+                sampleIntervalMs += 0.2 * ((now - lastSampleAt) - sampleIntervalMs);
+            }}
+            lastSampleAt = now;
+
+            var q = new THREE.Quaternion().setFromEuler(new THREE.Euler(roll, pitch, yaw, 'ZYX'));
+
+            // mesma orientação do último alvo (foguete parado na rampa): nada a desenhar
+            var last = oriQueue.length ? oriQueue[oriQueue.length - 1] : (segTo || rocket.quaternion);
+            if (last.angleTo(q) < 1e-4) return;
+
+            oriQueue.push(q);
+            if (oriQueue.length > MAX_QUEUE) oriQueue.splice(0, oriQueue.length - MAX_QUEUE);
+            requestRender();
         }}
 
         function pauseRender() {{
+            paused = true;
             if (animId) cancelAnimationFrame(animId);
             animId = null;
         }}
 
         function resumeRender() {{
-            if (!animId) animate();
+            paused = false;
+            requestRender();
         }}
 
+        window.requestRender = requestRender;
+
         // ===== IMU Watchdog (Euler) =====
         const eulerLast = {{ roll: 0, pitch: 0, yaw: 0 }};
         const LED_THR_MS = 600;
@@ -208,13 +279,26 @@ class Rocket3DView(QWidget):
 
         // só aplica rotação se tiver os 3 (evita usar valor velho em um eixo)
         if (hasR && hasP && hasY) {{
-            rocket.rotation.set(roll, pitch, yaw, 'ZYX');
+            queueOrientation(roll, pitch, yaw);
         }}
         }}
 
         window.updateRocket = updateRocket;
 
-        window.updateRocket = updateRocket;
+        // ---- ponte com o Python (views/web_bridge.py: Rocket3DBridge) ----
+        if (window.qt && qt.webChannelTransport) {{
+            new QWebChannel(qt.webChannelTransport, function(channel){{
+                var bridge = channel.objects.bridge;
+                bridge.orientationSamples.connect(function(samples){{
+                    for (var i = 0; i < samples.length; i++) {{
+                        var s = samples[i];
+                        updateRocket(s[0], s[1], s[2]);
+                    }}
+                }});
+                bridge.pageReady();
+            }});
+        }}
+
         // --- CRIA O EIXO VISUAL ---
         const axesHelper = new THREE.AxesHelper(1); // tamanho 5
         scene.add(axesHelper);
@@ -256,6 +340,7 @@ class Rocket3DView(QWidget):
             camera.aspect = window.innerWidth / window.innerHeight;
             camera.updateProjectionMatrix();
             renderer.setSize(window.innerWidth, window.innerHeight);
+            requestRender();
         }});
         </script>
         </body>
@@ -273,24 +358,22 @@ class Rocket3DView(QWidget):
         Envia Euler ao JS. Aceita None (manda null no JS).
         Se degrees=True, converte valores válidos para rad.
         """
-        def conv(v):
-            if v is None:
-                return None
-            return math.radians(v) if degrees else v
+        self.set_orientations([(roll, pitch, yaw)], degrees=degrees)
 
-        r = conv(roll)
-        p = conv(pitch)
-        y = conv(yaw)
+    def set_orientations(self, samples, degrees: bool = False):
+        """
+        Envia várias amostras (roll, pitch, yaw) numa única mensagem da ponte.
+        None (ou NaN) vira null no JS. Antes da página ficar pronta, descarta.
+        """
+        if not self._bridge.is_ready:
+            return
 
-        # JS: null quando None
-        def js_val(v):
-            return "null" if v is None else f"{v}"
+        def conv(v):
+            if v is None or not math.isfinite(v):
+                return None
+            return math.radians(v) if degrees else float(v)
 
-        js = (
-            "if (typeof updateRocket !== 'undefined') "
-            f"updateRocket({js_val(r)}, {js_val(p)}, {js_val(y)});"
-        )
-        self.web.page().runJavaScript(js)
+        self._bridge.orientationSamples.emit([[conv(r), conv(p), conv(y)] for r, p, y in samples])
 
     def pause(self):
         """Pausa a renderização (usado quando troca de página)."""
@@ -0,0 +1,167 @@
+# views/serial_framer.py
+"""
+Separador de linhas para a leitura serial (GS Flight, Teste Estático e Simulador).
+
+Os bytes recebidos vão para um único bytearray reaproveitado, consumido por
+um offset que só anda para frente; o começo já consumido só é descartado de
+vez em quando (compactação), e não a cada linha como em buf.split(b"\\n", 1)
+(que copiava o buffer inteiro por linha: quadrático no tamanho do backlog).
+
+- lines():         linhas como memoryview (sem cópia), via find() a partir do offset
+- decoded_lines(): linhas já como str, para o caminho quente da serial
+"""
+
+from __future__ import annotations
+
+from typing import Iterator, Optional
+
+
+class LineFramer:
+    """
+    Buffer de recepção + framing por '\\n'.
+
+    Uso típico:
+        framer.feed(ser.read(ser.in_waiting))
+        for line in framer.decoded_lines():
+            ...
+
+    - max_buf_bytes:  limite de bytes pendentes (sem '\\n'); acima disso o mais antigo é descartado
+    - max_line_bytes: linhas maiores que isso são descartadas
+    - compact_bytes:  só compacta quando o trecho já consumido passar disso
+    """
+
+    __slots__ = (
+        "max_buf_bytes", "max_line_bytes", "compact_bytes",
+        "_buf", "_start", "overflows", "dropped_lines",
+    )
+
+    def __init__(self, max_buf_bytes: int = 256_000, max_line_bytes: int = 4096, compact_bytes: int = 64 * 1024):
+        self.max_buf_bytes = max_buf_bytes
+        self.max_line_bytes = max_line_bytes
+        self.compact_bytes = compact_bytes
+
+        self._buf = bytearray()
+        self._start = 0          # início dos bytes ainda não consumidos
+
+        # contadores (diagnóstico)
+        self.overflows = 0
+        self.dropped_lines = 0
+
+    @property
+    def pending(self) -> int:
+        """Bytes recebidos e ainda não entregues como linha."""
+        return len(self._buf) - self._start
+
+    def clear(self):
+        self._buf.clear()
+        self._start = 0
+
+    def feed(self, data) -> bool:
+        """
+        Acrescenta bytes recebidos (não chamar no meio de uma iteração de lines()).
+
+        Retorna True se o buffer estourou max_buf_bytes (ex.: sem '\\n' por
+        muito tempo) e o começo foi descartado.
+        """
+        if self._start:
+            if self._start == len(self._buf):
+                # tudo consumido: recomeça do zero sem mover bytes
+                self.clear()
+            elif self._start >= self.compact_bytes:
+                self._compact()
+
+        if data:
+            self._buf += data
+
+        if self.pending > self.max_buf_bytes:
+            # corta o mais antigo, igual ao comportamento antigo do _read_serial
+            self._start = len(self._buf) - self.max_buf_bytes
+            self._compact()
+            self.overflows += 1
+            return True
+
+        return False
+
+    def lines(self, max_lines: Optional[int] = None) -> Iterator[memoryview]:
+        """
+        Entrega as linhas completas (sem '\\n' e sem '\\r' final) como memoryview.
+
+        A view só vale até a próxima iteração (use bytes(view) para guardar).
+        Linhas vazias e maiores que max_line_bytes são puladas.
+        """
+        buf = self._buf
+        max_line = self.max_line_bytes
+        count = 0
+
+        mv = memoryview(buf)
+        try:
+            while max_lines is None or count < max_lines:
+                start = self._start
+                nl = buf.find(b"\n", start)
+                if nl < 0:
+                    break
+
+                self._start = nl + 1
+
+                end = nl
+                if end > start and buf[end - 1] == 0x0D:  # '\r'
+                    end -= 1
+
+                if end == start:
+                    continue
+
+                if end - start > max_line:
+                    self.dropped_lines += 1
+                    continue
+
+                count += 1
+                view = mv[start:end]
+                try:
+                    yield view
+                finally:
+                    view.release()
+        finally:
+            mv.release()
+
+    def decoded_lines(self, max_lines: Optional[int] = None) -> Iterator[str]:
+        """
+        Linhas completas já decodificadas (utf-8, ignorando erros) e com strip().
+
+        Caminho quente da serial: em vez de um find() por linha em Python, o
+        trecho completo (até o último '\\n') é separado de uma vez por split()
+        em C; o offset continua andando linha a linha, então max_lines e
+        iterações interrompidas deixam o restante no buffer.
+        """
+        buf = self._buf
+        start = self._start
+        last = buf.rfind(b"\n", start)
+        if last < 0:
+            return
+
+        max_line = self.max_line_bytes
+        count = 0
+        pos = start
+
+        for part in buf[start:last].split(b"\n"):
+            n = len(part)
+            pos += n + 1
+            self._start = pos
+
+            if n > max_line and (n - 1 > max_line or part[-1] != 0x0D):  # '\r' não conta
+                self.dropped_lines += 1
+                continue
+
+            line = part.decode("utf-8", "ignore").strip()
+            if not line:
+                continue
+
+            yield line
+
+            count += 1
+            if max_lines is not None and count >= max_lines:
+                return
+
+    def _compact(self):
+        # descarta o que já foi consumido (del no começo do bytearray não realoca)
+        del self._buf[:self._start]
+        self._start = 0
@@ -18,7 +18,6 @@ from __future__ import annotations
 import csv
 import math
 import queue
-import re
 import time
 from dataclasses import dataclass
 from pathlib import Path
@@ -52,6 +51,9 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
+from views.telemetry import SIM_SCHEMA, TelemetryPacket
+from views.serial_framer import LineFramer
+
 
 # ============================================================
 # Utilidades de simulação
@@ -203,122 +205,6 @@ class FlightSimulation:
         return SimulationSample(elapsed_s, pressure_pa, altitude_m)
 
 
-# ============================================================
-# Parser da telemetria URD
-# ============================================================
-
-
-class URDPacketParser:
-    """
-    Parser para pacote sem ordem fixa e com chave de 1 caractere.
-
-    Exemplo aceito:
-        L0 T342.17 A0.000000 O0.000000 H3000 R-1.55 P3.93 Y0.77
-
-    Observação:
-    - p é phase/flight state na telemetria recebida.
-    - P é pitch na telemetria recebida.
-    - Para enviar pressão para o micro, use outro comando, por exemplo PRS101325.00.
-    """
-
-    NAN = float("nan")
-
-    LIST = [
-        "linha", "tempo", "phase", "latitude", "longitude", "hora", "minuto", "precisao",
-        "altitude", "sd", "apogeu_h", "apogeu_t",
-        "pqd_dn", "pqd_db", "pqd_mn", "pqd_mb",
-        "temp", "roll", "pitch", "yaw",
-    ]
-
-    TAG = {
-        "L": "linha",
-        "T": "tempo",
-        "p": "phase",      # flight state
-        "A": "latitude",
-        "O": "longitude",
-        "h": "hora",
-        "n": "minuto",
-        "g": "precisao",
-        "H": "altitude",
-        "s": "sd",
-        "a": "apogeu_h",   # apogeu continua usando chave a
-        "t": "apogeu_t",
-        "D": "pqd_dn",
-        "d": "pqd_db",
-        "M": "pqd_mn",     # Main nominal
-        "m": "pqd_mb",     # Main backup
-        "c": "temp",
-        "R": "roll",
-        "P": "pitch",      # P permanece pitch
-        "Y": "yaw",
-    }
-
-    NUM = r"[-+]?(?:(?:\d+\.\d*)|(?:\.\d+)|(?:\d+))(?:[eE][-+]?\d+)?"
-
-    def parse_packet(self, line: str):
-        if not line:
-            return None
-
-        line = line.strip()
-        tokens = re.findall(rf"([A-Za-z])\s*({self.NUM})", line)
-
-        if not tokens:
-            return None
-
-        raw = {k: None for k in self.LIST}
-        app = {k: self.NAN for k in self.LIST}
-        used_keys = set()
-
-        for key_txt, value_txt in tokens:
-            key = self.TAG.get(key_txt.strip())
-            if key is None:
-                continue
-
-            if key in used_keys:
-                continue
-
-            used_keys.add(key)
-            num = safe_float(value_txt)
-            raw[key] = num
-
-            if num is not None and self._in_range(key, num):
-                app[key] = num
-            else:
-                app[key] = self.NAN
-
-        return raw, app
-
-    def _in_range(self, key: str, value: float) -> bool:
-        """
-        Ajuste fino dos limites do app.
-        A ideia é filtrar pacote corrompido sem depender da ordem.
-        """
-        ranges = {
-            "linha": (0, 10_000_000),
-            "tempo": (-1, 1_000_000),
-            "phase": (0, 6),
-            "latitude": (-90, 90),
-            "longitude": (-180, 180),
-            "hora": (0, 23),
-            "minuto": (0, 59),
-            "precisao": (0, 100),
-            "altitude": (-1000, 100_000),
-            "sd": (0, 1),
-            "apogeu_h": (-1000, 100_000),
-            "apogeu_t": (-1, 1_000_000),
-            "pqd_dn": (-1000, 100_000),
-            "pqd_db": (-1000, 100_000),
-            "pqd_mn": (-1000, 100_000),
-            "pqd_mb": (-1000, 100_000),
-            "temp": (-80, 120),
-            "roll": (-360, 360),
-            "pitch": (-360, 360),
-            "yaw": (-360, 360),
-        }
-        lo, hi = ranges.get(key, (-float("inf"), float("inf")))
-        return lo <= value <= hi
-
-
 # ============================================================
 # Handler serial reutilizável
 # ============================================================
@@ -345,7 +231,7 @@ class URDSerialHandler(QThread):
     simulation_started = Signal()
     simulation_recovered = Signal()
     timeout_detected = Signal(float)
-    packet_received = Signal(dict, dict, str)  # raw, app, linha original
+    packet_received = Signal(object)  # TelemetryPacket (com a linha original)
     error = Signal(str)
 
     PRESSURE_CMD_PREFIX = ""
@@ -368,8 +254,8 @@ class URDSerialHandler(QThread):
         self._simulation_requested = False
         self._simulation_active = False
         self._last_rx_mono = 0.0
+        self._framer = LineFramer()
 
-        self._parser = URDPacketParser()
         self._cmd_queue: queue.Queue[tuple[str, object | None]] = queue.Queue()
 
     def run(self):
@@ -391,7 +277,7 @@ class URDSerialHandler(QThread):
 
             while self._running:
                 self._consume_commands()
-                self._read_available_line()
+                self._read_available_lines()
                 self._check_timeout_and_recover()
                 self.msleep(5)
 
@@ -500,29 +386,35 @@ class URDSerialHandler(QThread):
         self.status.emit(f"Timeout serial ({elapsed:.2f}s). Sem reconexão automática.", "#d4a017")
         self.log.emit(f"[TIMEOUT] Sem dados por {elapsed:.2f}s. Reconexão automática desativada.")
 
-    def _read_available_line(self):
+    def _fill_framer(self) -> bool:
+        """
+        Lê o que houver na serial (espera no máximo o timeout da porta pelo 1º byte)
+        e joga no framer. Retorna True se chegou algum byte.
+        """
+        chunk = self._ser.read(max(1, self._ser.in_waiting))
+        if not chunk:
+            return False
+        self._framer.feed(chunk)
+        return True
+
+    def _read_available_lines(self):
         if not self._ser or not self._ser.is_open:
             return
 
         try:
-            raw = self._ser.readline()
-            if not raw:
+            if not self._fill_framer():
                 return
 
-            line = raw.decode(errors="ignore").strip()
-            if not line:
-                return
-
-            self._last_rx_mono = time.monotonic()
-            self.log.emit(f"RX: {line}")
+            for line in self._framer.decoded_lines():
+                self._last_rx_mono = time.monotonic()
+                self.log.emit(f"RX: {line}")
 
-            if line == "OK" or line == "STARTED":
-                return
+                if line == "OK" or line == "STARTED":
+                    continue
 
-            parsed = self._parser.parse_packet(line)
-            if parsed is not None:
-                raw_packet, app_packet = parsed
-                self.packet_received.emit(raw_packet, app_packet, line)
+                packet = SIM_SCHEMA.parse(line)
+                if packet is not None:
+                    self.packet_received.emit(packet)
 
         except Exception as e:
             self.error.emit(f"Erro de leitura serial: {e}")
@@ -535,26 +427,22 @@ class URDSerialHandler(QThread):
                 return False
 
             try:
-                raw = self._ser.readline()
-                if not raw:
+                if not self._fill_framer():
                     self.msleep(5)
                     continue
 
-                line = raw.decode(errors="ignore").strip()
-                if not line:
-                    continue
-
-                self._last_rx_mono = time.monotonic()
-                self.log.emit(f"RX: {line}")
+                # linhas depois do token ficam no framer para a próxima leitura
+                for line in self._framer.decoded_lines():
+                    self._last_rx_mono = time.monotonic()
+                    self.log.emit(f"RX: {line}")
 
-                if line == expected:
-                    return True
+                    if line == expected:
+                        return True
 
-                # Se chegar telemetria durante uma espera, não joga fora.
-                parsed = self._parser.parse_packet(line)
-                if parsed is not None:
-                    raw_packet, app_packet = parsed
-                    self.packet_received.emit(raw_packet, app_packet, line)
+                    # Se chegar telemetria durante uma espera, não joga fora.
+                    packet = SIM_SCHEMA.parse(line)
+                    if packet is not None:
+                        self.packet_received.emit(packet)
 
             except Exception as e:
                 self.error.emit(f"Erro aguardando {expected}: {e}")
@@ -571,6 +459,7 @@ class URDSerialHandler(QThread):
         self.log.emit(f"TX: {text.strip()}")
 
     def _safe_reset_buffers(self):
+        self._framer.clear()
         try:
             if self._ser and self._ser.is_open:
                 self._ser.reset_input_buffer()
@@ -584,10 +473,8 @@ class URDSerialHandler(QThread):
 
         end = time.monotonic() + seconds
         while time.monotonic() < end:
-            raw = self._ser.readline()
-            if raw:
-                line = raw.decode(errors="ignore").strip()
-                if line:
+            if self._fill_framer():
+                for line in self._framer.decoded_lines():
                     self.log.emit(f"RX[drain]: {line}")
             else:
                 self.msleep(5)
@@ -599,6 +486,7 @@ class URDSerialHandler(QThread):
         except Exception:
             pass
         self._ser = None
+        self._framer.clear()
         self._connected_ok = False
         self._simulation_active = False
 
@@ -1458,15 +1346,13 @@ class URDSimulatorPage(QWidget):
 
     # ---------- Recepção de pacotes ----------
 
-    def _on_packet_received(self, raw: dict, app: dict, line: str):
+    def _on_packet_received(self, packet: TelemetryPacket):
         self._hz_counter += 1
-        total_fields = len(app)
-        valid_fields = sum(1 for v in app.values() if self._is_valid_number(v))
-        self.lbl_serial_packets.setText(f"{valid_fields}/{total_fields}")
-        self._set_serial_status("ok" if valid_fields == total_fields else "bad")
+        self.lbl_serial_packets.setText(f"{packet.valid_fields}/{packet.total_fields}")
+        self._set_serial_status("ok" if packet.all_valid else "bad")
 
-        micro_alt = app.get("altitude", float("nan"))
-        micro_time = app.get("tempo", float("nan"))
+        micro_alt = packet.get("altitude")
+        micro_time = packet.get("tempo")
 
         micro_time_rel = float("nan")
         if self._is_valid_number(micro_time):
@@ -1492,9 +1378,9 @@ class URDSimulatorPage(QWidget):
                 self.lbl_packet_time.setText(f"{micro_time:.2f} s")
 
         self._update_delta_label()
-        self._check_parachute_events(app)
+        self._check_parachute_events(packet)
 
-    def _check_parachute_events(self, app: dict):
+    def _check_parachute_events(self, packet: TelemetryPacket):
         phase_names = {
             0: "Boot",
             1: "Pre initialization",
@@ -1505,7 +1391,7 @@ class URDSimulatorPage(QWidget):
             6: "Landed",
         }
 
-        phase = app.get("phase", float("nan"))
+        phase = packet.get("phase")
         if self._is_valid_number(phase):
             phase_i = int(phase)
             self.lbl_phase.setText(f"{phase_i} - {phase_names.get(phase_i, 'Unknown')}")
@@ -1520,7 +1406,7 @@ class URDSimulatorPage(QWidget):
         }
 
         for key, (name, label) in event_map.items():
-            value = app.get(key, float("nan"))
+            value = packet.get(key)
             if not self._is_valid_number(value):
                 continue
 
@@ -0,0 +1,168 @@
+# views/startup_profile.py
+"""
+Perfil do tempo de abertura do app (python main.py --profile-startup).
+
+- imports: builtins.__import__ é embrulhado (só na thread principal) e cada
+  módulo carregado pela primeira vez tem o tempo medido: total (com os
+  imports dele) e próprio
+- etapas: o main.py marca imports, register_tile_scheme, QApplication,
+  stylesheet, MainWindow, show e o primeiro paint
+- o relatório sai quando a janela termina o primeiro paint; as páginas
+  abertas depois (import no primeiro _go_page) saem uma a uma
+
+Sem console (build --noconsole do PyInstaller) o relatório vai para
+startup_profile.txt na pasta atual. Sem a flag, PROFILE só tem chamadas
+vazias.
+"""
+
+from __future__ import annotations
+
+import builtins
+import importlib.util
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+FLAG = "--profile-startup"
+REPORT_FILE = "startup_profile.txt"
+
+TOP_SELF = 15  # quantos módulos no ranking de tempo próprio
+
+
+class StartupProfile:
+    def __init__(self):
+        self.enabled = False
+        self.reported = False
+        self.t0 = time.perf_counter()
+        self.stages: list[tuple[str, float, float]] = []           # (nome, fim desde t0, duração)
+        self.imports: list[tuple[str, float, float, int]] = []     # (módulo, total, próprio, profundidade)
+        self._stack: list[float] = []                              # tempo dos filhos por nível
+        self._ident = None
+        self._orig_import = None
+        self._paint_filter = None
+
+    # ---------- coleta ----------
+
+    def start(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        self._ident = threading.get_ident()
+        self._orig_import = builtins.__import__
+        builtins.__import__ = self._import
+
+    def stop(self):
+        if self._orig_import is not None:
+            builtins.__import__ = self._orig_import
+            self._orig_import = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        full = name
+        if level:
+            try:
+                full = importlib.util.resolve_name("." * level + name, (globals or {}).get("__package__"))
+            except (ImportError, ValueError):
+                pass
+        pending = [] if full in sys.modules else [full]
+        pending += [f"{full}.{f}" for f in fromlist or () if f != "*" and f"{full}.{f}" not in sys.modules]
+
+        if not pending or threading.get_ident() != self._ident:
+            return self._orig_import(name, globals, locals, fromlist, level)
+
+        self._stack.append(0.0)
+        t = time.perf_counter()
+        try:
+            return self._orig_import(name, globals, locals, fromlist, level)
+        finally:
+            total = time.perf_counter() - t
+            children = self._stack.pop()
+            # fromlist também traz atributos (classes...): só conta o que virou módulo
+            loaded = [m for m in pending if m in sys.modules]
+            if loaded:
+                self.imports.append((", ".join(loaded), total, total - children, len(self._stack)))
+            if self._stack:
+                self._stack[-1] += total if loaded else children
+
+    def mark(self, name: str):
+        """Marca o fim de uma etapa que começou na marca anterior."""
+        if not self.enabled:
+            return
+        now = time.perf_counter() - self.t0
+        prev = self.stages[-1][1] if self.stages else 0.0
+        self.stages.append((name, now, now - prev))
+
+    @contextmanager
+    def stage(self, name: str):
+        if not self.enabled:
+            yield
+            return
+        first = len(self.imports)
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.stages.append((name, end - self.t0, end - t))
+            if self.reported:
+                lines = [f"[startup] {name}: {(end - t) * 1000:.1f} ms"]
+                lines += [f"    {total * 1000:8.1f}  {mod}" for mod, total, _own, depth in self.imports[first:] if depth == 0]
+                self._write(lines)
+
+    def watch_first_paint(self, app):
+        """Relatório logo depois do primeiro QEvent.Paint (a janela já desenhou)."""
+        if not self.enabled:
+            return
+        from PySide6.QtCore import QEvent, QObject, QTimer
+
+        profile = self
+
+        class _FirstPaint(QObject):
+            def eventFilter(self, obj, event):
+                if event.type() == QEvent.Paint and profile._paint_filter is self:
+                    profile._paint_filter = None
+                    app.removeEventFilter(self)
+                    # singleShot(0): depois que o paint em curso terminar
+                    QTimer.singleShot(0, lambda: (profile.mark("primeiro paint"), profile.report()))
+                return False
+
+        self._paint_filter = _FirstPaint(app)
+        app.installEventFilter(self._paint_filter)
+
+    # ---------- relatório ----------
+
+    def lines(self) -> list[str]:
+        out = ["[startup] etapas (ms)          duração      acumulado"]
+        for name, at, took in self.stages:
+            out.append(f"    {name:<26} {took * 1000:8.1f}   {at * 1000:10.1f}")
+
+        out.append("[startup] imports de primeiro nível (ms, total com os imports internos)")
+        for mod, total, _own, depth in self.imports:
+            if depth == 0:
+                out.append(f"    {total * 1000:8.1f}  {mod}")
+
+        out.append(f"[startup] {TOP_SELF} módulos com mais tempo próprio (ms)")
+        for mod, _total, own, _depth in sorted(self.imports, key=lambda r: r[2], reverse=True)[:TOP_SELF]:
+            out.append(f"    {own * 1000:8.1f}  {mod}")
+        return out
+
+    def report(self):
+        if not self.enabled or self.reported:
+            return
+        self.reported = True
+        self._write(self.lines())
+
+    def _write(self, lines: list[str]):
+        text = "\n".join(lines) + "\n"
+        if sys.stderr is not None:
+            sys.stderr.write(text)
+            sys.stderr.flush()
+            return
+        try:
+            with open(REPORT_FILE, "a", encoding="utf-8") as f:
+                f.write(text)
+        except OSError:
+            pass
+
+
+PROFILE = StartupProfile()
@@ -0,0 +1,377 @@
+# views/telemetry.py
+"""
+Parser compartilhado da telemetria URD.
+
+Usado pela GS Flight (GSFlightSinglePage / GSFlightRaspPage) e pelo Simulador.
+
+Pacote sem ordem fixa e com chave de 1 caractere:
+    L0 T342.17 A0.000000 O0.000000 H3000 R-1.55 P3.93 Y0.77
+
+Tudo que não depende da linha recebida (regex, tabelas de chaves e ranges)
+é montado uma única vez no import. Por pacote só são criadas duas listas
+de tamanho fixo dentro de um TelemetryPacket (com __slots__).
+
+Para backlog (vários pacotes de uma vez) use TelemetrySchema.parse_many, que
+devolve um array estruturado do NumPy com uma coluna por campo.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from typing import Iterable, Optional
+
+import numpy as np
+
+NAN = float("nan")
+
+# Número com sinal, decimal e notação científica
+NUM = r"[-+]?(?:(?:\d+\.\d*)|(?:\.\d+)|(?:\d+))(?:[eE][-+]?\d+)?"
+
+# Formatos aceitos:
+# H3000
+# T342.17
+# R-1.55
+# A0.000000
+TOKEN_RE = re.compile(rf"([A-Za-z])\s*({NUM})")
+
+
+class TelemetrySchema:
+    """
+    Tabelas de um formato de pacote, "achatadas" em arrays por índice.
+
+    - keys:  ordem oficial dos campos (índice de cada campo no pacote)
+    - tags:  chave de 1 caractere -> nome do campo
+    - ranges: nome do campo -> (min, max) aceito pelo app
+    """
+
+    __slots__ = ("keys", "index", "tag_index", "lo", "hi", "size", "full_mask", "dtype", "_bits")
+
+    def __init__(self, keys: list[str], tags: dict[str, str], ranges: dict[str, tuple[float, float]]):
+        self.keys = tuple(keys)
+        self.size = len(self.keys)
+        self.index = {k: i for i, k in enumerate(self.keys)}
+        self.tag_index = {tag: self.index[name] for tag, name in tags.items()}
+        self.lo = tuple(float(ranges.get(k, (-math.inf, math.inf))[0]) for k in self.keys)
+        self.hi = tuple(float(ranges.get(k, (-math.inf, math.inf))[1]) for k in self.keys)
+        self.full_mask = (1 << self.size) - 1
+
+        # array estruturado de parse_many: uma coluna float64 por campo (valor RAW,
+        # NaN se não veio) + máscaras de bits "present" (veio) e "valid" (no range)
+        self.dtype = np.dtype(
+            [(k, np.float64) for k in self.keys]
+            + [("present", np.uint32), ("valid", np.uint32)]
+        )
+        self._bits = np.left_shift(np.uint32(1), np.arange(self.size, dtype=np.uint32))
+
+    def parse(self, line: str) -> Optional["TelemetryPacket"]:
+        """
+        Parseia uma linha. Retorna None se não houver nenhum token chave/valor.
+
+        Chave desconhecida é ignorada; chave repetida no mesmo pacote vale só a primeira.
+        """
+        if not line:
+            return None
+
+        tokens = TOKEN_RE.findall(line)
+        if not tokens:
+            return None
+
+        tag_index = self.tag_index
+        lo = self.lo
+        hi = self.hi
+
+        raw = [None] * self.size
+        app = [NAN] * self.size
+        seen = 0
+        valid = 0
+
+        for key_txt, value_txt in tokens:
+            idx = tag_index.get(key_txt)
+
+            # ignora chave desconhecida
+            if idx is None:
+                continue
+
+            # ignora chave duplicada no mesmo pacote
+            bit = 1 << idx
+            if seen & bit:
+                continue
+            seen |= bit
+
+            # o regex garante um número válido; salva RAW sempre
+            num = float(value_txt)
+            raw[idx] = num
+
+            # valida número para uso no app
+            if lo[idx] <= num <= hi[idx]:
+                app[idx] = num
+                valid |= bit
+
+        return TelemetryPacket(self, raw, app, valid, line)
+
+    def parse_many(self, lines: Iterable[str]) -> np.ndarray:
+        """
+        Parseia um lote de linhas de uma vez (ex.: backlog de um tick da serial).
+
+        Retorna um array estruturado (self.dtype) com uma linha por entrada:
+        - colunas dos campos com o valor RAW (NaN onde o campo não veio)
+        - "present": bit i ligado se keys[i] veio na linha (0 = linha sem pacote)
+        - "valid":   bit i ligado se keys[i] está dentro do range
+
+        O range check é feito vetorizado, sobre o lote inteiro.
+        """
+        tag_index = self.tag_index
+        size = self.size
+
+        flat = []
+        present = []
+
+        for line in lines:
+            row = [NAN] * size
+            seen = 0
+
+            if line:
+                for key_txt, value_txt in TOKEN_RE.findall(line):
+                    idx = tag_index.get(key_txt)
+                    if idx is None:
+                        continue
+
+                    bit = 1 << idx
+                    if seen & bit:
+                        continue
+                    seen |= bit
+
+                    row[idx] = float(value_txt)
+
+            flat.extend(row)
+            present.append(seen)
+
+        n = len(present)
+        out = np.empty(n, dtype=self.dtype)
+        if n == 0:
+            return out
+
+        values = np.array(flat, dtype=np.float64).reshape(n, size)
+
+        # NaN falha nas duas comparações -> campo ausente nunca é válido
+        in_range = (values >= np.array(self.lo)) & (values <= np.array(self.hi))
+
+        for i, k in enumerate(self.keys):
+            out[k] = values[:, i]
+        out["present"] = present
+        out["valid"] = (in_range * self._bits).sum(axis=1, dtype=np.uint32)
+        return out
+
+    def column(self, batch: np.ndarray, key: str, validated: bool = True) -> np.ndarray:
+        """
+        Coluna de um lote de parse_many.
+        Com validated=True, valores fora do range (ou ausentes) viram NaN.
+        """
+        col = batch[key]
+        if not validated:
+            return col
+        bit = self._bits[self.index[key]]
+        return np.where((batch["valid"] & bit) != 0, col, NAN)
+
+    def invalid_keys(self, valid_mask: int) -> list[str]:
+        """Campos com o bit de válido desligado (para diagnóstico)."""
+        mask = int(valid_mask)
+        return [k for i, k in enumerate(self.keys) if not (mask >> i) & 1]
+
+
+class TelemetryPacket:
+    """
+    Pacote parseado.
+
+    - raw_values: valores como chegaram (None onde o campo não veio)
+    - app_values: valores validados pelo range (NaN onde falhou)
+    - valid_mask: bit i ligado se o campo keys[i] é válido
+    """
+
+    __slots__ = ("schema", "raw_values", "app_values", "valid_mask", "line")
+
+    def __init__(self, schema: TelemetrySchema, raw_values: list, app_values: list, valid_mask: int, line: str):
+        self.schema = schema
+        self.raw_values = raw_values
+        self.app_values = app_values
+        self.valid_mask = valid_mask
+        self.line = line
+
+    def get(self, key: str, default: float = NAN) -> float:
+        """Valor validado (app) de um campo."""
+        idx = self.schema.index.get(key)
+        if idx is None:
+            return default
+        return self.app_values[idx]
+
+    def get_raw(self, key: str):
+        """Valor bruto (raw) de um campo, ou None."""
+        idx = self.schema.index.get(key)
+        if idx is None:
+            return None
+        return self.raw_values[idx]
+
+    def is_valid(self, key: str) -> bool:
+        idx = self.schema.index.get(key)
+        return idx is not None and bool(self.valid_mask & (1 << idx))
+
+    @property
+    def total_fields(self) -> int:
+        return self.schema.size
+
+    @property
+    def valid_fields(self) -> int:
+        return bin(self.valid_mask).count("1")
+
+    @property
+    def all_valid(self) -> bool:
+        return self.valid_mask == self.schema.full_mask
+
+    def raw(self) -> dict:
+        """Visão dict dos valores brutos (cria um dict novo; evitar no caminho quente)."""
+        return dict(zip(self.schema.keys, self.raw_values))
+
+    def app(self) -> dict:
+        """Visão dict dos valores validados (cria um dict novo; evitar no caminho quente)."""
+        return dict(zip(self.schema.keys, self.app_values))
+
+
+# ============================================================
+# Formato da GS Flight
+# ============================================================
+
+FLIGHT_SCHEMA = TelemetrySchema(
+    keys=[
+        "linha", "tempo", "latitude", "longitude", "hora", "minuto", "precisao",
+        "altitude", "sd", "apogeu_h", "apogeu_t",
+        "pqd_dn", "pqd_db", "pqd_mn", "pqd_mb",
+        "temp", "roll", "pitch", "yaw",
+    ],
+    tags={
+        "L": "linha",
+        "T": "tempo",
+        "A": "latitude",
+        "O": "longitude",
+
+        "h": "hora",
+        "n": "minuto",
+        "g": "precisao",
+
+        "H": "altitude",
+        "s": "sd",
+
+        "a": "apogeu_h",
+        "t": "apogeu_t",
+
+        "D": "pqd_dn",
+        "d": "pqd_db",
+        "N": "pqd_mn",
+        "B": "pqd_mb",
+
+        "c": "temp",
+
+        "R": "roll",
+        "P": "pitch",
+        "Y": "yaw",
+    },
+    # ranges “seguros” (ajuste como quiser)
+    ranges={
+        "linha": (0, 1e9),
+        "tempo": (0, 1e9),
+        "latitude": (-90.0, 90.0),
+        "longitude": (-180.0, 180.0),
+        "hora": (0, 23),
+        "minuto": (0, 59),
+        "precisao": (0.0, 101.0),         # HDOP
+        "altitude": (-15000.0, 15000.0),
+        "sd": (0.0, 1.0),
+        "apogeu_h": (-15000.0, 15000.0),
+        "apogeu_t": (0.0, 1e9),
+        "pqd_mn": (-15000.0, 15000.0),
+        "pqd_dn": (-15000.0, 15000.0),
+        "pqd_mb": (-15000.0, 15000.0),
+        "pqd_db": (-15000.0, 15000.0),
+        "temp": (-80.0, 150.0),
+        "roll": (-720.0, 720.0),
+        "pitch": (-720.0, 720.0),
+        "yaw": (-720.0, 720.0),
+    },
+)
+
+# log da GS Flight (Logger): campos na ordem das colunas e o cabeçalho gravado
+FLIGHT_LOG_COLUMNS = (
+    "linha", "tempo", "latitude", "longitude", "hora", "minuto", "precisao", "altitude", "sd",
+    "apogeu_h", "apogeu_t",
+    "pqd_mn", "pqd_dn", "pqd_mb", "pqd_db",
+    "temp", "roll", "pitch", "yaw",
+)
+FLIGHT_LOG_HEADER = (
+    "linha", "tempo.s", "lat.GPS", "lon.GPS", "hora.GPS", "min.GPS",
+    "precisao.GPS", "baro.h.m", "sd.ok.bool", "apogeu.h.m", "apogeu.t.s",
+    "pqd.mainN.m", "pqd.drogueN.m", "pqd.mainB.m", "pqd.drogueB.m",
+    "temperatura", "roll", "pitch", "yaw",
+)
+
+
+# ============================================================
+# Formato do Simulador
+# ============================================================
+# Observação:
+# - p é phase/flight state na telemetria recebida.
+# - P é pitch na telemetria recebida.
+# - Para enviar pressão para o micro, use outro comando, por exemplo PRS101325.00.
+
+SIM_SCHEMA = TelemetrySchema(
+    keys=[
+        "linha", "tempo", "phase", "latitude", "longitude", "hora", "minuto", "precisao",
+        "altitude", "sd", "apogeu_h", "apogeu_t",
+        "pqd_dn", "pqd_db", "pqd_mn", "pqd_mb",
+        "temp", "roll", "pitch", "yaw",
+    ],
+    tags={
+        "L": "linha",
+        "T": "tempo",
+        "p": "phase",      # flight state
+        "A": "latitude",
+        "O": "longitude",
+        "h": "hora",
+        "n": "minuto",
+        "g": "precisao",
+        "H": "altitude",
+        "s": "sd",
+        "a": "apogeu_h",   # apogeu continua usando chave a
+        "t": "apogeu_t",
+        "D": "pqd_dn",
+        "d": "pqd_db",
+        "M": "pqd_mn",     # Main nominal
+        "m": "pqd_mb",     # Main backup
+        "c": "temp",
+        "R": "roll",
+        "P": "pitch",      # P permanece pitch
+        "Y": "yaw",
+    },
+    # A ideia é filtrar pacote corrompido sem depender da ordem.
+    ranges={
+        "linha": (0, 10_000_000),
+        "tempo": (-1, 1_000_000),
+        "phase": (0, 6),
+        "latitude": (-90, 90),
+        "longitude": (-180, 180),
+        "hora": (0, 23),
+        "minuto": (0, 59),
+        "precisao": (0, 100),
+        "altitude": (-1000, 100_000),
+        "sd": (0, 1),
+        "apogeu_h": (-1000, 100_000),
+        "apogeu_t": (-1, 1_000_000),
+        "pqd_dn": (-1000, 100_000),
+        "pqd_db": (-1000, 100_000),
+        "pqd_mn": (-1000, 100_000),
+        "pqd_mb": (-1000, 100_000),
+        "temp": (-80, 120),
+        "roll": (-360, 360),
+        "pitch": (-360, 360),
+        "yaw": (-360, 360),
+    },
+)
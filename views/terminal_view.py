@@ -0,0 +1,269 @@
+# views/terminal_view.py
+"""
+Terminal de dados da GS Flight (single e rasp).
+
+- TerminalHistory:   histórico completo em memória (linha + tipo + máscara de
+                     válidos), com limite de linhas e busca/filtro
+- TerminalView:      QPlainTextEdit com limite de blocos; as linhas recebidas
+                     ficam pendentes e entram no widget uma vez por frame (flush)
+- TerminalFilterBar: busca por texto / tipo de linha / campo inválido; o
+                     resultado vem do histórico, sem carregar tudo no widget
+"""
+
+from __future__ import annotations
+
+from array import array
+from typing import Callable, Optional, Sequence
+
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtWidgets import QComboBox, QHBoxLayout, QLabel, QLineEdit, QPlainTextEdit, QWidget
+
+# tipos de linha
+PACKET = 0      # telemetria
+INFO = 1        # mensagens da própria GS (banner, config LoRa...)
+HANDSHAKE = 2   # linhas do handshake com o firmware
+
+# modos do filtro
+MODE_ALL = "all"
+MODE_PACKETS = "packets"
+MODE_INVALID = "invalid"
+MODE_HANDSHAKE = "handshake"
+
+LineFilter = Callable[[str, int, int], bool]
+
+
+class TerminalHistory:
+    """
+    Histórico do terminal em listas paralelas (linha, tipo, máscara).
+
+    Passando de max_lines, o mais antigo é descartado em bloco (10% de folga),
+    para não pagar um del no começo da lista a cada linha.
+    """
+
+    def __init__(self, max_lines: int = 200_000, full_mask: int = 0):
+        self.max_lines = max(1000, int(max_lines))
+        self.full_mask = int(full_mask)
+
+        self._lines: list[str] = []
+        self._kinds = bytearray()
+        self._masks = array("I")
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def clear(self):
+        self._lines.clear()
+        self._kinds = bytearray()
+        self._masks = array("I")
+
+    def extend(self, lines: Sequence[str], kind: int = PACKET, masks: Optional[Sequence[int]] = None):
+        n = len(lines)
+        if n == 0:
+            return
+
+        self._lines.extend(lines)
+        self._kinds.extend(bytes([kind]) * n)
+        if masks is None:
+            self._masks.extend([0] * n)
+        else:
+            self._masks.extend(masks)
+
+        if len(self._lines) > self.max_lines + self.max_lines // 10:
+            drop = len(self._lines) - self.max_lines
+            del self._lines[:drop]
+            del self._kinds[:drop]
+            del self._masks[:drop]
+
+    def make_filter(self, text: str = "", mode: str = MODE_ALL, bits: int = 0) -> Optional[LineFilter]:
+        """
+        Monta o predicado (linha, tipo, máscara) -> bool, ou None se não há filtro.
+
+        bits: campos (bits da máscara) que devem estar inválidos; implica pacote.
+        """
+        text = text.strip().casefold()
+        full = self.full_mask
+
+        if not text and mode == MODE_ALL and not bits:
+            return None
+
+        def accept(line: str, kind: int, mask: int) -> bool:
+            if mode == MODE_PACKETS and kind != PACKET:
+                return False
+            if mode == MODE_INVALID and (kind != PACKET or mask == full):
+                return False
+            if mode == MODE_HANDSHAKE and kind == PACKET:
+                return False
+            if bits and (kind != PACKET or mask & bits):
+                return False
+            if text and text not in line.casefold():
+                return False
+            return True
+
+        return accept
+
+    def search(self, accept: Optional[LineFilter], limit: Optional[int] = None) -> list[str]:
+        """Últimas `limit` linhas que passam no filtro, em ordem cronológica."""
+        lines = self._lines
+        if accept is None:
+            return lines[-limit:] if limit else list(lines)
+
+        kinds, masks = self._kinds, self._masks
+        out = []
+        for i in range(len(lines) - 1, -1, -1):
+            if accept(lines[i], kinds[i], masks[i]):
+                out.append(lines[i])
+                if limit and len(out) >= limit:
+                    break
+        out.reverse()
+        return out
+
+
+class TerminalView(QPlainTextEdit):
+    """
+    Terminal somente leitura com no máximo max_blocks linhas no widget.
+
+    queue_lines() guarda no histórico e deixa a linha pendente; flush() (chamado
+    pelo render da página) faz um único appendPlainText por frame.
+    """
+
+    def __init__(self, max_blocks: int = 2000, history_lines: int = 200_000, full_mask: int = 0, parent=None):
+        super().__init__(parent)
+        self.setReadOnly(True)
+        self.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+
+        self.max_blocks = max(100, int(max_blocks))
+        self.setMaximumBlockCount(self.max_blocks)
+
+        self.history = TerminalHistory(history_lines, full_mask)
+        self._pending: list[str] = []
+        self._filter: Optional[LineFilter] = None
+
+    # ---------- escrita ----------
+
+    def queue_lines(self, lines: Sequence[str], kind: int = PACKET, masks: Optional[Sequence[int]] = None):
+        self.history.extend(lines, kind, masks)
+
+        accept = self._filter
+        if accept is None:
+            self._pending.extend(lines)
+        else:
+            if masks is None:
+                masks = [0] * len(lines)
+            self._pending.extend(l for l, m in zip(lines, masks) if accept(l, kind, m))
+
+        # página pausada (sem flush): só o final importa
+        if len(self._pending) > 2 * self.max_blocks:
+            del self._pending[:-self.max_blocks]
+
+    def flush(self, autoscroll: bool = True):
+        pending = self._pending
+        if not pending:
+            return
+
+        if len(pending) > self.max_blocks:
+            pending = pending[-self.max_blocks:]
+        self._pending = []
+
+        self.appendPlainText("\n".join(pending))
+        if autoscroll:
+            self.scroll_to_end()
+
+    def append_line(self, line: str, kind: int = INFO, autoscroll: bool = True):
+        """Linha avulsa (banner, handshake): entra na hora, sem esperar o frame."""
+        self.queue_lines([line], kind)
+        self.flush(autoscroll)
+
+    def scroll_to_end(self):
+        sb = self.verticalScrollBar()
+        sb.setValue(sb.maximum())
+
+    def clear(self):
+        """Limpa o widget e o histórico."""
+        self.history.clear()
+        self._pending = []
+        super().clear()
+
+    # ---------- filtro ----------
+
+    @property
+    def filtering(self) -> bool:
+        return self._filter is not None
+
+    def set_filter(self, text: str = "", mode: str = MODE_ALL, bits: int = 0) -> int:
+        """Aplica o filtro e redesenha a partir do histórico. Retorna quantas linhas aparecem."""
+        self._filter = self.history.make_filter(text, mode, bits)
+        self._pending = []
+
+        lines = self.history.search(self._filter, limit=self.max_blocks)
+        super().clear()
+        if lines:
+            self.appendPlainText("\n".join(lines))
+        self.scroll_to_end()
+        return len(lines)
+
+
+class TerminalFilterBar(QWidget):
+    """Busca / filtro do TerminalView (texto, tipo de linha, campo inválido)."""
+
+    MODES = (
+        ("Tudo", MODE_ALL),
+        ("Pacotes", MODE_PACKETS),
+        ("Inválidos", MODE_INVALID),
+        ("Handshake/GS", MODE_HANDSHAKE),
+    )
+
+    def __init__(self, terminal: TerminalView, keys: Sequence[str] = (), parent=None):
+        super().__init__(parent)
+        self.terminal = terminal
+
+        lay = QHBoxLayout(self)
+        lay.setContentsMargins(0, 0, 0, 0)
+        lay.setSpacing(4)
+
+        self.edit_search = QLineEdit()
+        self.edit_search.setPlaceholderText("Buscar no histórico...")
+        self.edit_search.setClearButtonEnabled(True)
+        self.edit_search.setMaximumHeight(24)
+
+        self.combo_mode = QComboBox()
+        self.combo_mode.setMaximumHeight(24)
+        for text, mode in self.MODES:
+            self.combo_mode.addItem(text, mode)
+
+        # campo inválido: bit i = keys[i] (mesma ordem da máscara do schema)
+        self.combo_key = QComboBox()
+        self.combo_key.setMaximumHeight(24)
+        self.combo_key.setToolTip("Só pacotes com este campo inválido")
+        self.combo_key.addItem("Campo: todos", 0)
+        for i, key in enumerate(keys):
+            self.combo_key.addItem(f"{key} inválido", 1 << i)
+
+        self.lbl_count = QLabel("")
+        self.lbl_count.setStyleSheet("color:#888; font-size:11px;")
+
+        lay.addWidget(self.edit_search, 1)
+        lay.addWidget(self.combo_mode)
+        lay.addWidget(self.combo_key)
+        lay.addWidget(self.lbl_count)
+
+        # digitação: aplica só depois de uma pausa
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(200)
+        self._debounce.timeout.connect(self.apply)
+
+        self.edit_search.textChanged.connect(lambda _t: self._debounce.start())
+        self.combo_mode.currentIndexChanged.connect(lambda _i: self.apply())
+        self.combo_key.currentIndexChanged.connect(lambda _i: self.apply())
+
+    def apply(self):
+        text = self.edit_search.text()
+        mode = self.combo_mode.currentData()
+        bits = self.combo_key.currentData() or 0
+
+        shown = self.terminal.set_filter(text, mode, bits)
+        if not self.terminal.filtering:
+            self.lbl_count.setText("")
+        else:
+            self.lbl_count.setText(f"{shown} / {len(self.terminal.history)}")
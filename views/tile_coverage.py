@@ -0,0 +1,312 @@
+# views/tile_coverage.py
+"""
+Cobertura de um pack de tiles como quadtree, por camada e por zoom.
+
+Ampliar um pack (mais alguns km, mais um zoom) não deve percorrer de novo o
+pedido inteiro: o pedido novo é comparado com a cobertura e só os tiles que
+faltam são planejados (missing()), pulando blocos inteiros já cobertos.
+
+Quadtree "linear" (um conjunto por nível), montada de baixo para cima:
+
+    full[d]     nós do nível d totalmente cobertos (só os maximais: o pai não é cheio)
+    partial[d]  nós do nível d com parte coberta
+
+O nível d = z são os próprios tiles; o nível 0 é o mundo. Um tile está
+coberto se algum ancestral (ou ele mesmo) está em full. Memória ~ borda da
+região, não a área.
+
+A cobertura vem do manifesto do pack (views/tile_manifest.py) quando existe;
+senão do próprio pack (linhas do .mbtiles ou arquivos da pasta).
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+from typing import Iterable, Iterator, Optional
+
+from views.mbtiles import FLAT_LAYER, MBTilesReader, folder_pack_layers, is_mbtiles, iter_folder_tiles, num2deg
+from views.tile_manifest import DONE, NOT_FOUND, TileManifest, manifest_path_for
+
+EMPTY = 0
+PARTIAL = 1
+FULL = 2
+
+# retângulo de tiles (inclusivo)
+TileRect = tuple[int, int, int, int]  # x0, x1, y0, y1
+
+
+class ZoomCoverage:
+    """Quadtree dos tiles de um zoom."""
+
+    def __init__(self, z: int, tiles: Iterable[tuple[int, int]] = ()):
+        self.z = int(z)
+        self.full: list[set] = [set() for _ in range(self.z + 1)]
+        self.partial: list[set] = [set() for _ in range(self.z + 1)]
+        self.count = 0
+        self._build(tiles)
+
+    def _build(self, tiles: Iterable[tuple[int, int]]):
+        """
+        De baixo para cima, coluna a coluna com faixas [y0, y1]: um nível sobe
+        juntando as colunas 2k e 2k+1 (cheio = as duas cheias nas duas linhas).
+        Só a borda vira conjunto de nós; o miolo fica nas faixas.
+        """
+        ys_by_x: dict = {}
+        for x, y in tiles:
+            ys_by_x.setdefault(x, []).append(y)
+        cols: dict = {}
+        for x, ys in ys_by_x.items():
+            runs = cols[x] = []
+            ys = sorted(set(ys))
+            self.count += len(ys)
+            for y in ys:
+                if runs and runs[-1][1] == y - 1:
+                    runs[-1][1] = y
+                else:
+                    runs.append([y, y])
+        full, any_ = cols, cols
+
+        for d in range(self.z, 0, -1):
+            parent_full: dict = {}
+            parent_any: dict = {}
+            for px in {x >> 1 for x in any_}:
+                a, b = any_.get(2 * px, []), any_.get(2 * px + 1, [])
+                parent_any[px] = _union([[y0 >> 1, y1 >> 1] for y0, y1 in _union(a, b)])
+                both = _intersect(full.get(2 * px, []), full.get(2 * px + 1, []))
+                halves = [[(y0 + 1) >> 1, ((y1 + 1) >> 1) - 1] for y0, y1 in both]
+                halves = [r for r in halves if r[0] <= r[1]]
+                if halves:
+                    parent_full[px] = halves
+
+            self.full[d] = {
+                (x, y) for x, runs in full.items()
+                for y in _cells(runs, [[2 * y0, 2 * y1 + 1] for y0, y1 in parent_full.get(x >> 1, [])])
+            }
+            self.partial[d] = {(x, y) for x, runs in any_.items() for y in _cells(runs, full.get(x, []))}
+            full, any_ = parent_full, parent_any
+
+        self.full[0] = {(x, y) for x, runs in full.items() for y in _cells(runs, [])}
+        self.partial[0] = {(x, y) for x, runs in any_.items() for y in _cells(runs, full.get(x, []))}
+
+    def state(self, d: int, x: int, y: int) -> int:
+        """EMPTY / PARTIAL / FULL do nó (d, x, y), d <= z."""
+        for a in range(d + 1):
+            node = (x >> (d - a), y >> (d - a))
+            if node in self.full[a]:
+                return FULL
+            if node not in self.partial[a]:
+                return EMPTY
+        return PARTIAL
+
+    def __contains__(self, xy) -> bool:
+        return self.state(self.z, *xy) == FULL
+
+    def bounds(self) -> Optional[TileRect]:
+        """Retângulo que envolve os tiles cobertos (no próprio zoom)."""
+        if not self.count:
+            return None
+        x0 = y0 = 1 << self.z
+        x1 = y1 = -1
+        for d in range(self.z + 1):
+            s = self.z - d
+            for nx, ny in self.full[d]:
+                x0, x1 = min(x0, nx << s), max(x1, ((nx + 1) << s) - 1)
+                y0, y1 = min(y0, ny << s), max(y1, ((ny + 1) << s) - 1)
+        return x0, x1, y0, y1
+
+    def missing(self, rect: TileRect) -> Iterator[tuple[int, int]]:
+        """(x, y) do retângulo que não estão cobertos; blocos cheios são pulados inteiros."""
+        x0, x1, y0, y1 = rect
+        stack = [(0, 0, 0)]
+        while stack:
+            d, nx, ny = stack.pop()
+            s = self.z - d
+            ax0, ax1 = nx << s, ((nx + 1) << s) - 1
+            ay0, ay1 = ny << s, ((ny + 1) << s) - 1
+            if ax1 < x0 or ax0 > x1 or ay1 < y0 or ay0 > y1:
+                continue
+            node = (nx, ny)
+            if node in self.full[d]:
+                continue
+            if node not in self.partial[d]:
+                for x in range(max(ax0, x0), min(ax1, x1) + 1):
+                    for y in range(max(ay0, y0), min(ay1, y1) + 1):
+                        yield x, y
+                continue
+            for cx, cy in ((2 * nx + 1, 2 * ny + 1), (2 * nx, 2 * ny + 1), (2 * nx + 1, 2 * ny), (2 * nx, 2 * ny)):
+                stack.append((d + 1, cx, cy))
+
+    def count_missing(self, rect: TileRect) -> int:
+        """Quantos tiles do retângulo faltam (sem enumerar os blocos vazios)."""
+        x0, x1, y0, y1 = rect
+        n = 0
+        stack = [(0, 0, 0)]
+        while stack:
+            d, nx, ny = stack.pop()
+            s = self.z - d
+            ax0, ax1 = max(nx << s, x0), min(((nx + 1) << s) - 1, x1)
+            ay0, ay1 = max(ny << s, y0), min(((ny + 1) << s) - 1, y1)
+            if ax1 < ax0 or ay1 < ay0 or (nx, ny) in self.full[d]:
+                continue
+            if (nx, ny) not in self.partial[d]:
+                n += (ax1 - ax0 + 1) * (ay1 - ay0 + 1)
+                continue
+            stack.extend(((d + 1, 2 * nx, 2 * ny), (d + 1, 2 * nx + 1, 2 * ny),
+                          (d + 1, 2 * nx, 2 * ny + 1), (d + 1, 2 * nx + 1, 2 * ny + 1)))
+        return n
+
+
+def _union(*lists) -> list:
+    """União de listas de faixas [y0, y1] (ordenadas ou não)."""
+    out: list = []
+    for y0, y1 in sorted(r for runs in lists for r in runs):
+        if out and y0 <= out[-1][1] + 1:
+            out[-1][1] = max(out[-1][1], y1)
+        else:
+            out.append([y0, y1])
+    return out
+
+
+def _intersect(a: list, b: list) -> list:
+    out = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        lo, hi = max(a[i][0], b[j][0]), min(a[i][1], b[j][1])
+        if lo <= hi:
+            out.append([lo, hi])
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return out
+
+
+def _cells(runs: list, minus: list) -> Iterator[int]:
+    """Linhas das faixas `runs` que não estão em `minus` (ambas ordenadas)."""
+    j = 0
+    for y0, y1 in runs:
+        y = y0
+        while y <= y1:
+            while j < len(minus) and minus[j][1] < y:
+                j += 1
+            if j < len(minus) and minus[j][0] <= y:
+                y = minus[j][1] + 1
+                continue
+            stop = min(y1, minus[j][0] - 1) if j < len(minus) else y1
+            yield from range(y, stop + 1)
+            y = stop + 1
+
+
+class CoverageQuadtree:
+    """Cobertura de uma camada: {z: ZoomCoverage}."""
+
+    def __init__(self, tiles: Iterable[tuple[int, int, int]] = ()):
+        by_zoom: dict = {}
+        for z, x, y in tiles:
+            by_zoom.setdefault(z, []).append((x, y))
+        self.zooms = {z: ZoomCoverage(z, xy) for z, xy in by_zoom.items()}
+
+    def __contains__(self, zxy) -> bool:
+        z, x, y = zxy
+        zc = self.zooms.get(z)
+        return zc is not None and (x, y) in zc
+
+    def count(self) -> int:
+        return sum(zc.count for zc in self.zooms.values())
+
+    def state(self, z: int, d: int, x: int, y: int) -> int:
+        zc = self.zooms.get(z)
+        return zc.state(d, x, y) if zc is not None else EMPTY
+
+    def missing(self, z: int, rect: TileRect) -> Iterator[tuple[int, int]]:
+        zc = self.zooms.get(z)
+        if zc is None:
+            x0, x1, y0, y1 = rect
+            return ((x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1))
+        return zc.missing(rect)
+
+    def count_missing(self, z: int, rect: TileRect) -> int:
+        zc = self.zooms.get(z)
+        if zc is None:
+            x0, x1, y0, y1 = rect
+            return (x1 - x0 + 1) * (y1 - y0 + 1)
+        return zc.count_missing(rect)
+
+
+# ---------------- origem da cobertura ----------------
+
+def coverage_from_manifest(manifest: TileManifest, states: Optional[tuple] = None) -> dict:
+    """{camada: CoverageQuadtree} das linhas do manifesto (todas, ou só nos estados pedidos)."""
+    return {layer: CoverageQuadtree(manifest.keys(layer, states)) for layer in manifest.layers()}
+
+
+def coverage_from_pack(pack_path: str) -> dict:
+    """{camada: CoverageQuadtree} a partir do conteúdo do pack (.mbtiles ou pasta)."""
+    if is_mbtiles(pack_path):
+        try:
+            with MBTilesReader(pack_path) as mb:
+                return {layer: CoverageQuadtree(mb.tile_keys(layer)) for layer in mb.layers}
+        except sqlite3.Error:
+            return {}
+
+    if not os.path.isdir(pack_path):
+        return {}
+    out = {}
+    for layer in folder_pack_layers(pack_path):
+        base = pack_path if layer == FLAT_LAYER else os.path.join(pack_path, layer)
+        out[layer] = CoverageQuadtree((z, x, y) for z, x, y, _ in iter_folder_tiles(base))
+    return out
+
+
+def load_pack_coverage(pack_path: str) -> dict:
+    """Cobertura do pack: pelo manifesto (DONE/NOT_FOUND) se existir, senão pelo conteúdo."""
+    mpath = manifest_path_for(pack_path)
+    if os.path.exists(mpath) and os.path.exists(pack_path):
+        with TileManifest(mpath) as manifest:
+            return coverage_from_manifest(manifest, (DONE, NOT_FOUND))
+    return coverage_from_pack(pack_path)
+
+
+# ---------------- prévia no mapa ----------------
+
+def _combined_state(trees: list, z: int, d: int, x: int, y: int) -> int:
+    states = {t.state(z, d, x, y) for t in trees}
+    if states == {FULL}:
+        return FULL
+    if states == {EMPTY}:
+        return EMPTY
+    return PARTIAL
+
+
+def preview_blocks(coverage: dict, z: int, max_blocks: int = 1500) -> list:
+    """
+    Blocos cobertos / parciais do zoom z (todas as camadas juntas) para o
+    mapa: [[estado, lat_s, lon_w, lat_n, lon_e], ...]. Os nós parciais são
+    refinados nível a nível enquanto couberem em max_blocks.
+    """
+    trees = list(coverage.values())
+    if not any(z in t.zooms for t in trees):
+        return []
+
+    out = []
+    frontier = [(0, 0)]
+    for d in range(z + 1):
+        partial = []
+        for nx, ny in frontier:
+            st = _combined_state(trees, z, d, nx, ny)
+            if st == FULL:
+                out.append((FULL, d, nx, ny))
+            elif st == PARTIAL:
+                partial.append((nx, ny))
+        if d == z or len(out) + 4 * len(partial) > max_blocks:
+            out.extend((PARTIAL, d, nx, ny) for nx, ny in partial)
+            break
+        frontier = [(2 * nx + i, 2 * ny + j) for nx, ny in partial for i in (0, 1) for j in (0, 1)]
+
+    blocks = []
+    for st, d, nx, ny in out:
+        lat_n, lon_w = num2deg(nx, ny, d)
+        lat_s, lon_e = num2deg(nx + 1, ny + 1, d)
+        blocks.append([st, round(lat_s, 6), round(lon_w, 6), round(lat_n, 6), round(lon_e, 6)])
+    return blocks
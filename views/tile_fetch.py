@@ -0,0 +1,248 @@
+# views/tile_fetch.py
+"""
+Motor de download concorrente de tiles (usado pelo TilePackDownloader).
+
+- pool de threads limitado (max_workers) e no máximo max_workers * 2
+  pedidos em voo: a lista de tiles é consumida aos poucos
+- limite de conexões por host (CARTO e ArcGIS têm limites diferentes)
+- uma requests.Session por thread, com pool de conexões (keep-alive)
+- retry com backoff exponencial + jitter ("full jitter") em erro de rede,
+  429 e 5xx; respeita Retry-After. 404/400 não são repetidos
+- ThroughputMeter: tiles/s e ETA numa janela deslizante
+
+Os resultados voltam na thread que chamou run() (a do QThread), então
+quem grava (pasta ou .mbtiles) nunca é acessado por duas threads.
+
+Para testar sem internet: TilePackDownloader(sources=...) apontando para um
+servidor local ({z}/{x}/{y}), ou session_factory com uma sessão falsa.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Iterable, Optional
+from urllib.parse import urlsplit
+
+USER_AGENT = "URD-GS-MapsManager/1.0"
+
+# conexões simultâneas por host (o resto usa DEFAULT_HOST_LIMIT)
+HOST_LIMITS = {
+    "cartodb-basemaps-a.global.ssl.fastly.net": 6,
+    "server.arcgisonline.com": 4,
+}
+DEFAULT_HOST_LIMIT = 2
+
+RETRY_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+# (chave, url) -> chave volta no callback junto com os bytes
+FetchJob = tuple[object, str]
+
+
+def _default_session_factory(pool_size: int):
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    session.headers.update({"User-Agent": USER_AGENT})
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class FetchError(Exception):
+    """Tile que não veio nem depois dos retries (permanent: 4xx, não adianta repetir)."""
+
+    def __init__(self, url: str, reason: str, permanent: bool = False):
+        super().__init__(f"{reason}: {url}")
+        self.url = url
+        self.reason = reason
+        self.permanent = permanent
+
+
+class ThroughputMeter:
+    """Taxa (itens/s) na janela dos últimos window_s segundos, e ETA."""
+
+    def __init__(self, window_s: float = 10.0):
+        self.window_s = float(window_s)
+        self._samples: deque = deque()  # (t, itens)
+        self._count = 0
+        self.started_at = time.monotonic()
+
+    def add(self, n: int = 1):
+        now = time.monotonic()
+        self._samples.append((now, n))
+        self._count += n
+        cutoff = now - self.window_s
+        while self._samples and self._samples[0][0] < cutoff:
+            _, old = self._samples.popleft()
+            self._count -= old
+
+    def rate(self) -> float:
+        if not self._samples:
+            return 0.0
+        now = time.monotonic()
+        span = max(now - self._samples[0][0], min(now - self.started_at, self.window_s), 1e-3)
+        return self._count / span
+
+    def eta(self, remaining: int) -> float:
+        """Segundos até terminar (-1 = sem estimativa ainda)."""
+        r = self.rate()
+        return remaining / r if r > 0 else -1.0
+
+
+class TileFetcher:
+    def __init__(
+        self,
+        max_workers: int = 12,
+        host_limits: Optional[dict] = None,
+        retries: int = 4,
+        backoff_base: float = 0.5,
+        backoff_max: float = 20.0,
+        timeout=(3, 8),
+        session_factory: Optional[Callable[[int], object]] = None,
+    ):
+        self.max_workers = max(1, int(max_workers))
+        self.host_limits = dict(HOST_LIMITS if host_limits is None else host_limits)
+        self.retries = max(0, int(retries))
+        self.backoff_base = float(backoff_base)
+        self.backoff_max = float(backoff_max)
+        self.timeout = timeout
+        self._session_factory = session_factory or _default_session_factory
+
+        self._local = threading.local()
+        self._host_sems: dict[str, threading.BoundedSemaphore] = {}
+        self._sems_lock = threading.Lock()
+        self._stop = threading.Event()
+
+        self.retried = 0  # total de novas tentativas (diagnóstico)
+
+    # ---------- controle ----------
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop.is_set()
+
+    # ---------- internos ----------
+
+    def _session(self):
+        s = getattr(self._local, "session", None)
+        if s is None:
+            s = self._session_factory(self.max_workers)
+            self._local.session = s
+        return s
+
+    def _host_sem(self, host: str) -> threading.BoundedSemaphore:
+        with self._sems_lock:
+            sem = self._host_sems.get(host)
+            if sem is None:
+                sem = threading.BoundedSemaphore(self.host_limits.get(host, DEFAULT_HOST_LIMIT))
+                self._host_sems[host] = sem
+            return sem
+
+    def backoff(self, attempt: int) -> float:
+        """Full jitter: uniforme em [0, min(max, base * 2^attempt)]."""
+        return random.uniform(0.0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _sleep(self, seconds: float) -> bool:
+        """Dorme (interrompível por stop()). False se foi interrompido."""
+        return not self._stop.wait(max(0.0, seconds))
+
+    def fetch(self, url: str) -> bytes:
+        """Baixa um tile (com retries). Levanta FetchError se não conseguir."""
+        sem = self._host_sem(urlsplit(url).hostname or "")
+        reason = "sem resposta"
+
+        for attempt in range(self.retries + 1):
+            if self._stop.is_set():
+                raise FetchError(url, "cancelado")
+
+            wait_s = None
+            with sem:
+                try:
+                    r = self._session().get(url, timeout=self.timeout)
+                except Exception as e:
+                    reason = type(e).__name__
+                else:
+                    status = r.status_code
+                    if status == 200 and r.content:
+                        return r.content
+                    reason = f"HTTP {status}"
+                    if status not in RETRY_STATUS:
+                        raise FetchError(url, reason, permanent=400 <= status < 500)
+                    wait_s = _retry_after(r.headers.get("Retry-After"))
+
+            if attempt < self.retries:
+                self.retried += 1
+                delay = self.backoff(attempt)
+                if wait_s is not None:
+                    delay = max(delay, min(wait_s, self.backoff_max))
+                if not self._sleep(delay):
+                    raise FetchError(url, "cancelado")
+
+        raise FetchError(url, reason)
+
+    # ---------- lote ----------
+
+    def run(
+        self,
+        jobs: Iterable[FetchJob],
+        on_result: Callable[[object, Optional[bytes], Optional[FetchError]], bool],
+    ) -> None:
+        """
+        Baixa os jobs com no máximo max_workers * 2 em voo. on_result(chave,
+        bytes, erro) roda na thread que chamou run(); se retornar False, o
+        lote para (os pedidos em voo terminam, nada novo é enviado).
+        """
+        it = iter(jobs)
+        in_flight: dict = {}
+        max_in_flight = self.max_workers * 2
+        exhausted = False
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tile") as pool:
+            try:
+                while True:
+                    while not exhausted and not self._stop.is_set() and len(in_flight) < max_in_flight:
+                        try:
+                            key, url = next(it)
+                        except StopIteration:
+                            exhausted = True
+                            break
+                        in_flight[pool.submit(self.fetch, url)] = key
+
+                    if not in_flight:
+                        return
+
+                    done, _ = wait(in_flight, timeout=0.5, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        key = in_flight.pop(fut)
+                        try:
+                            data, err = fut.result(), None
+                        except FetchError as e:
+                            data, err = None, e
+                        except Exception as e:
+                            data, err = None, FetchError("", str(e))
+                        if not on_result(key, data, err):
+                            self._stop.set()
+            finally:
+                if in_flight:
+                    # saída antecipada: acorda quem está no backoff
+                    self._stop.set()
+                    for fut in in_flight:
+                        fut.cancel()
+
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
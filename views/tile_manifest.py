@@ -0,0 +1,280 @@
+# views/tile_manifest.py
+"""
+Manifesto de um pack de tiles em download (SQLite ao lado do pack).
+
+    pasta:    <pack>/manifest.sqlite
+    mbtiles:  <pack>.mbtiles.manifest.sqlite
+
+Uma linha por (camada, z, x, y) com estado, tamanho, hash (sha1) e número de
+tentativas. É o manifesto que diz o que falta baixar: continuar um download
+(depois de cancelar ou de reabrir o app) não consulta o pack nem o disco.
+
+Estados:
+    PENDING    falta baixar
+    DONE       gravado no pack
+    MISSING    desistiu depois de max_passes rodadas (rede/5xx); volta a
+               PENDING na próxima vez que o download for retomado
+    NOT_FOUND  o servidor respondeu 4xx (não existe): não tenta de novo
+
+As marcações ficam num buffer e só entram no flush() (uma transação); quem
+grava o pack precisa fazer o flush dele ANTES do flush do manifesto (um tile
+nunca fica DONE sem estar no pack; no pior caso é baixado de novo).
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import time
+from typing import Iterable, Iterator, Optional
+
+from views.mbtiles import MBTILES_EXT, tile_hash
+
+PENDING = 0
+DONE = 1
+MISSING = 2
+NOT_FOUND = 3
+
+MANIFEST_NAME = "manifest.sqlite"
+
+TileKey = tuple[str, int, int, int]  # camada, z, x, y (XYZ)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS tiles (
+    layer TEXT NOT NULL,
+    z INTEGER NOT NULL,
+    x INTEGER NOT NULL,
+    y INTEGER NOT NULL,
+    state INTEGER NOT NULL DEFAULT 0,
+    size INTEGER NOT NULL DEFAULT 0,
+    hash TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    PRIMARY KEY (layer, z, x, y)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS tiles_state ON tiles (state, z, x, y, layer);
+"""
+
+
+def manifest_path_for(pack_path: str) -> str:
+    if pack_path.lower().endswith(MBTILES_EXT):
+        return pack_path + ".manifest.sqlite"
+    return os.path.join(pack_path, MANIFEST_NAME)
+
+
+def pack_path_for_manifest(path: str) -> str:
+    if path.endswith(MBTILES_EXT + ".manifest.sqlite"):
+        return path[: -len(".manifest.sqlite")]
+    return os.path.dirname(os.path.abspath(path))
+
+
+def missing_report_path_for(pack_path: str) -> str:
+    if pack_path.lower().endswith(MBTILES_EXT):
+        return pack_path + ".missing.txt"
+    return os.path.join(pack_path, "missing_tiles.txt")
+
+
+class TileManifest:
+    def __init__(self, path: str):
+        self.path = path
+
+        self.created = not os.path.exists(path)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+        self._done: list[tuple] = []
+        self._failed: list[tuple] = []
+        self._built: list[tuple] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---------- parâmetros do pedido (para retomar) ----------
+
+    def set_meta(self, values: dict):
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)",
+                [(str(k), str(v)) for k, v in values.items()],
+            )
+
+    def meta(self) -> dict:
+        return {k: v for k, v in self._conn.execute("SELECT name, value FROM meta")}
+
+    # ---------- plano ----------
+
+    def plan(self, keys: Iterable[TileKey], already_done=None) -> int:
+        """
+        Registra os tiles do pedido (os que já existem no manifesto ficam como
+        estão). already_done(key) -> bool serve para adotar um pack antigo, sem
+        manifesto: só é consultado para tiles novos. Retorna quantos entraram.
+        """
+        before = self._conn.total_changes
+        rows = []
+        with self._conn:
+            for key in keys:
+                state = DONE if (already_done is not None and already_done(*key)) else PENDING
+                rows.append((*key, state))
+                if len(rows) >= 5000:
+                    self._conn.executemany("INSERT OR IGNORE INTO tiles (layer, z, x, y, state) VALUES (?, ?, ?, ?, ?)", rows)
+                    rows = []
+            if rows:
+                self._conn.executemany("INSERT OR IGNORE INTO tiles (layer, z, x, y, state) VALUES (?, ?, ?, ?, ?)", rows)
+        return self._conn.total_changes - before
+
+    def reset_done(self) -> int:
+        """DONE -> PENDING (o pack sumiu/foi recriado e o manifesto ficou)."""
+        with self._conn:
+            cur = self._conn.execute("UPDATE tiles SET state = ?, attempts = 0 WHERE state = ?", (PENDING, DONE))
+        return cur.rowcount
+
+    def reopen_missing(self) -> int:
+        """MISSING -> PENDING (nova chance ao retomar), zerando as tentativas."""
+        with self._conn:
+            cur = self._conn.execute(
+                "UPDATE tiles SET state = ?, attempts = 0 WHERE state = ?", (PENDING, MISSING)
+            )
+        return cur.rowcount
+
+    def pending(self, page: int = 2000) -> Iterator[TileKey]:
+        """
+        Tiles PENDING em ordem (z, x, y, camada), lidos em páginas pelo índice
+        (state, z, x, y, layer): dá para marcar/flush no meio da iteração.
+        """
+        last = (-1, -1, -1, "")
+        while True:
+            rows = self._conn.execute(
+                "SELECT layer, z, x, y FROM tiles WHERE state = ? AND (z, x, y, layer) > (?, ?, ?, ?) "
+                "ORDER BY z, x, y, layer LIMIT ?",
+                (PENDING, *last, page),
+            ).fetchall()
+            if not rows:
+                return
+            yield from rows
+            layer, z, x, y = rows[-1]
+            last = (z, x, y, layer)
+
+    @property
+    def buffered(self) -> int:
+        return len(self._done) + len(self._failed) + len(self._built)
+
+    # ---------- marcações (buffer) ----------
+
+    def mark_done(self, key: TileKey, data: bytes, digest: Optional[str] = None):
+        self._done.append((DONE, len(data), digest or tile_hash(data), *key))
+
+    def mark_failed(self, key: TileKey, reason: str, permanent: bool):
+        self._failed.append((NOT_FOUND if permanent else PENDING, reason, *key))
+
+    def mark_built(self, key: TileKey, data: bytes, digest: Optional[str] = None):
+        """Tile montado localmente (views/tile_pyramid.py): entra já DONE, sem passar pelo plano."""
+        self._built.append((*key, DONE, len(data), digest or tile_hash(data)))
+
+    def flush(self):
+        if not self._done and not self._failed and not self._built:
+            return
+        with self._conn:
+            if self._done:
+                self._conn.executemany(
+                    "UPDATE tiles SET state = ?, size = ?, hash = ?, attempts = attempts + 1, error = NULL "
+                    "WHERE layer = ? AND z = ? AND x = ? AND y = ?",
+                    self._done,
+                )
+            if self._failed:
+                self._conn.executemany(
+                    "UPDATE tiles SET state = ?, error = ?, attempts = attempts + 1 "
+                    "WHERE layer = ? AND z = ? AND x = ? AND y = ?",
+                    self._failed,
+                )
+            if self._built:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO tiles (layer, z, x, y, state, size, hash) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    self._built,
+                )
+        self._done = []
+        self._failed = []
+        self._built = []
+
+    def give_up_pending(self) -> int:
+        """Fim das rodadas: o que ainda está PENDING vira MISSING."""
+        self.flush()
+        with self._conn:
+            cur = self._conn.execute("UPDATE tiles SET state = ? WHERE state = ?", (MISSING, PENDING))
+        return cur.rowcount
+
+    # ---------- consultas ----------
+
+    def counts(self) -> dict:
+        """{camada: {estado: n}}"""
+        out: dict = {}
+        for layer, state, n in self._conn.execute("SELECT layer, state, COUNT(*) FROM tiles GROUP BY layer, state"):
+            out.setdefault(layer, {})[state] = n
+        return out
+
+    def layers(self) -> list[str]:
+        return [r[0] for r in self._conn.execute("SELECT DISTINCT layer FROM tiles")]
+
+    def keys(self, layer: str, states: Optional[tuple] = None,
+             zoom: Optional[int] = None) -> Iterator[tuple[int, int, int]]:
+        """(z, x, y) da camada, todos ou só nos estados / no zoom pedidos."""
+        sql = "SELECT z, x, y FROM tiles WHERE layer = ?"
+        args: tuple = (layer,)
+        if zoom is not None:
+            sql += " AND z = ?"
+            args += (zoom,)
+        if states:
+            sql += f" AND state IN ({', '.join('?' * len(states))})"
+            args += tuple(states)
+        return iter(self._conn.execute(sql, args).fetchall())
+
+    def count(self, state: int) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM tiles WHERE state = ?", (state,)).fetchone()[0]
+
+    def dedup_stats(self) -> dict:
+        """{camada: (hashes distintos, tiles DONE)}; tiles adotados de pack antigo (sem hash) não contam."""
+        return {
+            layer: (unique, n)
+            for layer, unique, n in self._conn.execute(
+                "SELECT layer, COUNT(DISTINCT hash), COUNT(*) FROM tiles WHERE state = ? AND hash IS NOT NULL "
+                "GROUP BY layer", (DONE,)
+            )
+        }
+
+    def is_consistent(self) -> bool:
+        """Nada pendente nem no buffer: cada tile tem estado final."""
+        return not self.buffered and self.count(PENDING) == 0
+
+    def missing(self, limit: Optional[int] = None) -> list[tuple]:
+        """(camada, z, x, y, estado, tentativas, erro) dos que ficaram de fora."""
+        sql = ("SELECT layer, z, x, y, state, attempts, error FROM tiles WHERE state IN (?, ?) "
+               "ORDER BY layer, z, x, y")
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return self._conn.execute(sql, (MISSING, NOT_FOUND)).fetchall()
+
+    def write_report(self, path: str) -> int:
+        """Relatório texto dos tiles que faltam (um por linha). Retorna quantos."""
+        rows = self.missing()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"# tiles faltando: {len(rows)}  ({time.strftime('%Y-%m-%d %H:%M:%S')})\n")
+            f.write("# camada\tz\tx\ty\tmotivo\ttentativas\terro\n")
+            for layer, z, x, y, state, attempts, error in rows:
+                why = "nao_existe" if state == NOT_FOUND else "desistiu"
+                f.write(f"{layer}\t{z}\t{x}\t{y}\t{why}\t{attempts}\t{error or ''}\n")
+        return len(rows)
+
+    def close(self):
+        if self._conn is None:
+            return
+        try:
+            self.flush()
+        finally:
+            self._conn.close()
+            self._conn = None
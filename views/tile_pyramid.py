@@ -0,0 +1,204 @@
+# views/tile_pyramid.py
+"""
+Tiles gerados localmente a partir de outros zooms (Pillow).
+
+- para baixo (pirâmide): o tile pai (z) é montado com os 4 filhos (z+1)
+  reduzidos à metade. O downloader baixa só o zoom máximo e monta os
+  menores aqui, num pool de processos (build_pyramid)
+- para cima (overzoom): um tile além do que o pack tem é recortado do
+  ancestral mais próximo e ampliado (crop_ancestor). O TileSchemeHandler faz
+  isso na hora, então um pack até o z17 já mostra z18–19 (OVERZOOM_LEVELS)
+
+O pool usa "spawn" (fork de um processo com threads do Qt não é seguro):
+cada worker reexecuta o main.py como __mp_main__ e depois importa este
+módulo. Por isso o main.py só importa o Qt e a janela (views/main_window.py)
+dentro de main(); no worker sobram views.startup_profile e este módulo. O
+main.py também chama multiprocessing.freeze_support() por causa do
+executável do PyInstaller.
+
+Sem Pillow instalado: pillow_available() é False e nada disso é usado.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import io
+import multiprocessing
+import os
+from typing import Callable, Optional
+
+# zooms acima do máximo do pack mostrados por overzoom
+OVERZOOM_LEVELS = 2
+# quantos níveis acima procurar um ancestral (16x16 px ampliados no pior caso)
+MAX_ANCESTOR_DEPTH = 4
+
+# filhos na ordem (dx, dy): esquerda-cima, direita-cima, esquerda-baixo, direita-baixo
+CHILD_OFFSETS = ((0, 0), (1, 0), (0, 1), (1, 1))
+
+JPEG_QUALITY = 85
+
+# espera por resultado do pool: should_stop é checado a cada POLL_S e, sem
+# nenhum tile por STALL_TIMEOUT_S (worker morto/que não sobe), o pool é
+# encerrado com erro em vez de travar a thread do download
+POLL_S = 0.5
+STALL_TIMEOUT_S = 60.0
+
+_pillow: Optional[bool] = None
+
+
+def pillow_available() -> bool:
+    global _pillow
+    if _pillow is None:
+        _pillow = importlib.util.find_spec("PIL") is not None
+    return _pillow
+
+
+def _is_jpeg(data: bytes) -> bool:
+    return data[:3] == b"\xff\xd8\xff"
+
+
+def _encode(img, jpeg: bool, fast: bool = False) -> bytes:
+    """
+    fast: PNG com compressão mínima (~10x mais rápido que optimize=True, ~20%
+    maior). O overzoom é feito na hora (vários tiles por tela, nos workers do
+    TileSchemeHandler); a pirâmide roda no pool e grava no pack, então essa
+    comprime tudo.
+    """
+    out = io.BytesIO()
+    if jpeg:
+        img.convert("RGB").save(out, "JPEG", quality=JPEG_QUALITY)
+    elif fast:
+        img.save(out, "PNG", compress_level=1)
+    else:
+        img.save(out, "PNG", optimize=True)
+    return out.getvalue()
+
+
+def merge_children(children: list) -> Optional[bytes]:
+    """
+    Tile pai a partir dos 4 filhos (bytes ou None, na ordem CHILD_OFFSETS).
+    Filho faltando (borda do pack) fica transparente; só JPEG se os 4 forem JPEG.
+    """
+    from PIL import Image
+
+    images = []
+    for data in children:
+        try:
+            images.append(Image.open(io.BytesIO(data)) if data else None)
+        except Exception:
+            images.append(None)
+    present = [im for im in images if im is not None]
+    if not present:
+        return None
+
+    size = present[0].size[0]
+    canvas = Image.new("RGBA", (2 * size, 2 * size), (0, 0, 0, 0))
+    for (dx, dy), im in zip(CHILD_OFFSETS, images):
+        if im is not None:
+            canvas.paste(im.convert("RGBA").resize((size, size)), (dx * size, dy * size))
+
+    jpeg = len(present) == 4 and all(_is_jpeg(d) for d in children)
+    return _encode(canvas.resize((size, size), Image.LANCZOS), jpeg)
+
+
+def crop_ancestor(data: bytes, dz: int, dx: int, dy: int) -> Optional[bytes]:
+    """Pedaço (dx, dy) de um ancestral dz níveis acima, ampliado para o tamanho do tile."""
+    from PIL import Image
+
+    try:
+        img = Image.open(io.BytesIO(data))
+        img.load()
+    except Exception:
+        return None
+    size = img.size[0]
+    part = size >> dz
+    if part < 1:
+        return None
+    box = (dx * part, dy * part, (dx + 1) * part, (dy + 1) * part)
+    tile = img.crop(box).resize((size, size), Image.BICUBIC)
+    return _encode(tile if _is_jpeg(data) else tile.convert("RGBA"), _is_jpeg(data), fast=True)
+
+
+def _merge_job(job):
+    key, children = job
+    return key, merge_children(children)
+
+
+def _merge_chunk(jobs):
+    return [_merge_job(job) for job in jobs]
+
+
+def default_processes() -> int:
+    return max(1, min(4, (os.cpu_count() or 2) - 1))
+
+
+def build_pyramid(
+    dirty: dict,
+    top_zoom: int,
+    bottom_zoom: int,
+    read: Callable[[str, int, int, int], Optional[bytes]],
+    write: Callable[[str, int, int, int, bytes], None],
+    end_level: Optional[Callable[[int], None]] = None,
+    progress: Optional[Callable[[str, int, int, int], None]] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+    processes: Optional[int] = None,
+    batch: int = 256,
+) -> int:
+    """
+    Monta os zooms top_zoom-1 ... bottom_zoom. `dirty` = {camada: {(x, y)}}
+    do top_zoom novos/alterados: só os pais deles (e os pais dos pais...)
+    são refeitos. read/write rodam neste processo (o pack nunca é aberto nos
+    workers); end_level(z) é chamado ao fim de cada zoom (flush do pack antes
+    de ler os filhos do próximo). Retorna quantos tiles foram gravados.
+
+    Cancelado (should_stop) ou sem resposta do pool por STALL_TIMEOUT_S, os
+    workers são terminados (pool.terminate); no segundo caso sobe
+    RuntimeError.
+    """
+    dirty = {layer: set(xy) for layer, xy in dirty.items()}
+    written = 0
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(processes or default_processes()) as pool:
+        for z in range(top_zoom - 1, bottom_zoom - 1, -1):
+            for layer in list(dirty):
+                parents = sorted({(x >> 1, y >> 1) for x, y in dirty[layer]})
+                for start in range(0, len(parents), batch):
+                    if should_stop is not None and should_stop():
+                        return written
+                    # lote pequeno: o Pool consome o iterável inteiro de uma vez (sem contrapressão)
+                    jobs = [
+                        ((px, py), [read(layer, z + 1, 2 * px + dx, 2 * py + dy) for dx, dy in CHILD_OFFSETS])
+                        for px, py in parents[start:start + batch]
+                    ]
+                    # pedaços de 16 montados aqui: com chunksize > 1 o imap devolve um
+                    # gerador, sem o next(timeout) do iterador do Pool
+                    chunks = [jobs[i:i + 16] for i in range(0, len(jobs), 16)]
+                    results = pool.imap_unordered(_merge_chunk, chunks)
+                    waited = 0.0
+                    while True:
+                        if should_stop is not None and should_stop():
+                            pool.terminate()
+                            return written
+                        try:
+                            merged = results.next(timeout=POLL_S)
+                        except StopIteration:
+                            break
+                        except multiprocessing.TimeoutError:
+                            waited += POLL_S
+                            if waited >= STALL_TIMEOUT_S:
+                                pool.terminate()
+                                raise RuntimeError(
+                                    f"Montagem dos zooms parada: nenhum tile em {STALL_TIMEOUT_S:.0f} s"
+                                )
+                            continue
+                        waited = 0.0
+                        for (px, py), data in merged:
+                            if data is not None:
+                                write(layer, z, px, py, data)
+                                written += 1
+                    if progress is not None:
+                        progress(layer, z, min(start + batch, len(parents)), len(parents))
+                dirty[layer] = set(parents)
+            if end_level is not None:
+                end_level(z)
+    return written
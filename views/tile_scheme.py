@@ -0,0 +1,335 @@
+# views/tile_scheme.py
+"""
+Tiles offline servidos dentro do processo, pelo esquema urdtiles://.
+
+    urdtiles://<camada>/<z>/<x>/<y>
+
+<camada> é "light", "dark" ou "sat" num pack (pasta com subpastas por
+camada) e "_" numa pasta de tiles simples ({z}/{x}/{y}.png direto).
+A raiz também pode ser um arquivo .mbtiles (views/mbtiles.py).
+
+O QWebEngine chama o TileSchemeHandler na thread da UI; o tile sai de um
+LRU em memória (compartilhado entre os MapWidgets) ou é lido do disco uma
+vez. Sem servidor HTTP local, sem thread por conexão e sem porta.
+
+Tile que o pack não tem (zoom acima do máximo, borda): é recortado do
+ancestral mais próximo e ampliado (overzoom, views/tile_pyramid.py), se o
+Pillow estiver instalado. O ancestral é lido na thread da UI (a conexão do
+.mbtiles é dela); o recorte e o encode rodam num ThreadPoolExecutor e o job
+é respondido quando o resultado volta (sinal enfileirado). O resultado também
+fica no LRU, numa chave própria (o tile real tem prioridade quando aparecer).
+
+Lookup que não achou nada também fica guardado (_MissingTiles, por
+NEGATIVE_TTL_S): tile fora do pack não custa de novo os isfile / consultas
+SQLite a cada pedido. set_root() descarta os dois caches da raiz, que pode
+ter sido regravada.
+
+register_tile_scheme() precisa rodar antes de criar o QApplication (main.py).
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from PySide6.QtCore import QBuffer, QByteArray, QIODevice, Qt, Signal
+from PySide6.QtWebEngineCore import QWebEngineUrlRequestJob, QWebEngineUrlScheme, QWebEngineUrlSchemeHandler
+
+from views.mbtiles import FLAT_LAYER, TILE_EXTS, MBTilesReader, is_mbtiles
+from views.tile_pyramid import MAX_ANCESTOR_DEPTH, crop_ancestor, pillow_available
+from views.trace import trace_warn
+
+SCHEME = b"urdtiles"
+ROOT_URL = "urdtiles://"
+
+OVERZOOM_WORKERS = 2     # threads de recorte (Pillow solta o GIL no resize/encode)
+NEGATIVE_TTL_S = 30.0    # um download no mesmo pack aparece depois disso
+NEGATIVE_MAX = 50_000    # chaves de tiles inexistentes guardadas
+
+_registered = False
+
+
+def register_tile_scheme():
+    """Registra o esquema no QtWebEngine (uma vez, antes do QApplication)."""
+    global _registered
+    if _registered:
+        return
+
+    scheme = QWebEngineUrlScheme(SCHEME)
+    scheme.setSyntax(QWebEngineUrlScheme.Syntax.Host)
+    scheme.setFlags(
+        QWebEngineUrlScheme.Flag.SecureScheme
+        | QWebEngineUrlScheme.Flag.LocalAccessAllowed
+        | QWebEngineUrlScheme.Flag.CorsEnabled
+    )
+    QWebEngineUrlScheme.registerScheme(scheme)
+    _registered = True
+
+
+def _mime_for(data: bytes) -> bytes:
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        return b"image/png"
+    if data[:3] == b"\xff\xd8\xff":
+        return b"image/jpeg"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return b"image/webp"
+    return b"application/octet-stream"
+
+
+class TileLRU:
+    """LRU de tiles em bytes, limitado pelo total de bytes."""
+
+    def __init__(self, max_bytes: int = 48 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._items: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key) -> Optional[bytes]:
+        with self._lock:
+            data = self._items.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._items[key] = data
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes:
+                _, dropped = self._items.popitem(last=False)
+                self._bytes -= len(dropped)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def drop_root(self, root: Optional[str]):
+        """Tira do cache todos os tiles de uma raiz (chaves (raiz, ...))."""
+        with self._lock:
+            for key in [k for k in self._items if k[0] == root]:
+                self._bytes -= len(self._items.pop(key))
+
+    def stats(self) -> dict:
+        return {"tiles": len(self._items), "bytes": self._bytes, "hits": self.hits, "misses": self.misses}
+
+
+# cache único do app (single e rasp podem ter um MapWidget cada)
+TILE_CACHE = TileLRU()
+
+_overzoom_pool: Optional[ThreadPoolExecutor] = None
+
+
+def _overzoom_executor() -> ThreadPoolExecutor:
+    global _overzoom_pool
+    if _overzoom_pool is None:
+        _overzoom_pool = ThreadPoolExecutor(max_workers=OVERZOOM_WORKERS, thread_name_prefix="overzoom")
+    return _overzoom_pool
+
+
+class _MissingTiles:
+    """Chaves que a raiz não tem, com validade (só usado na thread da UI)."""
+
+    def __init__(self, ttl_s: float = NEGATIVE_TTL_S, max_items: int = NEGATIVE_MAX):
+        self.ttl_s = ttl_s
+        self.max_items = max_items
+        self._items: OrderedDict = OrderedDict()
+
+    def has(self, key) -> bool:
+        expires = self._items.get(key)
+        if expires is None:
+            return False
+        if expires < time.monotonic():
+            del self._items[key]
+            return False
+        return True
+
+    def add(self, key):
+        self._items[key] = time.monotonic() + self.ttl_s
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+
+    def clear(self):
+        self._items.clear()
+
+
+class TileSchemeHandler(QWebEngineUrlSchemeHandler):
+    """Atende urdtiles://camada/z/x/y a partir de uma pasta/pack ou .mbtiles (set_root)."""
+
+    # worker -> thread da UI: (id do job, geração da raiz, chave, bytes ou None)
+    _overzoomDone = Signal(int, int, object, object)
+
+    def __init__(self, parent=None, cache: TileLRU = TILE_CACHE):
+        super().__init__(parent)
+        self.cache = cache
+        self.root: Optional[str] = None
+        self.is_pack = False
+        self._mbtiles: Optional[MBTilesReader] = None
+        self._missing = _MissingTiles()
+        self._generation = 0  # muda a cada set_root: recorte atrasado da raiz antiga não entra no cache
+        self._jobs: dict[int, QWebEngineUrlRequestJob] = {}
+        self._next_job = 0
+        self._overzoomDone.connect(self._on_overzoom_done, Qt.QueuedConnection)
+
+    def set_root(self, folder: Optional[str], is_pack: bool):
+        # reabre sempre: o .mbtiles pode ter sido regravado (download/conversão)
+        self._close_mbtiles()
+        self.root = os.path.abspath(folder) if folder else None
+        self.is_pack = bool(is_pack)
+        self._generation += 1
+        # ... e a pasta também: tiles antigos/overzoom/inexistentes dessa raiz não valem mais
+        self.cache.drop_root(self.root)
+        self._missing.clear()
+
+        if is_mbtiles(self.root):
+            try:
+                self._mbtiles = MBTilesReader(self.root)
+            except sqlite3.Error as e:
+                trace_warn("TileScheme", f"falha ao abrir {self.root}: {e}")
+
+    def _close_mbtiles(self):
+        if self._mbtiles is not None:
+            self._mbtiles.close()
+            self._mbtiles = None
+
+    def tile_path(self, layer: str, z: int, x: int, y: int) -> Optional[str]:
+        if not self.root or self._mbtiles is not None:
+            return None
+        base = self.root if (not self.is_pack or layer == FLAT_LAYER) else os.path.join(self.root, layer)
+        stem = os.path.join(base, str(z), str(x), str(y))
+        for ext in TILE_EXTS:
+            path = stem + ext
+            if os.path.isfile(path):
+                return path
+        return None
+
+    # ---------- overzoom ----------
+
+    def _start_overzoom(self, job: QWebEngineUrlRequestJob, layer: str, z: int, x: int, y: int) -> bool:
+        """
+        Acha o ancestral mais próximo (leitura rápida, nesta thread) e manda o
+        recorte para o worker. False se nenhum ancestral existir.
+        """
+        for dz in range(1, min(MAX_ANCESTOR_DEPTH, z) + 1):
+            parent = self._read_cached(layer, z - dz, x >> dz, y >> dz)
+            if parent is None:
+                continue
+            job_id = self._next_job
+            self._next_job += 1
+            self._jobs[job_id] = job
+            # pedido cancelado (página trocou): o job some antes do recorte voltar
+            job.destroyed.connect(lambda *_, job_id=job_id: self._jobs.pop(job_id, None))
+
+            mask = (1 << dz) - 1
+            key = (self.root, layer, z, x, y, "overzoom")
+            _overzoom_executor().submit(
+                self._crop, job_id, self._generation, key, parent, dz, x & mask, y & mask
+            )
+            return True
+        return False
+
+    def _crop(self, job_id: int, generation: int, key, parent: bytes, dz: int, dx: int, dy: int):
+        """Roda no worker: só Pillow; o resultado volta pelo sinal."""
+        try:
+            data = crop_ancestor(parent, dz, dx, dy)
+        except Exception as e:
+            trace_warn("TileScheme", f"falha no overzoom {key[1:5]}: {e}")
+            data = None
+        try:
+            self._overzoomDone.emit(job_id, generation, key, data)
+        except RuntimeError:
+            pass  # handler já destruído (app fechando)
+
+    def _on_overzoom_done(self, job_id: int, generation: int, key, data):
+        """Thread da UI (conexão enfileirada)."""
+        job = self._jobs.pop(job_id, None)
+        if data is not None and generation == self._generation:
+            self.cache.put(key, data)
+        if job is None:
+            return
+        if data is None:
+            job.fail(QWebEngineUrlRequestJob.Error.UrlNotFound)
+        else:
+            self._reply(job, data)
+
+    # ---------- leitura ----------
+
+    def _read_cached(self, layer: str, z: int, x: int, y: int) -> Optional[bytes]:
+        key = (self.root, layer, z, x, y)
+        data = self.cache.get(key)
+        if data is not None:
+            return data
+        if self._missing.has(key):
+            return None
+
+        if self._mbtiles is not None:
+            try:
+                data = self._mbtiles.get(layer, z, x, y)
+            except sqlite3.Error:
+                data = None
+        else:
+            data = self._read_file(layer, z, x, y)
+        if data is None:
+            self._missing.add(key)
+            return None
+
+        self.cache.put(key, data)
+        return data
+
+    def _read_file(self, layer: str, z: int, x: int, y: int) -> Optional[bytes]:
+        path = self.tile_path(layer, z, x, y)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def requestStarted(self, job: QWebEngineUrlRequestJob):
+        url = job.requestUrl()
+        layer = url.host() or FLAT_LAYER
+        parts = [p for p in url.path().split("/") if p]
+
+        try:
+            z, x, y = (int(os.path.splitext(p)[0]) for p in parts[-3:])
+            if len(parts) != 3 or layer not in ("light", "dark", "sat", FLAT_LAYER):
+                raise ValueError
+        except ValueError:
+            job.fail(QWebEngineUrlRequestJob.Error.UrlInvalid)
+            return
+
+        data = self._read_cached(layer, z, x, y)
+        if data is None and pillow_available():
+            data = self.cache.get((self.root, layer, z, x, y, "overzoom"))
+            if data is None and self._start_overzoom(job, layer, z, x, y):
+                return  # a resposta sai no _on_overzoom_done
+        if data is None:
+            job.fail(QWebEngineUrlRequestJob.Error.UrlNotFound)
+            return
+        self._reply(job, data)
+
+    def _reply(self, job: QWebEngineUrlRequestJob, data: bytes):
+        # o buffer pertence ao job: é liberado junto com ele
+        buf = QBuffer(job)
+        buf.setData(QByteArray(data))
+        buf.open(QIODevice.ReadOnly)
+        job.reply(_mime_for(data), buf)
@@ -0,0 +1,155 @@
+# views/timeseries.py
+"""
+Buffer de série temporal (t, y) para gráficos ao vivo (altitude da GS Flight).
+
+- arrays NumPy pré-alocados que crescem por dobra até `capacity` pontos
+- t / y devolvem views (sem cópia) do trecho preenchido, prontas para o
+  setData do pyqtgraph
+- retenção: os últimos `recent_s` segundos ficam em resolução cheia; quando
+  o buffer enche, o trecho mais antigo é decimado por 2 (mantendo mínimo e
+  máximo de cada grupo, para não perder picos como o apogeu). Se só o trecho
+  recente já enche o buffer, os pontos mais antigos são descartados (anel).
+"""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+
+
+class TimeSeriesBuffer:
+    def __init__(self, capacity: int = 20_000, recent_s: float = 120.0, initial: int = 1024):
+        self.capacity = max(16, int(capacity))
+        self.recent_s = float(recent_s)
+
+        size = min(self.capacity, max(16, int(initial)))
+        self._t = np.empty(size, dtype=np.float64)
+        self._y = np.empty(size, dtype=np.float64)
+        self._n = 0
+
+        self.decimations = 0  # quantas vezes o trecho antigo foi decimado
+
+    # ---------- leitura ----------
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def t(self) -> np.ndarray:
+        return self._t[:self._n]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self._y[:self._n]
+
+    # ---------- escrita ----------
+
+    def clear(self):
+        self._n = 0
+
+    def append(self, t: float, y: float):
+        if self._n >= len(self._t):
+            self._make_room(1)
+        self._t[self._n] = t
+        self._y[self._n] = y
+        self._n += 1
+
+    def extend(self, ts: Sequence[float], ys: Sequence[float]):
+        ts = np.asarray(ts, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        k = len(ts)
+        if k == 0:
+            return
+
+        # lote maior que o buffer inteiro: só o final interessa
+        if k > self.capacity:
+            ts = ts[-self.capacity:]
+            ys = ys[-self.capacity:]
+            k = self.capacity
+
+        if self._n + k > len(self._t):
+            self._make_room(k)
+
+        n = self._n
+        self._t[n:n + k] = ts
+        self._y[n:n + k] = ys
+        self._n = n + k
+
+    # ---------- crescimento / retenção ----------
+
+    def _make_room(self, k: int):
+        need = self._n + k
+
+        # 1) cresce (dobra) enquanto couber na capacidade
+        if len(self._t) < self.capacity:
+            size = len(self._t)
+            while size < need and size < self.capacity:
+                size *= 2
+            self._resize(min(size, self.capacity))
+            if need <= len(self._t):
+                return
+
+        # 2) decima o trecho antigo (fora da janela recente)
+        while self._n + k > self.capacity:
+            if not self._decimate_old():
+                # 3) janela recente sozinha enche o buffer: descarta o mais antigo
+                drop = self._n + k - self.capacity
+                self._shift(drop)
+                break
+
+    def _resize(self, size: int):
+        n = self._n
+        t = np.empty(size, dtype=np.float64)
+        y = np.empty(size, dtype=np.float64)
+        t[:n] = self._t[:n]
+        y[:n] = self._y[:n]
+        self._t, self._y = t, y
+
+    def _shift(self, drop: int):
+        n = self._n
+        self._t[:n - drop] = self._t[drop:n]
+        self._y[:n - drop] = self._y[drop:n]
+        self._n = n - drop
+
+    def _decimate_old(self) -> bool:
+        """Decima por 2 o trecho anterior a (último t - recent_s). False se não há o que decimar."""
+        n = self._n
+        if n == 0:
+            return False
+
+        split = int(np.searchsorted(self._t[:n], self._t[n - 1] - self.recent_s, side="left"))
+        groups = split // 4
+        if groups == 0:
+            return False
+
+        # grupos de 4 pontos -> 2 pontos (mínimo e máximo, na ordem do tempo)
+        m = groups * 4
+        t_old = self._t[:m].reshape(groups, 4)
+        y_old = self._y[:m].reshape(groups, 4)
+
+        i_min = y_old.argmin(axis=1)
+        i_max = y_old.argmax(axis=1)
+        first = np.minimum(i_min, i_max)
+        second = np.maximum(i_min, i_max)
+        rows = np.arange(groups)
+
+        t_new = np.empty((groups, 2), dtype=np.float64)
+        y_new = np.empty((groups, 2), dtype=np.float64)
+        t_new[:, 0] = t_old[rows, first]
+        t_new[:, 1] = t_old[rows, second]
+        y_new[:, 0] = y_old[rows, first]
+        y_new[:, 1] = y_old[rows, second]
+
+        half = groups * 2
+        self._t[:half] = t_new.ravel()
+        self._y[:half] = y_new.ravel()
+
+        # resto (não múltiplo de 4 + janela recente) anda para trás
+        rest = n - m
+        self._t[half:half + rest] = self._t[m:n]
+        self._y[half:half + rest] = self._y[m:n]
+        self._n = half + rest
+
+        self.decimations += 1
+        return True
@@ -0,0 +1,137 @@
+# views/trace.py
+"""
+Trace de diagnóstico com níveis e buffer em anel (substitui os print() por campo).
+
+- níveis: DEBUG < INFO < WARN < ERROR; OFF desliga tudo
+- eventos e pacotes ficam só na memória (deque com tamanho fixo); nada vai
+  para o console a não ser que o nível do evento passe de echo_level
+- dump() grava o conteúdo do anel em arquivo (botão nas Configurações Gerais)
+
+Custo no caminho quente: quem chama testa um atributo antes de montar a
+mensagem, e com o nível acima de DEBUG nada mais é feito:
+
+    if TRACE.debug:
+        TRACE.packet("gs_flight", line, invalid)
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+
+DEBUG = 10
+INFO = 20
+WARN = 30
+ERROR = 40
+OFF = 100
+
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARN: "WARN", ERROR: "ERROR", OFF: "OFF"}
+
+
+class Tracer:
+    """
+    Registro de eventos/pacotes recentes.
+
+    append() em deque é atômico no CPython, então a thread da serial, a do
+    Logger e a UI podem registrar sem lock; o lock só protege o dump().
+    """
+
+    def __init__(self, capacity: int = 2000, packet_capacity: int = 500, level: int = WARN, echo_level: int = WARN):
+        self._events: deque = deque(maxlen=capacity)
+        self._packets: deque = deque(maxlen=packet_capacity)
+        self._lock = threading.Lock()
+
+        self.level = OFF
+        self.echo_level = echo_level
+        self.debug = False      # atalhos lidos no caminho quente
+        self.info = False
+        self.set_level(level)
+
+    # ---------- configuração ----------
+
+    def set_level(self, level: int):
+        self.level = int(level)
+        self.debug = self.level <= DEBUG
+        self.info = self.level <= INFO
+
+    def set_echo_level(self, level: int):
+        """Eventos a partir deste nível também vão para o stdout (OFF = nunca)."""
+        self.echo_level = int(level)
+
+    def enabled(self, level: int) -> bool:
+        return level >= self.level
+
+    # ---------- registro ----------
+
+    def event(self, level: int, source: str, message: str):
+        if level < self.level:
+            return
+        self._events.append((time.time(), level, source, message))
+        if level >= self.echo_level:
+            print(f"[{source}] {message}")
+
+    def packet(self, source: str, line: str, invalid=()):
+        """Pacote recebido (só com nível DEBUG): linha bruta + campos fora do range."""
+        if not self.debug:
+            return
+        self._packets.append((time.time(), source, line, tuple(invalid)))
+
+    def clear(self):
+        with self._lock:
+            self._events.clear()
+            self._packets.clear()
+
+    # ---------- leitura / dump ----------
+
+    def events(self) -> list:
+        with self._lock:
+            return list(self._events)
+
+    def packets(self) -> list:
+        with self._lock:
+            return list(self._packets)
+
+    def dump(self, path: str) -> int:
+        """Grava eventos e pacotes do anel em texto (TAB). Retorna o número de registros."""
+        events = self.events()
+        packets = self.packets()
+
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"# trace nível={LEVEL_NAMES.get(self.level, self.level)} gerado={_fmt_ts(time.time())}\n")
+
+            f.write(f"# eventos ({len(events)})\n")
+            f.write("host_ts\tnivel\torigem\tmensagem\n")
+            for ts, level, source, message in events:
+                f.write(f"{_fmt_ts(ts)}\t{LEVEL_NAMES.get(level, level)}\t{source}\t{message}\n")
+
+            f.write(f"\n# pacotes ({len(packets)})\n")
+            f.write("host_ts\torigem\tinvalidos\tlinha\n")
+            for ts, source, line, invalid in packets:
+                f.write(f"{_fmt_ts(ts)}\t{source}\t{','.join(invalid)}\t{line}\n")
+
+        return len(events) + len(packets)
+
+
+def _fmt_ts(ts: float) -> str:
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts)) + f".{int(ts * 1000) % 1000:03d}"
+
+
+# instância única usada pelo app
+TRACE = Tracer()
+
+
+def trace_debug(source: str, message: str):
+    TRACE.event(DEBUG, source, message)
+
+
+def trace_info(source: str, message: str):
+    TRACE.event(INFO, source, message)
+
+
+def trace_warn(source: str, message: str):
+    TRACE.event(WARN, source, message)
+
+
+def trace_error(source: str, message: str):
+    TRACE.event(ERROR, source, message)
@@ -0,0 +1,148 @@
+# views/track.py
+"""
+Trajeto do foguete no mapa (modelo do lado Python do MapWidget).
+
+O Leaflet desenha o trajeto em duas polylines:
+
+- recente: os últimos keep_recent pontos, em resolução cheia
+- antigo:  o resto, simplificado (Douglas-Peucker, tolerância em metros)
+
+Os pontos recebidos ficam numa fila e take_update() devolve, de uma vez, o
+delta para o JS (um runJavaScript por frame):
+
+    new   pontos novos para o fim do trecho recente
+    drop  quantos pontos saem do começo do trecho recente
+    old   pontos (já simplificados) para o fim do trecho antigo
+
+Quando o recente passa de keep_recent + chunk, os chunk pontos mais antigos
+são simplificados e migram para o antigo; o último ponto migrado continua
+sendo o primeiro do recente, então as duas linhas ficam emendadas.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Optional, Sequence
+
+Point = tuple[float, float]
+
+_M_PER_DEG = 111_320.0
+
+
+def simplify_dp(points: Sequence[Point], tolerance_m: float) -> list[Point]:
+    """
+    Douglas-Peucker (iterativo) com distância em metros, projeção
+    equiretangular local (suficiente para trechos de alguns km).
+    Mantém sempre o primeiro e o último ponto.
+    """
+    n = len(points)
+    if n <= 2 or tolerance_m <= 0:
+        return list(points)
+
+    lat0 = math.radians(points[0][0])
+    kx = _M_PER_DEG * math.cos(lat0)
+    ky = _M_PER_DEG
+    xy = [(lon * kx, lat * ky) for lat, lon in points]
+
+    keep = [False] * n
+    keep[0] = keep[-1] = True
+    tol2 = tolerance_m * tolerance_m
+
+    stack = [(0, n - 1)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2:
+            continue
+
+        ax, ay = xy[a]
+        bx, by = xy[b]
+        dx, dy = bx - ax, by - ay
+        seg2 = dx * dx + dy * dy
+
+        best, best_i = -1.0, -1
+        for i in range(a + 1, b):
+            px, py = xy[i]
+            if seg2 == 0.0:
+                d2 = (px - ax) ** 2 + (py - ay) ** 2
+            else:
+                t = ((px - ax) * dx + (py - ay) * dy) / seg2
+                t = 0.0 if t < 0.0 else (1.0 if t > 1.0 else t)
+                qx, qy = ax + t * dx - px, ay + t * dy - py
+                d2 = qx * qx + qy * qy
+            if d2 > best:
+                best, best_i = d2, i
+
+        if best > tol2:
+            keep[best_i] = True
+            stack.append((a, best_i))
+            stack.append((best_i, b))
+
+    return [p for p, k in zip(points, keep) if k]
+
+
+class TrackSimplifier:
+    def __init__(self, keep_recent: int = 300, chunk: int = 200, tolerance_m: float = 3.0):
+        self.keep_recent = max(2, int(keep_recent))
+        self.chunk = max(2, int(chunk))
+        self.tolerance_m = float(tolerance_m)
+        self.reset()
+
+    def reset(self):
+        self._old: list[Point] = []       # espelho do trecho antigo no JS
+        self._recent: list[Point] = []    # espelho do trecho recente no JS
+        self._pending: list[Point] = []   # ainda não enviados
+
+        self.points_received = 0
+
+    def __len__(self) -> int:
+        """Pontos desenhados (antigo simplificado + recente + pendentes)."""
+        return len(self._old) + len(self._recent) + len(self._pending)
+
+    @property
+    def has_pending(self) -> bool:
+        return bool(self._pending)
+
+    @property
+    def last_point(self) -> Optional[Point]:
+        if self._pending:
+            return self._pending[-1]
+        if self._recent:
+            return self._recent[-1]
+        return self._old[-1] if self._old else None
+
+    def add(self, lat: float, lon: float):
+        self._pending.append((float(lat), float(lon)))
+        self.points_received += 1
+
+    def extend(self, points: Sequence[Point]):
+        for lat, lon in points:
+            self.add(lat, lon)
+
+    def take_update(self) -> Optional[dict]:
+        """Delta para o JS (new/drop/old), ou None se não chegou nada."""
+        if not self._pending:
+            return None
+
+        new = self._pending
+        self._pending = []
+
+        recent = self._recent
+        recent.extend(new)
+
+        drop = 0
+        old_append: list[Point] = []
+        while len(recent) > self.keep_recent + self.chunk:
+            seg = recent[:self.chunk + 1]
+            simp = simplify_dp(seg, self.tolerance_m)
+            # o primeiro ponto do trecho já é o último do antigo
+            old_append.extend(simp if not self._old and not old_append else simp[1:])
+            del recent[:self.chunk]
+            drop += self.chunk
+
+        self._old.extend(old_append)
+        return {"new": new, "drop": drop, "old": old_append}
+
+    def snapshot(self) -> dict:
+        """Estado completo (para redesenhar do zero depois de recarregar a página)."""
+        self.take_update()
+        return {"new": list(self._recent), "drop": 0, "old": list(self._old)}
@@ -0,0 +1,95 @@
+# views/web_bridge.py
+"""
+Pontes QWebChannel entre o Python e as páginas do MapWidget, do Rocket3DView
+e do mapa do Gerenciador de Mapas.
+
+Em vez de montar código JS com os números dentro (runJavaScript por pacote,
+que o Chromium precisa parsear e compilar a cada chamada), o Python emite
+sinais tipados e a página já conectada recebe só os dados (JSON do canal).
+Vários pontos/amostras vão numa mesma mensagem.
+
+Lado JS (página):
+
+    new QWebChannel(qt.webChannelTransport, function(channel){
+        var bridge = channel.objects.bridge;
+        bridge.trackPushed.connect(pushTrack);
+        ...
+        bridge.pageReady();
+    });
+
+Enquanto a página não chamou pageReady() (carregando / recarregando), ready
+fica False e quem emite deve guardar o estado para reenviar em `ready`.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from PySide6.QtCore import QObject, Signal, Slot
+from PySide6.QtWebChannel import QWebChannel
+
+BRIDGE_NAME = "bridge"
+
+# script do QWebChannel embutido no Qt (as páginas usam <script src=...>)
+QWEBCHANNEL_JS = "qrc:///qtwebchannel/qwebchannel.js"
+
+
+class _PageBridge(QObject):
+    """Base: estado de pronto da página + anexo ao QWebEnginePage."""
+
+    ready = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.is_ready = False
+        self._channel: Optional[QWebChannel] = None
+
+    def attach(self, page):
+        """Registra a ponte no canal da página (chamar de novo se a página for trocada)."""
+        self.is_ready = False
+        self._channel = QWebChannel(page)
+        self._channel.registerObject(BRIDGE_NAME, self)
+        page.setWebChannel(self._channel)
+
+    def page_loading(self):
+        """Página começou a (re)carregar: nada é entregue até o próximo pageReady()."""
+        self.is_ready = False
+
+    @Slot()
+    def pageReady(self):
+        self.is_ready = True
+        self.ready.emit()
+
+
+class ViewBridge(_PageBridge):
+    """Só JS -> Python: a página chama reportView(lat, lon, zoom) no moveend."""
+
+    # reemitido para quem quiser acompanhar a vista do mapa
+    viewChanged = Signal(float, float, int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.view: Optional[tuple[float, float, int]] = None
+
+    def page_loading(self):
+        super().page_loading()
+        self.view = None
+
+    @Slot(float, float, int)
+    def reportView(self, lat: float, lon: float, zoom: int):
+        self.view = (lat, lon, int(zoom))
+        self.viewChanged.emit(lat, lon, int(zoom))
+
+
+class MapBridge(ViewBridge):
+    # Python -> JS
+    trackPushed = Signal(list, int, list)        # novos pontos, drop do recente, pontos do trecho antigo
+    baseChanged = Signal(float, float, int)      # lat, lon, zoom
+    positionRequested = Signal(float, float, int)
+    viewRequested = Signal(float, float, int)    # zoom < 0 = mantém o zoom atual
+    resetRequested = Signal()
+
+
+class Rocket3DBridge(_PageBridge):
+    # Python -> JS: lote de amostras [roll, pitch, yaw] em rad (null = eixo sem dado)
+    orientationSamples = Signal(list)